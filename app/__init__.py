@@ -29,6 +29,7 @@ from app.extensions import cors, db, migrate, admin as admin_extension, limiter
 
 # models
 from app.goals import *
+from app.jobs import *
 
 # importing the routes
 from .routes import main
@@ -42,6 +43,11 @@ from app.analytics.routes import analytics
 from app.subscriptions.routes import subscription
 from app.achievements.routes import achievements
 
+# cli commands
+from app.jobs.commands import worker_cli
+from app.analytics.commands import stats_cli
+from app.test.commands import tests_cli
+
 
 load_dotenv()
 
@@ -66,15 +72,19 @@ def create_super_admin_if_not_exists():
 def run_migrations_once():
     # Any consistent lock key (bigint). Keep it constant for this app.
     lock_key = 987654321  
+    # advisory locks are Postgres-only; a local SQLite database has a single writer anyway
+    use_lock = db.engine.dialect.name == "postgresql"
 
-    db.session.execute(text("SELECT pg_advisory_lock(:k)"), {"k": lock_key})
+    if use_lock:
+        db.session.execute(text("SELECT pg_advisory_lock(:k)"), {"k": lock_key})
     try:
         upgrade()
     except Exception as e:
         log_error(f"Error during migrations: {e}")
         print(f"Error during migrations: {e}")
     finally:
-        db.session.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": lock_key})
+        if use_lock:
+            db.session.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": lock_key})
         db.session.commit()
 
 def create_app():
@@ -183,6 +193,11 @@ def create_app():
         app.register_blueprint(subscription)
         app.register_blueprint(achievements)
 
+        # registering cli commands
+        app.cli.add_command(worker_cli)
+        app.cli.add_command(stats_cli)
+        app.cli.add_command(tests_cli)
+
         app.config["VALIDATION_ERROR_SCHEMA"] = validation_error_schema
 
         
@@ -0,0 +1,130 @@
+"""
+Per-worker caches invalidated through generation counters.
+
+Every cached namespace has a row in `cache_version`. Whoever changes the
+underlying data bumps that row (`versioned_cache.bump(namespace)`), and each
+worker re-reads the counters at most once every CACHE_VERSION_CHECK_SECONDS,
+dropping entries built under an older generation. So gunicorn workers serve
+lookups from memory and pick up another worker's change within that interval.
+
+Entries live in `current_app.extensions`, so every app instance starts empty.
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from flask import current_app
+from flask_admin.contrib.sqla import ModelView
+
+from app._shared.operations import cache_version_manager
+
+
+DEFAULT_CHECK_SECONDS = 5
+
+
+class CacheNamespaces:
+    subject = "subject"
+    theme = "theme"
+    topic = "topic"
+    achievement = "achievement"
+    question = "question"
+    # one per school, "school:<id>" (app/analytics/response_cache.py)
+    school = "school"
+
+
+class _CacheState:
+    def __init__(self):
+        self.versions: Dict[str, int] = {}
+        self.checked_at: Optional[float] = None
+        # key -> (generation(s) it was built under, value)
+        self.entries: Dict[str, Tuple[Any, Any]] = {}
+
+
+class VersionedCache:
+    extension_key = "versioned_cache"
+
+    def _state(self) -> _CacheState:
+        state = current_app.extensions.get(self.extension_key)
+        if state is None:
+            state = current_app.extensions[self.extension_key] = _CacheState()
+        return state
+
+    def version(self, namespace: str) -> int:
+        state = self._state()
+        interval = current_app.config.get("CACHE_VERSION_CHECK_SECONDS", DEFAULT_CHECK_SECONDS)
+        now = time.monotonic()
+        if state.checked_at is None or now - state.checked_at >= interval:
+            state.versions = cache_version_manager.get_versions()
+            state.checked_at = now
+        return state.versions.get(namespace, 0)
+
+    def _generation(self, namespace: Union[str, Tuple[str, ...]]):
+        if isinstance(namespace, tuple):
+            return tuple(self.version(ns) for ns in namespace)
+        return self.version(namespace)
+
+    def get(self, key: str, namespace: Union[str, Tuple[str, ...]], loader: Callable[[], Any]) -> Any:
+        """The cached value for `key`, rebuilt with `loader()` when `namespace` has moved on.
+
+        Pass a tuple of namespaces for values built from more than one of them.
+        """
+        version = self._generation(namespace)
+        state = self._state()
+        entry = state.entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        value = loader()
+        state.entries[key] = (version, value)
+        return value
+
+    def get_many(
+        self,
+        keys: Iterable[str],
+        namespace: Union[str, Tuple[str, ...]],
+        loader: Callable[[List[str]], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Like `get` for several keys: `loader(missing_keys)` builds every stale or missing
+        entry in one call and returns them by key. Keys it leaves out aren't cached."""
+        version = self._generation(namespace)
+        state = self._state()
+
+        found, missing = {}, []
+        for key in keys:
+            entry = state.entries.get(key)
+            if entry is not None and entry[0] == version:
+                found[key] = entry[1]
+            else:
+                missing.append(key)
+
+        if missing:
+            for key, value in loader(missing).items():
+                state.entries[key] = (version, value)
+                found[key] = value
+        return found
+
+    def bump(self, *namespaces: str) -> None:
+        """Invalidate `namespaces` everywhere. Joins the caller's transaction."""
+        for namespace in namespaces:
+            cache_version_manager.bump(namespace)
+        # this worker re-reads the counters on its next lookup
+        self._state().checked_at = None
+
+    def clear(self) -> None:
+        current_app.extensions.pop(self.extension_key, None)
+
+
+versioned_cache = VersionedCache()
+
+
+class VersionedModelView(ModelView):
+    """flask-admin view that bumps `cache_namespace` after every create, edit and delete."""
+
+    cache_namespace: Optional[str] = None
+
+    def after_model_change(self, form, model, is_created):
+        if self.cache_namespace:
+            versioned_cache.bump(self.cache_namespace)
+
+    def after_model_delete(self, model):
+        if self.cache_namespace:
+            versioned_cache.bump(self.cache_namespace)
@@ -7,19 +7,39 @@ class BaseModel(db.Model):
     __abstract__ = True
 
     is_deleted = db.Column(db.Boolean, default=False, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    # callables, so every row gets the time it is written rather than the time the app started
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(
         db.DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
     )
 
     def save(self):
-        db.session.commit()
+        from app._shared.operations import BaseManager
+
+        # joins an open BaseManager.unit_of_work()
+        BaseManager.commit()
 
     def delete(self):
+        from app._shared.operations import BaseManager
+
         self.is_deleted = 1
-        db.session.commit()
+        BaseManager.commit()
 
     def to_json(self):
         pass
+
+
+class CacheVersion(db.Model):
+    """Generation counter for one cached namespace; bumping it invalidates the namespace in every worker."""
+
+    __tablename__ = "cache_version"
+
+    namespace = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
@@ -1,21 +1,59 @@
 from app.extensions import db
-from app._shared.models import BaseModel
+from app._shared.models import BaseModel, CacheVersion
 
-from typing import List
+from contextlib import contextmanager
+from sqlalchemy import func, insert
+from datetime import datetime, timezone
+from typing import Dict, List
 from logging import info as log_info
 
 
+# session.info key holding how many unit_of_work() blocks are open
+_UNIT_OF_WORK_DEPTH = "unit_of_work_depth"
+
+
 class BaseManager(object):
+    @staticmethod
+    @contextmanager
+    def unit_of_work():
+        """
+        Group several manager/model saves into a single transaction.
+
+        Inside the block `save`, `save_multiple`, `commit` and `BaseModel.save/delete`
+        only stage their changes; the outermost block commits once on exit, or
+        rolls everything back if it raises. Blocks nest.
+        """
+        session = db.session
+        depth = session.info.get(_UNIT_OF_WORK_DEPTH, 0)
+        session.info[_UNIT_OF_WORK_DEPTH] = depth + 1
+        try:
+            yield session
+        except Exception:
+            session.info[_UNIT_OF_WORK_DEPTH] = depth
+            if depth == 0:
+                session.rollback()
+            raise
+        session.info[_UNIT_OF_WORK_DEPTH] = depth
+        if depth == 0:
+            session.commit()
+
+    @staticmethod
+    def in_unit_of_work() -> bool:
+        return db.session.info.get(_UNIT_OF_WORK_DEPTH, 0) > 0
+
     @staticmethod
     def save(entity: BaseModel, upsert=False):
         if upsert:
             db.session.merge(entity)
         else:
             db.session.add(entity)
-        db.session.commit()
+        BaseManager.commit()
 
     @staticmethod
     def save_multiple(entities: List[BaseModel]):
+        if BaseManager.in_unit_of_work():
+            db.session.add_all(entities)
+            return
         try:
             db.session.begin_nested()  # Creates a savepoint
             db.session.add_all(entities)
@@ -25,6 +63,99 @@ class BaseManager(object):
             db.session.rollback()
             print("Error occurred while saving multiple entities", e)
 
+    @staticmethod
+    def dialect_insert(model):
+        """
+        An INSERT for `model` that supports `.on_conflict_do_update/nothing()`,
+        or None when the database has no ON CONFLICT (callers fall back to ORM saves).
+        """
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            return None
+        return insert(model)
+
+    @staticmethod
+    def seconds_between(start, end):
+        """SQL expression for the seconds from `start` to `end` (two DateTime columns)."""
+        if db.engine.dialect.name == "sqlite":
+            return (func.julianday(end) - func.julianday(start)) * 86400
+        return func.extract("epoch", end - start)
+
+    @staticmethod
+    def bulk_upsert(model, rows: List[Dict], index_elements: List[str], update_columns: List[str]):
+        """
+        Insert `rows` in one `INSERT ... ON CONFLICT (index_elements) DO UPDATE`
+        statement, overwriting `update_columns` on conflict, and return the
+        affected entities. `index_elements` must match a unique constraint.
+        Does not commit; the caller commits once it is done with the entities.
+
+        Returns None when the database has no ON CONFLICT; callers fall back to ORM saves.
+        """
+        stmt = BaseManager.dialect_insert(model)
+        if stmt is None:
+            return None
+        if not rows:
+            return []
+
+        stmt = stmt.values(rows)
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        # Column.onupdate is not applied to the DO UPDATE branch
+        if "updated_at" in model.__table__.c:
+            set_["updated_at"] = datetime.now(timezone.utc)
+        stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+
+        return db.session.scalars(
+            stmt.returning(model), execution_options={"populate_existing": True}
+        ).all()
+
+    @staticmethod
+    def bulk_insert(model, rows: List[Dict]) -> None:
+        """Insert `rows` with one executemany INSERT, without loading entities. Does not commit."""
+        if rows:
+            db.session.execute(insert(model), rows)
+
     @staticmethod
     def commit():
+        # the enclosing unit_of_work() commits
+        if BaseManager.in_unit_of_work():
+            return
         db.session.commit()
+
+
+class CacheVersionManager(BaseManager):
+    def get_versions(self) -> Dict[str, int]:
+        rows = CacheVersion.query.with_entities(
+            CacheVersion.namespace, CacheVersion.version
+        ).all()
+        return {row.namespace: row.version for row in rows}
+
+    def bump(self, namespace: str) -> None:
+        """Increment the namespace's generation. Joins the caller's transaction."""
+        stmt = self.dialect_insert(CacheVersion)
+        if stmt is None:
+            row = CacheVersion.query.get(namespace)
+            if not row:
+                row = CacheVersion(namespace=namespace, version=0)
+                db.session.add(row)
+            row.version = (row.version or 0) + 1
+            self.commit()
+            return
+
+        table = CacheVersion.__table__
+        stmt = stmt.values(namespace=namespace, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.namespace],
+            set_={
+                "version": table.c.version + 1,
+                "updated_at": datetime.now(timezone.utc),
+            },
+        )
+        db.session.execute(stmt)
+        self.commit()
+
+
+cache_version_manager = CacheVersionManager()
@@ -1,4 +1,5 @@
 from app.extensions import db, admin
+from app._shared.cache import CacheNamespaces, VersionedModelView
 from app._shared.models import BaseModel
 from flask_admin.contrib.sqla import ModelView
 
@@ -42,5 +43,9 @@ class StudentHasAchievement(BaseModel):
         }
 
 
-admin.add_view(ModelView(Achievement, db.session, name="Achievements"))
+class AchievementAdmin(VersionedModelView):
+    cache_namespace = CacheNamespaces.achievement
+
+
+admin.add_view(AchievementAdmin(Achievement, db.session, name="Achievements"))
 admin.add_view(ModelView(StudentHasAchievement, db.session, name="Student Has Achievements"))
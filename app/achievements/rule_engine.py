@@ -0,0 +1,403 @@
+"""
+Compiled achievement rules.
+
+Each Achievement's `requirements` JSON is parsed once into a rule object, and
+rules are indexed by `achievement_class`. The compiled catalog is cached per
+worker and rebuilt only when the achievement cache generation is bumped.
+
+A rule is evaluated against a StudentMetricsSnapshot: everything the rules
+need about one student (completed tests, streak, max level), loaded in a
+fixed number of queries. The snapshot is shared by every rule, so awarding
+achievements after a test and computing progress for the achievements page
+run the same code.
+"""
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app._shared.cache import CacheNamespaces, versioned_cache
+from app.extensions import db
+
+
+BELOW_AP_THRESHOLD = 65  # below "approaching_proficient" in AnalyticsService
+
+
+# region Snapshot
+
+
+@dataclass(frozen=True)
+class TestMetrics:
+    id: int
+    score: float
+    total_questions: Optional[int]
+    mistakes_count: Optional[int]
+    out_time: int
+    outside_time_ms: int
+    outside_events: int
+    max_outside_event_ms: int
+    meta_is_valid: bool
+    finished_on: Optional[datetime]
+
+    @classmethod
+    def from_row(cls, test_id, score_acquired, question_number, meta, finished_on) -> "TestMetrics":
+        meta = meta or {}
+        is_dict = isinstance(meta, dict)
+        meta = meta if is_dict else {}
+        out_time = meta.get("out_time") or 0
+        return cls(
+            id=test_id,
+            score=float(score_acquired or 0),
+            total_questions=meta.get("total_questions") or question_number,
+            mistakes_count=meta.get("mistakes_count"),
+            out_time=int(out_time),
+            outside_time_ms=int(meta.get("outside_time_ms") or out_time or 0),
+            outside_events=int(meta.get("outside_events") or 0),
+            max_outside_event_ms=int(meta.get("max_outside_event_ms") or 0),
+            meta_is_valid=is_dict,
+            finished_on=finished_on,
+        )
+
+    @classmethod
+    def from_test(cls, test) -> "TestMetrics":
+        return cls.from_row(test.id, test.score_acquired, test.question_number, test.meta, test.finished_on)
+
+
+@dataclass
+class StudentMetricsSnapshot:
+    student_id: int
+    # completed tests, most recently finished first
+    tests: List[TestMetrics]
+    current_streak: int
+    max_level: int
+    _band_counts: Dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def load(cls, student_id: int) -> "StudentMetricsSnapshot":
+        from app.student.models import Student, StudentSubjectLevel
+        from app.test.operations import test_manager
+
+        rows = test_manager.get_test_metric_rows(student_id)
+        streak = (
+            db.session.query(Student.current_streak).filter(Student.id == student_id).scalar()
+        )
+        max_level = (
+            db.session.query(db.func.max(StudentSubjectLevel.level))
+            .filter(StudentSubjectLevel.student_id == student_id)
+            .scalar()
+        )
+        return cls(
+            student_id=student_id,
+            tests=[TestMetrics.from_row(*row) for row in rows],
+            current_streak=int(streak or 0),
+            max_level=int(max_level or 0),
+        )
+
+    @property
+    def tests_completed(self) -> int:
+        return len(self.tests)
+
+    def tests_within_band(self, score_min: float, score_max: float) -> int:
+        key = (score_min, score_max)
+        if key not in self._band_counts:
+            self._band_counts[key] = sum(1 for t in self.tests if score_min <= t.score <= score_max)
+        return self._band_counts[key]
+
+    def has_failure_below(self, threshold: float, exclude_test_id: Optional[int] = None) -> bool:
+        return any(t.score < threshold for t in self.tests if t.id != exclude_test_id)
+
+
+# endregion Snapshot
+
+
+# region Rules
+
+
+class AchievementRule:
+    """One compiled achievement. `is_met` decides awarding, `progress` feeds the achievements page."""
+
+    repeatable = False
+
+    def __init__(self, achievement_id: int, name: str, achievement_class: Optional[str], requirements: Dict[str, Any]):
+        self.achievement_id = achievement_id
+        self.name = name
+        self.achievement_class = achievement_class
+        self.requirements = requirements
+
+    def is_met(self, snapshot: StudentMetricsSnapshot, test: TestMetrics) -> bool:
+        return False
+
+    def progress(self, snapshot: StudentMetricsSnapshot) -> float:
+        return 0.0
+
+    @staticmethod
+    def _percent(current, target) -> float:
+        return round((min(current, target) / target) * 100.0, 2)
+
+
+class VolumePracticeRule(AchievementRule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.target = int(self.requirements.get("number_of_tests") or 0)
+
+    def is_met(self, snapshot, test):
+        return bool(self.target) and snapshot.tests_completed >= self.target
+
+    def progress(self, snapshot):
+        if self.target <= 0:
+            return 0.0
+        return self._percent(snapshot.tests_completed, self.target)
+
+
+class ComebackRule(AchievementRule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        req = self.requirements
+        self.current_min = float(req.get("current_score_min") or 0)
+        self.current_max = float(req.get("current_score_max") or 0)
+        self.requires_previous_failure = bool(req.get("requires_previous_failure"))
+        self.previous_failure_condition = req.get("previous_failure_condition")
+
+    def is_met(self, snapshot, test):
+        if not (self.current_min <= test.score <= self.current_max):
+            return False
+        if not self.requires_previous_failure:
+            return True
+        if self.previous_failure_condition == "below_AP":
+            return snapshot.has_failure_below(BELOW_AP_THRESHOLD, exclude_test_id=test.id)
+        return False
+
+
+class SpeedAndAccuracyRule(AchievementRule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        req = self.requirements
+        self.questions_count = req.get("questions_count")
+        self.requires_finish = bool(req.get("requires_finish_before_time_end"))
+        self.metric = req.get("metric")
+        self.max_mistakes = req.get("max_mistakes")
+        self.score_min = float(req.get("score_min") or 0)
+        self.score_max = float(req.get("score_max") or 100)
+
+    def is_met(self, snapshot, test):
+        if self.questions_count is not None and test.total_questions is not None:
+            if int(test.total_questions) != int(self.questions_count):
+                return False
+
+        # Frontend sends out_time; if it's > 0, student finished before timer ended.
+        if self.requires_finish and not test.out_time > 0:
+            return False
+
+        if self.metric == "mistakes_count":
+            if test.mistakes_count is None:
+                return False
+            return self.max_mistakes is None or int(test.mistakes_count) <= int(self.max_mistakes)
+
+        if self.metric == "score_percent":
+            return self.score_min <= test.score <= self.score_max
+
+        return False
+
+    def progress(self, snapshot):
+        if self.questions_count is None:
+            return 0.0
+
+        best = 0.0
+        for t in snapshot.tests:
+            if t.total_questions is None or int(t.total_questions) != int(self.questions_count):
+                continue
+            if self.requires_finish and not t.out_time > 0:
+                continue
+
+            if self.metric == "score_percent":
+                if self.score_min <= t.score <= self.score_max:
+                    best = 100.0
+                continue
+
+            if self.metric == "mistakes_count":
+                if t.mistakes_count is None:
+                    continue
+                max_mistakes = int(self.max_mistakes or 0)
+                extra = int(t.mistakes_count) - max_mistakes
+                if extra <= 0:
+                    best = 100.0
+                elif extra == 1:
+                    best = max(best, 50.0)
+
+            if best == 100.0:
+                break
+        return best
+
+
+class MasteryLevelRule(AchievementRule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        req = self.requirements
+        self.score_min = float(req.get("score_band_min") or 0)
+        self.score_max = float(req.get("score_band_max") or 0)
+        self.target = int(req.get("number_of_tests") or 0)
+
+    def is_met(self, snapshot, test):
+        if self.target <= 0:
+            return False
+        return snapshot.tests_within_band(self.score_min, self.score_max) >= self.target
+
+    def progress(self, snapshot):
+        if self.target <= 0:
+            return 0.0
+        return self._percent(snapshot.tests_within_band(self.score_min, self.score_max), self.target)
+
+
+class LevelUpRule(AchievementRule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.target = int(self.requirements.get("level") or 0)
+
+    def is_met(self, snapshot, test):
+        return bool(self.target) and snapshot.max_level >= self.target
+
+    def progress(self, snapshot):
+        if self.target <= 0:
+            return 0.0
+        return self._percent(snapshot.max_level, self.target)
+
+
+class ContinuousPracticeRule(AchievementRule):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.target = int(self.requirements.get("streak_days") or 0)
+
+    def is_met(self, snapshot, test):
+        return bool(self.target) and snapshot.current_streak >= self.target
+
+    def progress(self, snapshot):
+        if self.target <= 0:
+            return 0.0
+        return self._percent(snapshot.current_streak, self.target)
+
+
+class HonorSystemRule(AchievementRule):
+    """Awarded again every `tests_window` tests when none of the window's tests left the app too much."""
+
+    repeatable = True
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        req = self.requirements
+        self.tests_window = int(req.get("tests_window") or 20)
+        self.max_event_ms = int(req.get("max_event_ms") or 15000)
+        self.max_events_per_test = int(req.get("max_outside_events_per_test") or 2)
+        self.max_outside_time_ms_per_test = int(req.get("max_outside_time_ms_per_test") or 30000)
+
+    def is_met(self, snapshot, test):
+        if self.tests_window <= 0 or snapshot.tests_completed < self.tests_window:
+            return False
+        # Only award on boundaries (every `tests_window` tests)
+        if snapshot.tests_completed % self.tests_window != 0:
+            return False
+
+        for t in snapshot.tests[: self.tests_window]:
+            # Grace is applied in frontend; still guard here.
+            if (
+                not t.meta_is_valid
+                or t.max_outside_event_ms >= self.max_event_ms
+                or t.outside_events >= self.max_events_per_test
+                or t.outside_time_ms >= self.max_outside_time_ms_per_test
+            ):
+                return False
+        return True
+
+
+RULE_CLASSES = {
+    "volume_practice": VolumePracticeRule,
+    "comeback_rewards": ComebackRule,
+    "speed_and_accuracy": SpeedAndAccuracyRule,
+    "mastery_level": MasteryLevelRule,
+    "level_ups": LevelUpRule,
+    "continuous_practice": ContinuousPracticeRule,
+    "honor_system": HonorSystemRule,
+}
+
+
+def parse_requirements(raw) -> Dict[str, Any]:
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw) or {}
+    except Exception:
+        return {}
+
+
+# endregion Rules
+
+
+# region Catalog
+
+
+class CompiledAchievementCatalog:
+    def __init__(self, version: int, rules: List[AchievementRule], has_requirements: Dict[int, bool]):
+        self.version = version
+        self.rules = rules
+        self.by_id = {rule.achievement_id: rule for rule in rules}
+        self.by_class: Dict[str, List[AchievementRule]] = {}
+        for rule in rules:
+            self.by_class.setdefault(rule.achievement_class, []).append(rule)
+        self._has_requirements = has_requirements
+
+    def progress(self, achievement_id: int, snapshot: StudentMetricsSnapshot) -> float:
+        rule = self.by_id.get(achievement_id)
+        if not rule or not self._has_requirements.get(achievement_id):
+            return 0.0
+        return rule.progress(snapshot)
+
+    def evaluate(
+        self,
+        snapshot: StudentMetricsSnapshot,
+        test: TestMetrics,
+        skip_ids=(),
+        achievement_classes: Optional[List[str]] = None,
+    ) -> List[AchievementRule]:
+        """
+        Rules met by `test`, ignoring achievements in `skip_ids` (already earned,
+        non-repeatable). `achievement_classes` limits evaluation to those classes.
+        """
+        if achievement_classes is None:
+            rules = self.rules
+        else:
+            rules = [rule for aclass in achievement_classes for rule in self.by_class.get(aclass, [])]
+        return [
+            rule
+            for rule in rules
+            if rule.achievement_id not in skip_ids and rule.is_met(snapshot, test)
+        ]
+
+
+def compile_catalog(rows, version: int = 0) -> CompiledAchievementCatalog:
+    """Compile (id, name, achievement_class, requirements) rows."""
+    rules, has_requirements = [], {}
+    for achievement_id, name, achievement_class, raw_requirements in rows:
+        requirements = parse_requirements(raw_requirements)
+        rule_class = RULE_CLASSES.get(achievement_class, AchievementRule)
+        rules.append(rule_class(achievement_id, name, achievement_class, requirements))
+        has_requirements[achievement_id] = bool(requirements)
+    return CompiledAchievementCatalog(version, rules, has_requirements)
+
+
+def get_compiled_catalog() -> CompiledAchievementCatalog:
+    """The compiled rules for the current catalog; recompiled only when the achievement generation moves."""
+    from app.app_admin.catalog import reference_catalog
+
+    def _compile():
+        achievements = reference_catalog.achievements()
+        rows = [
+            (a.id, a.name, a.achievement_class, a.requirements)
+            for a in achievements.values()
+            if not a.is_deleted
+        ]
+        return compile_catalog(rows, versioned_cache.version(CacheNamespaces.achievement))
+
+    return versioned_cache.get("achievement.rules", CacheNamespaces.achievement, _compile)
+
+
+# endregion Catalog
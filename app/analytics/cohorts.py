@@ -0,0 +1,119 @@
+"""
+Per-student aggregates of a cohort's completed tests.
+
+The school dashboards classify students by their average score or by how many
+tests they took. Instead of loading every test and regrouping it in Python once
+per band, `Cohort.load` asks the database for one row per student (test count,
+score sum, time spent, latest test) with a single GROUP BY, and the band and
+tier counts are then taken over those rows in one pass.
+
+With DASHBOARD_ROLLUP on, the rows are summed from `daily_activity_rollup`
+(one row per student, subject and day) instead of the test table.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from flask import current_app
+
+from app.analytics.operations import rollup_manager
+from app.analytics.time_windows import TimeWindow, window_days
+from app.test.operations import test_manager
+
+
+def rollup_enabled() -> bool:
+    return current_app.config.get("DASHBOARD_ROLLUP", False)
+
+
+def _cohort_rows(student_ids, subject_id=None, windows=None, by_subject=False):
+    if rollup_enabled():
+        windows = [window_days(window) for window in windows] if windows else None
+        return rollup_manager.get_cohort_rows(student_ids, subject_id, windows=windows, by_subject=by_subject)
+    return test_manager.get_cohort_rows(student_ids, subject_id, windows=windows, by_subject=by_subject)
+
+
+class StudentAggregate(NamedTuple):
+    student_id: int
+    tests: int
+    score_sum: float
+    seconds: float
+    last_created_at: Optional[datetime]
+
+    @property
+    def average_score(self) -> float:
+        return self.score_sum / self.tests if self.tests else 0.0
+
+
+def _aggregate(student_id, tests, score_sum, seconds, last_created_at) -> StudentAggregate:
+    # SUM over the Numeric score column comes back as a Decimal
+    return StudentAggregate(student_id, tests, float(score_sum), float(seconds), last_created_at)
+
+
+class Cohort:
+    def __init__(self, aggregates: Iterable[StudentAggregate] = ()):
+        self.students: Dict[int, StudentAggregate] = {
+            aggregate.student_id: aggregate for aggregate in aggregates
+        }
+
+    @classmethod
+    def load(cls, student_ids: List[int], subject_id=None) -> "Cohort":
+        """The students' completed tests, optionally for one subject."""
+        rows = _cohort_rows(student_ids, subject_id=subject_id)
+        return cls(_aggregate(*row) for row in rows)
+
+    @classmethod
+    def load_windows(cls, student_ids: List[int], windows: List[TimeWindow], subject_id=None) -> List["Cohort"]:
+        """One cohort per time window, in order, from a single range query."""
+        by_window: Dict[int, List[StudentAggregate]] = {index: [] for index in range(len(windows))}
+        for index, *row in _cohort_rows(student_ids, subject_id=subject_id, windows=windows):
+            if index is not None:
+                by_window[index].append(_aggregate(*row))
+        return [cls(by_window[index]) for index in range(len(windows))]
+
+    @classmethod
+    def load_by_subject(cls, student_ids: List[int], subject_id=None) -> Dict[int, "Cohort"]:
+        """One cohort per subject the students have tests in, from a single query."""
+        by_subject: Dict[int, List[StudentAggregate]] = {}
+        for student_id, row_subject_id, *totals in _cohort_rows(
+            student_ids, subject_id=subject_id, by_subject=True
+        ):
+            by_subject.setdefault(row_subject_id, []).append(_aggregate(student_id, *totals))
+        return {key: cls(aggregates) for key, aggregates in by_subject.items()}
+
+    def __bool__(self) -> bool:
+        return bool(self.students)
+
+    @property
+    def tests(self) -> int:
+        return sum(aggregate.tests for aggregate in self.students.values())
+
+    @property
+    def seconds(self) -> float:
+        return sum(aggregate.seconds for aggregate in self.students.values())
+
+    @property
+    def average_score(self) -> float:
+        """Mean score over all of the cohort's tests (not the mean of student averages)."""
+        tests = self.tests
+        if not tests:
+            return 0.0
+        return sum(aggregate.score_sum for aggregate in self.students.values()) / tests
+
+    @property
+    def last_created_at(self) -> Optional[datetime]:
+        latest = [aggregate.last_created_at for aggregate in self.students.values() if aggregate.last_created_at]
+        return max(latest) if latest else None
+
+    def band_counts(self, band_of: Callable[[float], str]) -> Counter:
+        """How many students fall in each band of their average score."""
+        return Counter(band_of(aggregate.average_score) for aggregate in self.students.values())
+
+    def tier_counts(self, thresholds: Dict[str, Tuple[int, int]]) -> Counter:
+        """How many students took between min and max (inclusive) tests, per tier."""
+        counts = Counter()
+        for aggregate in self.students.values():
+            for tier, (minimum, maximum) in thresholds.items():
+                if minimum <= aggregate.tests <= maximum:
+                    counts[tier] += 1
+        return counts
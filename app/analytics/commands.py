@@ -0,0 +1,41 @@
+import click
+from flask.cli import AppGroup
+
+from app.analytics.operations import (
+    integrity_manager,
+    review_manager,
+    rollup_manager,
+    seen_manager,
+    sqo_manager,
+    stats_manager,
+)
+
+
+stats_cli = AppGroup("stats", help="Maintain derived student statistics.")
+
+
+@stats_cli.command("rebuild")
+@click.option("--student-id", "student_ids", type=int, multiple=True, help="Only rebuild these students (repeatable).")
+def rebuild_student_stats(student_ids):
+    """Recompute the student_stats, student_integrity_daily, daily_activity_rollup,
+    student_seen_questions and student_review_item tables."""
+    student_ids = list(student_ids) or None
+    rows = stats_manager.rebuild(student_ids)
+    click.echo(f"Rebuilt {rows} student_stats row(s)")
+    rows = integrity_manager.rebuild(student_ids)
+    click.echo(f"Rebuilt {rows} student_integrity_daily row(s)")
+    rows = rollup_manager.rebuild(student_ids)
+    click.echo(f"Rebuilt {rows} daily_activity_rollup row(s)")
+    # seen questions are derived from student_question_outcome (see backfill-outcomes)
+    rows = seen_manager.rebuild(student_ids)
+    click.echo(f"Rebuilt {rows} student_seen_questions row(s)")
+    pairs = review_manager.rebuild(student_ids)
+    click.echo(f"Replayed review queues for {pairs} student/subject pair(s)")
+
+
+@stats_cli.command("backfill-outcomes")
+@click.option("--student-id", "student_ids", type=int, multiple=True, help="Only backfill these students (repeatable).")
+def backfill_question_outcomes(student_ids):
+    """Write student_question_outcome rows for completed tests marked before the table existed."""
+    tests = sqo_manager.backfill(list(student_ids) or None)
+    click.echo(f"Backfilled question outcomes for {tests} test(s)")
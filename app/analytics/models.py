@@ -2,7 +2,7 @@ from app.extensions import db
 from app._shared.models import BaseModel
 from datetime import datetime, timezone
 
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 
 
 # region Topic and Scores
@@ -75,6 +75,60 @@ class StudentBestSubject(BaseModel):
         }
 
 
+class StudentQuestionOutcome(db.Model):
+    """One row per question of a marked test, so performance profiles don't re-read `test.questions`."""
+
+    __tablename__ = "student_question_outcome"
+
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey("student.id"), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey("subject.id"), nullable=False)
+    test_id = db.Column(db.Integer, db.ForeignKey("test.id"), nullable=False)
+    question_id = db.Column(db.Integer, nullable=False)
+    topic_id = db.Column(db.Integer, nullable=True)
+    level = db.Column(db.Integer, nullable=True)
+    is_correct = db.Column(db.Boolean, nullable=False)
+    answered_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_student_question_outcome_test", "test_id"),
+        Index("idx_student_question_outcome_student_question", "student_id", "question_id"),
+    )
+
+
+class StudentSeenQuestions(db.Model):
+    """Bitmap of the questions a student has been given in a subject (app/analytics/seen_questions.py)."""
+
+    __tablename__ = "student_seen_questions"
+
+    student_id = db.Column(db.Integer, db.ForeignKey("student.id"), primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey("subject.id"), primary_key=True)
+    # question id of bit 0
+    base_id = db.Column(db.Integer, nullable=False, default=0)
+    bitmap = db.Column(db.LargeBinary, nullable=False, default=b"")
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class StudentReviewItem(db.Model):
+    """A missed question scheduled for review (spaced repetition, see StudentReviewQueueManager)."""
+
+    __tablename__ = "student_review_item"
+
+    student_id = db.Column(db.Integer, db.ForeignKey("student.id"), primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey("subject.id"), primary_key=True)
+    question_id = db.Column(db.Integer, primary_key=True)
+    topic_id = db.Column(db.Integer, nullable=True)
+    due_at = db.Column(db.DateTime, nullable=False)
+    # index into StudentReviewQueueManager.INTERVALS_DAYS
+    step = db.Column(db.Integer, nullable=False, default=0)
+    lapses = db.Column(db.Integer, nullable=False, default=0)
+    last_answered_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_student_review_item_due", "student_id", "subject_id", "due_at"),
+    )
+
+
 # endregion Topic and Scores
 
 
@@ -97,3 +151,91 @@ class StudentSession(BaseModel):
 
 
 # endregion Time
+
+
+# region Stats
+class StudentStats(BaseModel):
+    """Running per-student, per-subject totals, maintained when a test is marked."""
+
+    __tablename__ = "student_stats"
+
+    student_id = db.Column(db.Integer, db.ForeignKey("student.id"), primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey("subject.id"), primary_key=True)
+    tests_completed = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    time_spent_seconds = db.Column(db.BigInteger, nullable=False, default=0)
+    last_test_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def average_score(self) -> float:
+        if not self.tests_completed:
+            return 0.0
+        return float(self.score_sum) / self.tests_completed
+
+    def to_json(self):
+        return {
+            "student_id": self.student_id,
+            "subject_id": self.subject_id,
+            "tests_completed": self.tests_completed,
+            "score_sum": float(self.score_sum or 0),
+            "average_score": round(self.average_score, 2),
+            "time_spent_seconds": self.time_spent_seconds,
+            "last_test_at": self.last_test_at,
+        }
+
+
+class StudentIntegrityDaily(BaseModel):
+    """Per-student, per-subject, per-day anti-cheat counters, maintained when a test is marked."""
+
+    __tablename__ = "student_integrity_daily"
+
+    student_id = db.Column(db.Integer, db.ForeignKey("student.id"), primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey("subject.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    tests_completed = db.Column(db.Integer, nullable=False, default=0)
+    # HonorSystemService.evaluate_test_meta(...)["is_suspicious"]
+    suspicious_tests = db.Column(db.Integer, nullable=False, default=0)
+    # outside_time_ms at or over StudentIntegrityManager.OUT_TIME_FLAG_MS
+    out_time_flagged_tests = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyActivityRollup(BaseModel):
+    """Per-day test totals behind the school dashboards, maintained when a test is marked.
+
+    `day` is the local day (ANALYTICS_TIMEZONE) of the test's created_at; `batch_id` is the
+    student's batch when the test was marked. 0 stands for no school / no batch.
+    """
+
+    __tablename__ = "daily_activity_rollup"
+
+    school_id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey("student.id"), primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey("subject.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    test_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    # with score_sum and test_count gives the spread of scores without the raw tests
+    score_sq_sum = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    duration_seconds = db.Column(db.BigInteger, nullable=False, default=0)
+    last_created_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_daily_activity_rollup_student_day", "student_id", "day"),
+    )
+
+
+class AnalyticsResponse(db.Model):
+    """Shared tier of the analytics response cache (app/analytics/response_cache.py)."""
+
+    __tablename__ = "analytics_response"
+
+    # sha1 of (endpoint, school, parameters, school data version, day)
+    cache_key = db.Column(db.String(40), primary_key=True)
+    school_id = db.Column(db.Integer, nullable=False, index=True)
+    version = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+# endregion Stats
@@ -4,12 +4,21 @@ from app.analytics.models import (
     StudentBestSubject,
     StudentSubjectRecommendation,
     StudentSession,
+    StudentStats,
+    StudentIntegrityDaily,
+    StudentQuestionOutcome,
+    StudentSeenQuestions,
+    StudentReviewItem,
+    DailyActivityRollup,
+    AnalyticsResponse,
 )
-from sqlalchemy import func, distinct
+from app.analytics.seen_questions import SeenQuestions
+from app.extensions import db
+from sqlalchemy import and_, func, distinct, or_
 from sqlalchemy.sql import case, func as sqlfunc
 from typing import List, Dict, Union
 
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from logging import info as log_info
 
 
@@ -50,6 +59,19 @@ class StudentTopicScoresManager(BaseManager):
         return new_score
 
     def insert_multiple_student_topic_scores(self, entities: List[Dict], upsert=False):
+        """Write all topic scores for a test, overwriting any already stored for (student, test, topic)."""
+        upserted = self.bulk_upsert(
+            StudentTopicScores,
+            entities,
+            index_elements=["student_id", "test_id", "topic_id"],
+            update_columns=["subject_id", "score_acquired"],
+        )
+        if upserted is not None:
+            saved = [entity.to_json() for entity in upserted]
+            self.commit()
+            return saved
+
+        # no ON CONFLICT on this database: check each row
         to_check = [StudentTopicScores(**entity) for entity in entities]
         to_save = []
         for entity in to_check:
@@ -249,6 +271,273 @@ class StudentTopicScoresManager(BaseManager):
         return round(float(average_score), 2) if average_score is not None else 0.0
     
 
+class StudentQuestionOutcomeManager(BaseManager):
+    @staticmethod
+    def outcome_rows(test_id, student_id, subject_id, finished_on, questions) -> List[Dict]:
+        """One row per question of a marked test's `questions` JSON (either storage format)."""
+        from app.test.question_snapshots import question_items
+
+        answered_at = _naive_utc(finished_on)
+        return [
+            {
+                "student_id": student_id,
+                "subject_id": subject_id,
+                "test_id": test_id,
+                "question_id": question["id"],
+                "topic_id": question.get("topic_id"),
+                "level": question.get("level"),
+                "is_correct": question.get("student_answer") == question.get("correct_answer"),
+                "answered_at": answered_at,
+            }
+            for question in question_items(questions)
+            if isinstance(question, dict) and question.get("id") is not None
+        ]
+
+    def record_test(self, test) -> None:
+        """Replace the test's outcome rows with its marked questions. Joins the caller's transaction."""
+        StudentQuestionOutcome.query.filter_by(test_id=test.id).delete(synchronize_session=False)
+        self.bulk_insert(
+            StudentQuestionOutcome,
+            self.outcome_rows(test.id, test.student_id, test.subject_id, test.finished_on, test.questions),
+        )
+        self.commit()
+
+    def select_outcomes(self, student_id, test_ids):
+        """(question_id, topic_id, level, is_correct, answered_at) for `test_ids`, newest first.
+
+        `test_ids` can be a list or a select of test ids.
+        """
+        return (
+            db.session.query(
+                StudentQuestionOutcome.question_id,
+                StudentQuestionOutcome.topic_id,
+                StudentQuestionOutcome.level,
+                StudentQuestionOutcome.is_correct,
+                StudentQuestionOutcome.answered_at,
+            )
+            .filter(
+                StudentQuestionOutcome.student_id == student_id,
+                StudentQuestionOutcome.test_id.in_(test_ids),
+            )
+            .order_by(
+                StudentQuestionOutcome.answered_at.desc(),
+                StudentQuestionOutcome.test_id.desc(),
+                StudentQuestionOutcome.id,
+            )
+            .all()
+        )
+
+    def backfill(self, student_ids: List[int] = None, batch_size: int = 500) -> int:
+        """Write outcome rows for completed tests that don't have any yet. Returns tests backfilled."""
+        from app.test.models import Test
+
+        recorded = db.session.query(StudentQuestionOutcome.test_id)
+        query = db.session.query(
+            Test.id,
+            Test.student_id,
+            Test.subject_id,
+            Test.finished_on,
+            Test.questions,
+        ).filter(
+            Test.is_completed == True,
+            Test.is_deleted == False,
+            ~Test.id.in_(recorded),
+        )
+        if student_ids:
+            query = query.filter(Test.student_id.in_(student_ids))
+
+        # ids first, so the inserts below don't disturb the streamed query
+        test_ids = [row.id for row in query.with_entities(Test.id).order_by(Test.id)]
+        for start in range(0, len(test_ids), batch_size):
+            batch = test_ids[start:start + batch_size]
+            rows = []
+            for test_id, student_id, subject_id, finished_on, questions in query.filter(Test.id.in_(batch)):
+                rows.extend(self.outcome_rows(test_id, student_id, subject_id, finished_on, questions))
+            self.bulk_insert(StudentQuestionOutcome, rows)
+            self.commit()
+        return len(test_ids)
+
+
+class StudentSeenQuestionsManager(BaseManager):
+    def get(self, student_id, subject_id) -> SeenQuestions:
+        row = (
+            db.session.query(StudentSeenQuestions.base_id, StudentSeenQuestions.bitmap)
+            .filter_by(student_id=student_id, subject_id=subject_id)
+            .first()
+        )
+        return SeenQuestions(row.base_id, row.bitmap) if row else SeenQuestions()
+
+    def add(self, student_id, subject_id, question_ids) -> None:
+        """Mark `question_ids` as seen. Joins the caller's transaction."""
+        question_ids = [qid for qid in question_ids if qid is not None]
+        if not question_ids:
+            return
+
+        key = {"student_id": student_id, "subject_id": subject_id}
+        stmt = self.dialect_insert(StudentSeenQuestions)
+        if stmt is not None:
+            # create the row if needed, then lock it for the read-modify-write below
+            db.session.execute(
+                stmt.values(base_id=0, bitmap=b"", **key).on_conflict_do_nothing(
+                    index_elements=["student_id", "subject_id"]
+                )
+            )
+        row = StudentSeenQuestions.query.filter_by(**key).with_for_update().first()
+        if row is None:
+            row = StudentSeenQuestions(base_id=0, bitmap=b"", **key)
+            db.session.add(row)
+
+        seen = SeenQuestions(row.base_id, row.bitmap)
+        seen.update(question_ids)
+        row.base_id, row.bitmap = seen.base, bytes(seen.bits)
+        self.commit()
+
+    def record_test(self, test) -> None:
+        """Mark the questions of a marked test as seen. Joins the caller's transaction."""
+        from app.test.question_snapshots import question_items
+
+        self.add(
+            test.student_id,
+            test.subject_id,
+            [question.get("id") for question in question_items(test.questions) if isinstance(question, dict)],
+        )
+
+    def rebuild(self, student_ids: List[int] = None) -> int:
+        """Recompute the bitmaps from student_question_outcome. Returns rows written."""
+        query = db.session.query(
+            StudentQuestionOutcome.student_id,
+            StudentQuestionOutcome.subject_id,
+            StudentQuestionOutcome.question_id,
+        ).distinct()
+        delete_query = StudentSeenQuestions.query
+        if student_ids:
+            query = query.filter(StudentQuestionOutcome.student_id.in_(student_ids))
+            delete_query = delete_query.filter(StudentSeenQuestions.student_id.in_(student_ids))
+
+        bitmaps: Dict = {}
+        for student_id, subject_id, question_id in query.yield_per(1000):
+            bitmaps.setdefault((student_id, subject_id), SeenQuestions()).add(question_id)
+
+        delete_query.delete(synchronize_session=False)
+        db.session.add_all(
+            StudentSeenQuestions(
+                student_id=student_id, subject_id=subject_id, base_id=seen.base, bitmap=bytes(seen.bits)
+            )
+            for (student_id, subject_id), seen in bitmaps.items()
+        )
+        self.commit()
+        return len(bitmaps)
+
+
+class StudentReviewQueueManager(BaseManager):
+    # days until the next review at each step: a miss goes back to step 0, a correct
+    # review moves one step on, and a correct answer at the last step leaves the queue
+    INTERVALS_DAYS = (1, 3, 7, 16, 35)
+
+    def apply_outcomes(self, student_id, subject_id, outcomes) -> None:
+        """Reschedule from `(question_id, topic_id, is_correct, answered_at)` tuples, oldest first.
+
+        Joins the caller's transaction.
+        """
+        outcomes = list(outcomes)
+        if not outcomes:
+            return
+
+        items = {
+            item.question_id: item
+            for item in StudentReviewItem.query.filter(
+                StudentReviewItem.student_id == student_id,
+                StudentReviewItem.subject_id == subject_id,
+                StudentReviewItem.question_id.in_({outcome[0] for outcome in outcomes}),
+            )
+        }
+        graduated = {}
+        for question_id, topic_id, is_correct, answered_at in outcomes:
+            item = items.get(question_id)
+            if is_correct:
+                if item is None:
+                    continue
+                item.step += 1
+                if item.step >= len(self.INTERVALS_DAYS):
+                    graduated[question_id] = items.pop(question_id)
+                    continue
+            else:
+                # a miss after graduating reuses the pending row rather than delete + insert
+                item = item or graduated.pop(question_id, None)
+                if item is None:
+                    item = StudentReviewItem(
+                        student_id=student_id, subject_id=subject_id, question_id=question_id, lapses=0
+                    )
+                    db.session.add(item)
+                items[question_id] = item
+                item.step = 0
+                item.lapses += 1
+            item.topic_id = topic_id
+            item.last_answered_at = answered_at
+            item.due_at = answered_at + timedelta(days=self.INTERVALS_DAYS[item.step])
+
+        for item in graduated.values():
+            if item in db.session.new:
+                db.session.expunge(item)
+            else:
+                db.session.delete(item)
+        self.commit()
+
+    def record_test(self, test) -> None:
+        """Reschedule the questions of a newly marked test. Joins the caller's transaction."""
+        rows = StudentQuestionOutcomeManager.outcome_rows(
+            test.id, test.student_id, test.subject_id, test.finished_on, test.questions
+        )
+        answered_at = _naive_utc(test.finished_on) or datetime.utcnow()
+        self.apply_outcomes(
+            test.student_id,
+            test.subject_id,
+            [(row["question_id"], row["topic_id"], row["is_correct"], answered_at) for row in rows],
+        )
+
+    def next_due(self, student_id, subject_id, limit, now=None) -> List[int]:
+        """Ids of up to `limit` questions due for review, most overdue first."""
+        now = _naive_utc(now) or datetime.utcnow()
+        rows = (
+            db.session.query(StudentReviewItem.question_id)
+            .filter(
+                StudentReviewItem.student_id == student_id,
+                StudentReviewItem.subject_id == subject_id,
+                StudentReviewItem.due_at <= now,
+            )
+            .order_by(StudentReviewItem.due_at)
+            .limit(limit)
+        )
+        return [question_id for (question_id,) in rows]
+
+    def rebuild(self, student_ids: List[int] = None) -> int:
+        """Replay student_question_outcome into the queue. Returns (student, subject) pairs replayed."""
+        query = db.session.query(
+            StudentQuestionOutcome.student_id,
+            StudentQuestionOutcome.subject_id,
+            StudentQuestionOutcome.question_id,
+            StudentQuestionOutcome.topic_id,
+            StudentQuestionOutcome.is_correct,
+            StudentQuestionOutcome.answered_at,
+        ).filter(StudentQuestionOutcome.answered_at.isnot(None))
+        delete_query = StudentReviewItem.query
+        if student_ids:
+            query = query.filter(StudentQuestionOutcome.student_id.in_(student_ids))
+            delete_query = delete_query.filter(StudentReviewItem.student_id.in_(student_ids))
+
+        histories: Dict = {}
+        for student_id, subject_id, *outcome in query.order_by(
+            StudentQuestionOutcome.answered_at, StudentQuestionOutcome.id
+        ):
+            histories.setdefault((student_id, subject_id), []).append(tuple(outcome))
+
+        with self.unit_of_work():
+            delete_query.delete(synchronize_session=False)
+            for (student_id, subject_id), outcomes in histories.items():
+                self.apply_outcomes(student_id, subject_id, outcomes)
+        return len(histories)
+
+
 class StudentBestSubjectManager(BaseManager):
     def select_student_best(
         self, student_id, subject_id=None, include_archived=False
@@ -282,6 +571,25 @@ class StudentBestSubjectManager(BaseManager):
         self.save_multiple(to_save)
         return [entity.to_json() for entity in to_save]
 
+    def select_active_best_levels(self, student_id, subject_id):
+        """(id, topic_id, proficiency_level) of the unarchived best topics."""
+        return (
+            StudentBestSubject.query.with_entities(
+                StudentBestSubject.id,
+                StudentBestSubject.topic_id,
+                StudentBestSubject.proficiency_level,
+            )
+            .filter_by(student_id=student_id, subject_id=subject_id, is_archived=False)
+            .order_by(StudentBestSubject.id)
+            .all()
+        )
+
+    def archive_bests(self, ids: List[int]) -> None:
+        if ids:
+            StudentBestSubject.query.filter(StudentBestSubject.id.in_(ids)).update(
+                {"is_archived": True}, synchronize_session=False
+            )
+
 
 class StudentSubjectRecommendationManager(BaseManager):
     def select_student_recommendations(
@@ -316,6 +624,25 @@ class StudentSubjectRecommendationManager(BaseManager):
         self.save_multiple(to_save)
         return [entity.to_json() for entity in to_save]
 
+    def select_active_recommendation_levels(self, student_id, subject_id):
+        """(id, topic_id, recommendation_level) of the unarchived recommendations."""
+        return (
+            StudentSubjectRecommendation.query.with_entities(
+                StudentSubjectRecommendation.id,
+                StudentSubjectRecommendation.topic_id,
+                StudentSubjectRecommendation.recommendation_level,
+            )
+            .filter_by(student_id=student_id, subject_id=subject_id, is_archived=False)
+            .order_by(StudentSubjectRecommendation.id)
+            .all()
+        )
+
+    def archive_recommendations(self, ids: List[int]) -> None:
+        if ids:
+            StudentSubjectRecommendation.query.filter(
+                StudentSubjectRecommendation.id.in_(ids)
+            ).update({"is_archived": True}, synchronize_session=False)
+
     def get_topic_performance(self, student_id=None, subject_id=None, school_id=None) -> List[Dict]:
         query = StudentSubjectRecommendation.query.with_entities(
             StudentSubjectRecommendation.topic_id,
@@ -453,7 +780,485 @@ class StudentSessionManager(BaseManager):
 # endregion session
 
 
+# region Stats
+
+
+def _naive_utc(value):
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _time_spent_seconds(started_on, finished_on) -> int:
+    if not started_on or not finished_on:
+        return 0
+    return max(0, int((_naive_utc(finished_on) - _naive_utc(started_on)).total_seconds()))
+
+
+class StudentStatsManager(BaseManager):
+    def get_stats(self, student_id, subject_id=None) -> List[StudentStats]:
+        query = StudentStats.query.filter_by(student_id=student_id)
+        if subject_id:
+            query = query.filter_by(subject_id=subject_id)
+        return query.all()
+
+    def get_tests_completed(self, student_id, subject_id=None) -> int:
+        query = db.session.query(func.coalesce(func.sum(StudentStats.tests_completed), 0)).filter(
+            StudentStats.student_id == student_id
+        )
+        if subject_id:
+            query = query.filter(StudentStats.subject_id == subject_id)
+        return int(query.scalar() or 0)
+
+    def get_average_score(self, student_id, subject_id=None) -> float:
+        query = db.session.query(
+            func.sum(StudentStats.score_sum), func.sum(StudentStats.tests_completed)
+        ).filter(StudentStats.student_id == student_id)
+        if subject_id:
+            query = query.filter(StudentStats.subject_id == subject_id)
+        score_sum, count = query.one()
+        return float(score_sum) / count if count else 0.0
+
+    def record_test(self, test) -> None:
+        """Fold a newly completed test into its (student, subject) row. Joins the caller's transaction."""
+        values = {
+            "student_id": test.student_id,
+            "subject_id": test.subject_id,
+            "tests_completed": 1,
+            "score_sum": float(test.score_acquired or 0),
+            "time_spent_seconds": _time_spent_seconds(test.started_on, test.finished_on),
+            "last_test_at": _naive_utc(test.finished_on),
+        }
+
+        stmt = self.dialect_insert(StudentStats)
+        if stmt is None:
+            # no ON CONFLICT on this database: plain read-modify-write
+            stats = StudentStats.query.get((test.student_id, test.subject_id))
+            if not stats:
+                stats = StudentStats(
+                    student_id=test.student_id,
+                    subject_id=test.subject_id,
+                    tests_completed=0,
+                    score_sum=0,
+                    time_spent_seconds=0,
+                )
+                db.session.add(stats)
+            stats.tests_completed += 1
+            stats.score_sum = float(stats.score_sum) + values["score_sum"]
+            stats.time_spent_seconds += values["time_spent_seconds"]
+            stats.last_test_at = values["last_test_at"]
+            self.commit()
+            return
+
+        # increment in SQL so concurrent submissions can't lose updates
+        table = StudentStats.__table__
+        stmt = stmt.values(is_deleted=False, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.student_id, table.c.subject_id],
+            set_={
+                "tests_completed": table.c.tests_completed + 1,
+                "score_sum": table.c.score_sum + stmt.excluded.score_sum,
+                "time_spent_seconds": table.c.time_spent_seconds + stmt.excluded.time_spent_seconds,
+                "last_test_at": stmt.excluded.last_test_at,
+            },
+        )
+        db.session.execute(stmt)
+        self.commit()
+
+    def rebuild(self, student_ids: List[int] = None) -> int:
+        """Recompute rows from the test table (all students, or just `student_ids`). Returns rows written."""
+        from app.test.models import Test
+
+        query = db.session.query(
+            Test.student_id,
+            Test.subject_id,
+            Test.score_acquired,
+            Test.started_on,
+            Test.finished_on,
+        ).filter(Test.is_completed == True, Test.is_deleted == False)
+        delete_query = StudentStats.query
+        if student_ids:
+            query = query.filter(Test.student_id.in_(student_ids))
+            delete_query = delete_query.filter(StudentStats.student_id.in_(student_ids))
+
+        totals: Dict = {}
+        for student_id, subject_id, score, started_on, finished_on in query.yield_per(1000):
+            row = totals.setdefault(
+                (student_id, subject_id),
+                {"tests_completed": 0, "score_sum": 0.0, "time_spent_seconds": 0, "last_test_at": None},
+            )
+            row["tests_completed"] += 1
+            row["score_sum"] += float(score or 0)
+            row["time_spent_seconds"] += _time_spent_seconds(started_on, finished_on)
+            finished_on = _naive_utc(finished_on)
+            if finished_on and (row["last_test_at"] is None or finished_on > row["last_test_at"]):
+                row["last_test_at"] = finished_on
+
+        delete_query.delete(synchronize_session=False)
+        db.session.add_all(
+            StudentStats(student_id=student_id, subject_id=subject_id, **row)
+            for (student_id, subject_id), row in totals.items()
+        )
+        self.commit()
+        return len(totals)
+
+
+def _outside_time_ms(meta) -> int:
+    """`outside_time_ms` from a test's meta, falling back to the legacy `out_time` key."""
+    if not isinstance(meta, dict):
+        return 0
+    for key in ("outside_time_ms", "out_time"):
+        value = meta.get(key)
+        if value is None:
+            continue
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            continue
+    return 0
+
+
+class StudentIntegrityManager(BaseManager):
+    # tests with at least this much time outside fullscreen count towards the integrity summary
+    OUT_TIME_FLAG_MS = 10000
+
+    def _counts(self, meta, is_suspicious=None) -> Dict:
+        if is_suspicious is None:
+            is_suspicious = bool((meta or {}).get("is_suspicious"))
+        return {
+            "tests_completed": 1,
+            "suspicious_tests": 1 if is_suspicious else 0,
+            "out_time_flagged_tests": 1 if _outside_time_ms(meta) >= self.OUT_TIME_FLAG_MS else 0,
+        }
+
+    def record_test(self, test) -> None:
+        """Count a newly marked test against the day it finished on. Joins the caller's transaction.
+
+        Reads the anti-cheat flags that marking stored in `test.meta`.
+        """
+        finished_on = _naive_utc(test.finished_on) or datetime.utcnow()
+        key = {"student_id": test.student_id, "subject_id": test.subject_id, "day": finished_on.date()}
+        counts = self._counts(test.meta)
+
+        stmt = self.dialect_insert(StudentIntegrityDaily)
+        if stmt is None:
+            row = StudentIntegrityDaily.query.get((key["student_id"], key["subject_id"], key["day"]))
+            if not row:
+                row = StudentIntegrityDaily(
+                    tests_completed=0, suspicious_tests=0, out_time_flagged_tests=0, **key
+                )
+                db.session.add(row)
+            for column, value in counts.items():
+                setattr(row, column, getattr(row, column) + value)
+            self.commit()
+            return
+
+        table = StudentIntegrityDaily.__table__
+        stmt = stmt.values(is_deleted=False, **key, **counts)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.student_id, table.c.subject_id, table.c.day],
+            set_={column: table.c[column] + stmt.excluded[column] for column in counts},
+        )
+        db.session.execute(stmt)
+        self.commit()
+
+    def count_suspicious(self, student_id, since: date, subject_id=None) -> int:
+        """Suspicious tests the student finished on or after `since`."""
+        query = db.session.query(
+            func.coalesce(func.sum(StudentIntegrityDaily.suspicious_tests), 0)
+        ).filter(
+            StudentIntegrityDaily.student_id == student_id,
+            StudentIntegrityDaily.day >= since,
+        )
+        if subject_id:
+            query = query.filter(StudentIntegrityDaily.subject_id == subject_id)
+        return int(query.scalar() or 0)
+
+    def get_daily_counts(self, student_id, subject_id=None) -> List:
+        """(day, tests_completed, out_time_flagged_tests) rows, newest day first, summed over subjects."""
+        query = db.session.query(
+            StudentIntegrityDaily.day,
+            func.sum(StudentIntegrityDaily.tests_completed),
+            func.sum(StudentIntegrityDaily.out_time_flagged_tests),
+        ).filter(StudentIntegrityDaily.student_id == student_id)
+        if subject_id:
+            query = query.filter(StudentIntegrityDaily.subject_id == subject_id)
+        return (
+            query.group_by(StudentIntegrityDaily.day)
+            .order_by(StudentIntegrityDaily.day.desc())
+            .all()
+        )
+
+    def rebuild(self, student_ids: List[int] = None) -> int:
+        """Recompute rows from the test table (all students, or just `student_ids`). Returns rows written."""
+        from app.honor_system.services import HonorSystemService
+        from app.test.models import Test
+
+        honor = HonorSystemService()
+        query = db.session.query(
+            Test.student_id,
+            Test.subject_id,
+            Test.finished_on,
+            Test.meta,
+        ).filter(Test.is_completed == True, Test.is_deleted == False, Test.finished_on.isnot(None))
+        delete_query = StudentIntegrityDaily.query
+        if student_ids:
+            query = query.filter(Test.student_id.in_(student_ids))
+            delete_query = delete_query.filter(StudentIntegrityDaily.student_id.in_(student_ids))
+
+        totals: Dict = {}
+        for student_id, subject_id, finished_on, meta in query.yield_per(1000):
+            counts = self._counts(meta, honor.evaluate_test_meta(meta)["is_suspicious"])
+            row = totals.setdefault(
+                (student_id, subject_id, _naive_utc(finished_on).date()),
+                {"tests_completed": 0, "suspicious_tests": 0, "out_time_flagged_tests": 0},
+            )
+            for column, value in counts.items():
+                row[column] += value
+
+        delete_query.delete(synchronize_session=False)
+        db.session.add_all(
+            StudentIntegrityDaily(student_id=student_id, subject_id=subject_id, day=day, **row)
+            for (student_id, subject_id, day), row in totals.items()
+        )
+        self.commit()
+        return len(totals)
+
+
+class DailyActivityRollupManager(BaseManager):
+    COUNTS = ("test_count", "score_sum", "score_sq_sum", "duration_seconds")
+
+    @staticmethod
+    def current_batch_ids(student_ids: List[int]) -> Dict[int, int]:
+        """student_id -> the newest active batch the student is in (students without one are left out)."""
+        from app.student.models import Batch, student_batches
+
+        query = (
+            db.session.query(student_batches.c.student_id, func.max(Batch.id))
+            .join(Batch, Batch.id == student_batches.c.batch_id)
+            .filter(Batch.status == "active", Batch.is_deleted == False)
+        )
+        if student_ids is not None:
+            query = query.filter(student_batches.c.student_id.in_(student_ids))
+        return dict(query.group_by(student_batches.c.student_id).all())
+
+    @staticmethod
+    def _counts(score, started_on, finished_on) -> Dict:
+        score = float(score or 0)
+        return {
+            "test_count": 1,
+            "score_sum": score,
+            "score_sq_sum": score * score,
+            "duration_seconds": _time_spent_seconds(started_on, finished_on),
+        }
+
+    def record_test(self, test) -> None:
+        """Add a newly completed test to its day's row. Joins the caller's transaction."""
+        from app.analytics.time_windows import local_day
+
+        created_at = _naive_utc(test.created_at) or datetime.utcnow()
+        key = {
+            "school_id": test.school_id or 0,
+            "batch_id": self.current_batch_ids([test.student_id]).get(test.student_id, 0),
+            "student_id": test.student_id,
+            "subject_id": test.subject_id,
+            "day": local_day(created_at),
+        }
+        counts = self._counts(test.score_acquired, test.started_on, test.finished_on)
+
+        stmt = self.dialect_insert(DailyActivityRollup)
+        if stmt is None:
+            row = DailyActivityRollup.query.get(tuple(key.values()))
+            if not row:
+                row = DailyActivityRollup(**key, **{column: 0 for column in self.COUNTS})
+                db.session.add(row)
+            for column, value in counts.items():
+                setattr(row, column, float(getattr(row, column)) + value)
+            row.last_created_at = max(filter(None, [row.last_created_at, created_at]))
+            self.commit()
+            return
+
+        table = DailyActivityRollup.__table__
+        stmt = stmt.values(is_deleted=False, last_created_at=created_at, **key, **counts)
+        set_ = {column: table.c[column] + stmt.excluded[column] for column in counts}
+        set_["last_created_at"] = case(
+            (table.c.last_created_at > stmt.excluded.last_created_at, table.c.last_created_at),
+            else_=stmt.excluded.last_created_at,
+        )
+        stmt = stmt.on_conflict_do_update(index_elements=list(table.primary_key.columns), set_=set_)
+        db.session.execute(stmt)
+        self.commit()
+
+    def get_cohort_rows(self, student_ids: List[int], subject_id=None, windows=None, by_subject=False):
+        """`TestManager.get_cohort_rows` over the rollup: `windows` are half-open (first, after) days."""
+        if not student_ids:
+            return []
+        keys = (
+            [DailyActivityRollup.student_id, DailyActivityRollup.subject_id]
+            if by_subject
+            else [DailyActivityRollup.student_id]
+        )
+        query = DailyActivityRollup.query.filter(DailyActivityRollup.student_id.in_(student_ids))
+        if subject_id:
+            query = query.filter(DailyActivityRollup.subject_id == subject_id)
+        if windows:
+            day = DailyActivityRollup.day
+            query = query.filter(
+                day >= min(first for first, _ in windows), day < max(after for _, after in windows)
+            )
+            keys.insert(
+                0,
+                case(
+                    *((and_(day >= first, day < after), index) for index, (first, after) in enumerate(windows)),
+                    else_=None,
+                ),
+            )
+        return (
+            query.with_entities(
+                *keys,
+                func.sum(DailyActivityRollup.test_count),
+                func.sum(DailyActivityRollup.score_sum),
+                func.sum(DailyActivityRollup.duration_seconds),
+                func.max(DailyActivityRollup.last_created_at),
+            )
+            .group_by(*keys)
+            .all()
+        )
+
+    def get_daily_scores(self, student_ids: List[int], subject_id=None):
+        """(day, test_count, score_sum) summed over the students, oldest day first."""
+        if not student_ids:
+            return []
+        query = db.session.query(
+            DailyActivityRollup.day,
+            func.sum(DailyActivityRollup.test_count),
+            func.sum(DailyActivityRollup.score_sum),
+        ).filter(DailyActivityRollup.student_id.in_(student_ids))
+        if subject_id:
+            query = query.filter(DailyActivityRollup.subject_id == subject_id)
+        return query.group_by(DailyActivityRollup.day).order_by(DailyActivityRollup.day).all()
+
+    def count_tests(self, school_id) -> int:
+        query = db.session.query(func.coalesce(func.sum(DailyActivityRollup.test_count), 0)).filter(
+            DailyActivityRollup.school_id == school_id
+        )
+        return int(query.scalar() or 0)
+
+    @staticmethod
+    def _completed_tests():
+        from app.test.models import Test
+
+        return db.session.query(
+            Test.school_id,
+            Test.student_id,
+            Test.subject_id,
+            Test.score_acquired,
+            Test.started_on,
+            Test.finished_on,
+            Test.created_at,
+        ).filter(Test.is_completed == True, Test.is_deleted == False)
+
+    def _write_rows(self, query, batch_ids: Dict[int, int]) -> int:
+        """Sum the tests `query` yields into one row per day and add them to the session."""
+        from app.analytics.time_windows import local_day, local_timezone
+
+        tz = local_timezone()
+        totals: Dict = {}
+        for school_id, student_id, subject_id, score, started_on, finished_on, created_at in query.yield_per(1000):
+            created_at = _naive_utc(created_at)
+            key = (school_id or 0, batch_ids.get(student_id, 0), student_id, subject_id, local_day(created_at, tz))
+            row = totals.setdefault(key, {column: 0 for column in self.COUNTS})
+            for column, value in self._counts(score, started_on, finished_on).items():
+                row[column] += value
+            if created_at and (row.get("last_created_at") is None or created_at > row["last_created_at"]):
+                row["last_created_at"] = created_at
+
+        db.session.add_all(
+            DailyActivityRollup(**dict(zip(("school_id", "batch_id", "student_id", "subject_id", "day"), key)), **row)
+            for key, row in totals.items()
+        )
+        return len(totals)
+
+    def refresh_test_day(self, test) -> None:
+        """Re-derive the student's rows for `test`'s subject and day from the test table.
+
+        For a test that was already recorded and has since been marked again with a
+        different score or timing. Joins the caller's transaction.
+        """
+        from app.analytics.time_windows import day_start, local_day
+        from app.test.models import Test
+
+        day = local_day(_naive_utc(test.created_at) or datetime.utcnow())
+        query = self._completed_tests().filter(
+            Test.student_id == test.student_id,
+            Test.subject_id == test.subject_id,
+            Test.created_at >= day_start(day),
+            Test.created_at < day_start(day + timedelta(days=1)),
+        )
+        DailyActivityRollup.query.filter_by(
+            student_id=test.student_id, subject_id=test.subject_id, day=day
+        ).delete(synchronize_session=False)
+        self._write_rows(query, self.current_batch_ids([test.student_id]))
+        self.commit()
+
+    def rebuild(self, student_ids: List[int] = None) -> int:
+        """Recompute rows from the test table (all students, or just `student_ids`). Returns rows written.
+
+        Tests are attributed to each student's current batch.
+        """
+        from app.test.models import Test
+
+        query = self._completed_tests()
+        delete_query = DailyActivityRollup.query
+        if student_ids:
+            query = query.filter(Test.student_id.in_(student_ids))
+            delete_query = delete_query.filter(DailyActivityRollup.student_id.in_(student_ids))
+        batch_ids = self.current_batch_ids(student_ids)
+
+        delete_query.delete(synchronize_session=False)
+        written = self._write_rows(query, batch_ids)
+        self.commit()
+        return written
+
+
+class AnalyticsResponseManager(BaseManager):
+    def get_payload(self, cache_key):
+        row = db.session.get(AnalyticsResponse, cache_key)
+        return row.payload if row else None
+
+    def put(self, cache_key, school_id, version, payload, stale_before) -> None:
+        """Store a response and drop the ones it makes unreachable: the school's older data
+        versions, and every school's responses created before `stale_before` (the start of
+        the local day, which is part of the key)."""
+        AnalyticsResponse.query.filter(
+            or_(
+                and_(AnalyticsResponse.school_id == school_id, AnalyticsResponse.version < version),
+                AnalyticsResponse.created_at < stale_before,
+            )
+        ).delete(synchronize_session=False)
+        values = {"cache_key": cache_key, "school_id": school_id, "version": version, "payload": payload}
+        stmt = self.dialect_insert(AnalyticsResponse)
+        if stmt is None:
+            db.session.merge(AnalyticsResponse(**values))
+        else:
+            # another worker may have stored the same response meanwhile
+            db.session.execute(
+                stmt.values(created_at=datetime.utcnow(), **values).on_conflict_do_nothing()
+            )
+        self.commit()
+
+
+# endregion Stats
+
+
 sts_manager = StudentTopicScoresManager()
+sqo_manager = StudentQuestionOutcomeManager()
+seen_manager = StudentSeenQuestionsManager()
+review_manager = StudentReviewQueueManager()
 sbs_manager = StudentBestSubjectManager()
 ssr_manager = StudentSubjectRecommendationManager()
 ssm_manager = StudentSessionManager()
+stats_manager = StudentStatsManager()
+integrity_manager = StudentIntegrityManager()
+rollup_manager = DailyActivityRollupManager()
+response_manager = AnalyticsResponseManager()
@@ -76,17 +76,17 @@ class RemarksAnalyzer(object):
 
     @staticmethod
     def add_remarks_to_test(new_test, old_test):
-        # NOTE: Look at the route that saves a test, we need to do things in
-        # in compounding mode or the metadata will be overriden
+        # merge into the existing meta so marking stats, anti-cheat metrics and
+        # topic analytics written by earlier steps survive
         new_score = new_test.score_acquired
         old_score = old_test.score_acquired if old_test else -1
         remark = RemarksAnalyzer.determine_percentage_change(
             new_score, old_score
         ) + RemarksAnalyzer.determine_remarks(new_score)
 
-        meta = {}
-        meta["out_time"] = new_test.meta.get("out_time", 0)
-        meta["topic_analytics"] = new_test.meta.get("topic_analytics", {})
+        meta = dict(new_test.meta or {})
+        meta.setdefault("out_time", 0)
+        meta.setdefault("topic_analytics", {})
         meta["remarks"] = remark
         new_test.meta = meta
         new_test.save()
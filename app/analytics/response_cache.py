@@ -0,0 +1,180 @@
+"""
+Response cache for the school analytics endpoints.
+
+A school's dashboards only change when one of its tests is marked or its
+students or batches change, so `analytics_responses.cached(endpoint)` keeps
+each response keyed by (endpoint, school, query parameters, school data
+version, local day). The data version is a `cache_version` row per school
+(`school:<id>`, see app/_shared/cache.py) that those writes bump through
+`invalidate_school`; the day is part of the key so "this week" style figures
+roll over without a write.
+
+Responses are looked up in the stores named by ANALYTICS_RESPONSE_CACHE, in
+order: "memory" is a per-worker LRU of ANALYTICS_RESPONSE_CACHE_SIZE entries,
+"database" the `analytics_response` table shared by every worker. A hit in a
+slower store is copied into the faster ones. An empty setting turns the cache
+off. Storing a response purges the table rows no key can reach any more: the
+school's older versions and every row from before the local day.
+
+Every response carries `X-Cache: hit-<store>`, `miss` or `bypass`; send
+`X-Cache-Bypass: 1` to recompute (and re-store) a response. Per-worker
+counters are served by GET /analytics/cache-metrics.
+"""
+
+import hashlib
+import json
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from flask import current_app, jsonify, request
+
+from app._shared.cache import CacheNamespaces, versioned_cache
+from app._shared.services import get_current_user
+from app.analytics.operations import response_manager
+from app.analytics.time_windows import day_start, local_day
+
+
+BYPASS_HEADER = "X-Cache-Bypass"
+STATUS_HEADER = "X-Cache"
+DEFAULT_STORES = ("memory", "database")
+DEFAULT_SIZE = 1024
+
+
+def school_namespace(school_id) -> str:
+    return f"{CacheNamespaces.school}:{school_id}"
+
+
+def _today():
+    return local_day(datetime.now(timezone.utc))
+
+
+class LRUStore:
+    name = "memory"
+
+    def __init__(self, max_entries: int = DEFAULT_SIZE):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        payload = self.entries.get(key)
+        if payload is not None:
+            self.entries.move_to_end(key)
+        return payload
+
+    def set(self, key: str, payload: Any, school_id: int, version: int) -> None:
+        self.entries[key] = payload
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class DatabaseStore:
+    name = "database"
+
+    def get(self, key: str) -> Optional[Any]:
+        return response_manager.get_payload(key)
+
+    def set(self, key: str, payload: Any, school_id: int, version: int) -> None:
+        response_manager.put(key, school_id, version, payload, stale_before=day_start(_today()))
+
+
+STORES = {"memory": LRUStore, "database": DatabaseStore}
+
+
+class _ResponseCacheState:
+    def __init__(self, stores: List):
+        self.stores = stores
+        self.metrics = Counter()
+
+
+class AnalyticsResponseCache:
+    extension_key = "analytics_response_cache"
+
+    def _state(self) -> _ResponseCacheState:
+        state = current_app.extensions.get(self.extension_key)
+        if state is None:
+            stores = []
+            for name in current_app.config.get("ANALYTICS_RESPONSE_CACHE", DEFAULT_STORES):
+                if name == "memory":
+                    size = current_app.config.get("ANALYTICS_RESPONSE_CACHE_SIZE", DEFAULT_SIZE)
+                    stores.append(LRUStore(size))
+                else:
+                    stores.append(STORES[name]())
+            state = current_app.extensions[self.extension_key] = _ResponseCacheState(stores)
+        return state
+
+    @staticmethod
+    def key(endpoint: str, school_id, params: Dict, version: int) -> str:
+        day = _today().isoformat()
+        raw = json.dumps([endpoint, school_id, version, day, params], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _lookup(self, state: _ResponseCacheState, key: str, school_id, version: int):
+        for index, store in enumerate(state.stores):
+            payload = store.get(key)
+            if payload is None:
+                continue
+            for faster in state.stores[:index]:
+                faster.set(key, payload, school_id, version)
+            return store.name, payload
+        return None, None
+
+    def cached(self, endpoint: str):
+        """Cache a school analytics view; apply it under `token_auth`, and the view's
+        `query_data` (plus the caller's school) must be all its response depends on."""
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                state = self._state()
+                if not state.stores:
+                    return view(*args, **kwargs)
+
+                school_id = get_current_user()["school_id"]
+                version = versioned_cache.version(school_namespace(school_id))
+                key = self.key(endpoint, school_id, kwargs.get("query_data") or {}, version)
+
+                bypass = bool(request.headers.get(BYPASS_HEADER))
+                if not bypass:
+                    store_name, payload = self._lookup(state, key, school_id, version)
+                    if store_name:
+                        state.metrics[f"hit_{store_name}"] += 1
+                        response = jsonify(payload)
+                        response.headers[STATUS_HEADER] = f"hit-{store_name}"
+                        return response
+
+                response = view(*args, **kwargs)
+                state.metrics["bypass" if bypass else "miss"] += 1
+                response.headers[STATUS_HEADER] = "bypass" if bypass else "miss"
+                if response.status_code == 200:
+                    payload = response.get_json()
+                    for store in state.stores:
+                        store.set(key, payload, school_id, version)
+                return response
+
+            return wrapper
+
+        return decorator
+
+    def invalidate_school(self, school_id) -> None:
+        """Drop every cached response of the school. Joins the caller's transaction."""
+        if school_id is not None:
+            versioned_cache.bump(school_namespace(school_id))
+
+    def metrics(self) -> Dict:
+        state = self._state()
+        hits = {store.name: state.metrics[f"hit_{store.name}"] for store in state.stores}
+        lookups = sum(hits.values()) + state.metrics["miss"]
+        return {
+            "stores": [store.name for store in state.stores],
+            "hits": hits,
+            "misses": state.metrics["miss"],
+            "bypasses": state.metrics["bypass"],
+            "hit_rate": round(sum(hits.values()) / lookups, 4) if lookups else 0.0,
+            "memory_entries": sum(len(store.entries) for store in state.stores if isinstance(store, LRUStore)),
+        }
+
+
+analytics_responses = AnalyticsResponseCache()
@@ -7,11 +7,12 @@ from app._shared.services import get_current_user
 
 from app.analytics.schemas import Responses, Requests
 from app.analytics.operations import ssm_manager, ssr_manager, sts_manager
+from app.analytics.response_cache import analytics_responses
 from app.analytics.services import analytics_service
 
 
 from app._shared.api_errors import permissioned_denied
-from app.app_admin.operations import topic_manager, subject_manager
+from app.app_admin.catalog import reference_catalog
 from app.student.operations import student_manager, batch_manager
 
 analytics = APIBlueprint("analytics", __name__)
@@ -47,6 +48,7 @@ def _verify_batch_access(batch_id):
 @analytics.output(Responses.PracticeRateDataSchema)
 @token_auth([UserTypes.school_admin, UserTypes.staff])
 @require_params_by_usertype({UserTypes.staff: ["batch_id", "subject_id"]})
+@analytics_responses.cached("practice-rate")
 def practice_rate(query_data):
     if not _verify_batch_access(query_data.get("batch_id")):
         return permissioned_denied("You do not have permission to view this batch.")
@@ -60,6 +62,7 @@ def practice_rate(query_data):
 @analytics.output(Responses.PerformanceDistributionDataSchema)
 @token_auth([UserTypes.school_admin, UserTypes.staff])
 @require_params_by_usertype({UserTypes.staff: ["batch_id", "subject_id"]})
+@analytics_responses.cached("performance-distribution")
 def performance_distribution(query_data):
     if not _verify_batch_access(query_data.get("batch_id")):
         return permissioned_denied("You do not have permission to view this batch.")
@@ -73,6 +76,7 @@ def performance_distribution(query_data):
 @analytics.output(Responses.SubjectPerformanceDataSchema)
 @token_auth([UserTypes.school_admin, UserTypes.staff])
 @require_params_by_usertype({UserTypes.staff: ["batch_id", "subject_id"]})
+@analytics_responses.cached("subject-performance")
 def subject_performance(query_data):
     if not _verify_batch_access(query_data.get("batch_id")):
         return permissioned_denied("You do not have permission to view this batch.")
@@ -86,6 +90,7 @@ def subject_performance(query_data):
 @analytics.output(Responses.RecentTestActivitiesSchema)
 @token_auth([UserTypes.school_admin, UserTypes.staff])
 @require_params_by_usertype({UserTypes.staff: ["batch_id", "subject_id"]})
+@analytics_responses.cached("recent-tests-activities")
 def recent_tests_activities(query_data):
     if not _verify_batch_access(query_data.get("batch_id")):
         return permissioned_denied("You do not have permission to view this batch.")
@@ -99,6 +104,7 @@ def recent_tests_activities(query_data):
 @analytics.output(Responses.ProficiencyDistributionDataSchema)
 @token_auth([UserTypes.school_admin, UserTypes.staff])
 @require_params_by_usertype({UserTypes.staff: ["batch_id", "subject_id"]})
+@analytics_responses.cached("proficiency-distribution")
 def proficiency_distribution(query_data):
     if not _verify_batch_access(query_data.get("batch_id")):
         return permissioned_denied("You do not have permission to view this batch.")
@@ -112,6 +118,7 @@ def proficiency_distribution(query_data):
 @analytics.output(Responses.AverageScoreTrendSchema)
 @token_auth([UserTypes.school_admin, UserTypes.staff])
 @require_params_by_usertype({UserTypes.staff: ["batch_id", "subject_id"]})
+@analytics_responses.cached("average-score-trend")
 def average_score_trend(query_data):
     if not _verify_batch_access(query_data.get("batch_id")):
         return permissioned_denied("You do not have permission to view this batch.")
@@ -125,6 +132,7 @@ def average_score_trend(query_data):
 @analytics.output(Responses.PerformanceGeneralDataSchema)
 @token_auth([UserTypes.school_admin, UserTypes.staff])
 @require_params_by_usertype({UserTypes.staff: ["batch_id"]})
+@analytics_responses.cached("performance-general")
 def performance_general(query_data):
     if not _verify_batch_access(query_data.get("batch_id")):
         return permissioned_denied("You do not have permission to view this batch.")
@@ -174,6 +182,12 @@ def performance_topics(query_data):
     )
 
 
+@analytics.get("/analytics/cache-metrics")
+@token_auth([UserTypes.admin])
+def cache_metrics():
+    return success_response(data=analytics_responses.metrics())
+
+
 @analytics.get('/analytics/<student_id>/performance-indicators')
 @analytics.input(Requests.AnalyticsQuerySchema, location="query")
 @analytics.output(Responses.PerformanceIndicatorsDataSchema)
@@ -403,8 +417,8 @@ def topic_performance(query_data):
 
     performance = [
         {
-            "topic_name": topic_manager.get_topic_by_id(topic_id).name,
-            "subject_name": subject_manager.get_subject_by_id(subject_id).name,
+            "topic_name": reference_catalog.topic(topic_id).name,
+            "subject_name": reference_catalog.subject(subject_id).name,
             "low_count": low_count,
             "moderate_count": moderate_count,
             "high_count": high_count,
@@ -509,9 +523,9 @@ def topic_mastery(query_data):
     )
 
     for topic in performance["strong_topics"]:
-        topic["topic_name"] = topic_manager.get_topic_by_id(topic["topic_id"]).name
+        topic["topic_name"] = reference_catalog.topic(topic["topic_id"]).name
 
     for topic in performance["weak_topics"]:
-        topic["topic_name"] = topic_manager.get_topic_by_id(topic["topic_id"]).name
+        topic["topic_name"] = reference_catalog.topic(topic["topic_id"]).name
 
     return success_response(data=performance)
@@ -0,0 +1,51 @@
+"""
+Which questions a student has already been given in a subject.
+
+`SeenQuestions` is a bitmap over question ids: bit `i` stands for question
+`base + i`. Question ids of a subject sit in a dense range, so a student who
+has seen a few hundred questions of a 5,000-question bank costs well under a
+kilobyte, and a membership test is two integer operations. The bitmap is kept
+in `student_seen_questions` and updated when a test is marked
+(StudentSeenQuestionsManager in app/analytics/operations.py).
+"""
+
+from typing import Iterable
+
+
+class SeenQuestions:
+    __slots__ = ("base", "bits")
+
+    def __init__(self, base: int = 0, bits: bytes = b""):
+        # `base` is kept a multiple of 8 so growing downwards only prepends whole bytes
+        self.base = base
+        self.bits = bytearray(bits or b"")
+
+    def __contains__(self, question_id) -> bool:
+        offset = question_id - self.base
+        if offset < 0 or (offset >> 3) >= len(self.bits):
+            return False
+        return bool(self.bits[offset >> 3] & (1 << (offset & 7)))
+
+    def __bool__(self) -> bool:
+        return any(self.bits)
+
+    def __len__(self) -> int:
+        return sum(bin(byte).count("1") for byte in self.bits)
+
+    def add(self, question_id: int) -> None:
+        if not self.bits:
+            self.base = question_id - question_id % 8
+        elif question_id < self.base:
+            new_base = question_id - question_id % 8
+            self.bits[0:0] = bytes((self.base - new_base) >> 3)
+            self.base = new_base
+
+        offset = question_id - self.base
+        if (offset >> 3) >= len(self.bits):
+            self.bits.extend(bytes((offset >> 3) + 1 - len(self.bits)))
+        self.bits[offset >> 3] |= 1 << (offset & 7)
+
+    def update(self, question_ids: Iterable[int]) -> None:
+        for question_id in question_ids:
+            if question_id is not None:
+                self.add(question_id)
@@ -3,16 +3,18 @@ from datetime import datetime, timezone
 from collections import Counter, defaultdict
 from typing import List, Dict, Tuple, Any, Optional, Iterable
 
-import json
-
 from apiflask.exceptions import HTTPError
 
 from app.student.operations import student_manager, batch_manager
 from app.test.operations import test_manager, question_manager
+from app.test.question_snapshots import question_items
 from app.app_admin.operations import subject_manager
 from app.student.operations import student_manager
 from app.app_admin.operations import topic_manager
-from app.analytics.operations import ssr_manager, sts_manager
+from app.app_admin.catalog import reference_catalog
+from app.analytics.cohorts import Cohort, rollup_enabled
+from app.analytics.time_windows import period_windows
+from app.analytics.operations import integrity_manager, rollup_manager, ssr_manager, sts_manager, stats_manager
 from app.achievements.operations import student_has_achievement_manager
 
 
@@ -72,28 +74,6 @@ class AnalyticsService:
                 return band
         return "emerging"
 
-    def get_time_range(self, time_range):
-        if time_range == "this_week":
-            return (
-                datetime.now(timezone.utc).isocalendar().week,
-                datetime.now(timezone.utc).isocalendar().year,
-            )
-        elif time_range == "this_month":
-            return datetime.now(timezone.utc).month, datetime.now(timezone.utc).year
-        elif time_range == "all_time":
-            return None, None
-
-    def get_last_time_range(self, time_range):
-        if time_range == "this_week":
-            return (
-                datetime.now(timezone.utc).isocalendar().week - 1,
-                datetime.now(timezone.utc).isocalendar().year,
-            )
-        elif time_range == "this_month":
-            return datetime.now(timezone.utc).month - 1, datetime.now(timezone.utc).year
-        elif time_range == "all_time":
-            return None, None
-
     def count_in_range(
         self,
         records: List[Dict[str, Any]],
@@ -128,9 +108,10 @@ class AnalyticsService:
     def configure_performance_requirements(
         self, school_id, batch_id, time_range, subject_id=None
     ):
-        week, year = self.get_time_range(time_range)
-        last_week, last_year = self.get_last_time_range(time_range)
+        """(this period's cohort, the previous period's cohort, student ids) for the dashboards.
 
+        For "all_time" there is no previous period and both cohorts are the same.
+        """
         all_students = student_manager.get_active_students_by_school(school_id)
         all_student_ids = [student.id for student in all_students]
 
@@ -144,51 +125,15 @@ class AnalyticsService:
         else:
             student_ids = all_student_ids
 
-        # now get the tests by the subject_id  and student_ids
-        this_tests = test_manager.get_tests_by_student_ids(student_ids)
-
-        if subject_id:
-            this_tests = [test for test in this_tests if test.subject_id == subject_id]
-
-        # filter the tests by the time range
-        if week and year and time_range == "this_week":
-            this_tests = [
-                test
-                for test in this_tests
-                if test.created_at.isocalendar().week == week
-                and test.created_at.isocalendar().year == year
-            ]
-        elif week and year and time_range == "this_month":
-            this_tests = [
-                test
-                for test in this_tests
-                if test.created_at.month == week and test.created_at.year == year
-            ]
-        else:
-            this_tests = this_tests
-
-        # now get the last week or month
-        if last_week and last_year and time_range == "this_week":
-            last_tests = [
-                test
-                for test in this_tests
-                if test.created_at.isocalendar().week == last_week
-                and test.created_at.isocalendar().year == last_year
-            ]
-        elif last_week and last_year and time_range == "this_month":
-            last_tests = [
-                test
-                for test in this_tests
-                if test.created_at.month == last_week
-                and test.created_at.year == last_year
-            ]
-        else:
-            last_tests = this_tests
-
-        if subject_id:
-            last_tests = [test for test in last_tests if test.subject_id == subject_id]
+        current, previous = period_windows(time_range)
+        if previous is None:
+            this_cohort = Cohort.load(student_ids, subject_id=subject_id)
+            return this_cohort, this_cohort, student_ids
 
-        return this_tests, last_tests, student_ids
+        this_cohort, last_cohort = Cohort.load_windows(
+            student_ids, [current, previous], subject_id=subject_id
+        )
+        return this_cohort, last_cohort, student_ids
 
     def get_practice_rate(
         self, school_id: str, batch_id: str, time_range: str, subject_id: str = None
@@ -198,7 +143,7 @@ class AnalyticsService:
         time_range options: 'week', 'month', 'all_time'
         """
         # 1. Fetch data from backend
-        this_tests, last_tests, all_student_ids = self.configure_performance_requirements(
+        this_cohort, last_cohort, all_student_ids = self.configure_performance_requirements(
             school_id, batch_id, time_range, subject_id
         )
 
@@ -216,11 +161,10 @@ class AnalyticsService:
             thresholds = {"minimal": (1, 10), "consistent": (11, 30), "high": (31, 10**6)}
 
         # 3. Current Period Calculation
-        students_practiced_this_period = set(t.student_id for t in this_tests)
-        practiced_number = len(students_practiced_this_period)
+        practiced_number = len(this_cohort.students)
         practiced_percent = round((practiced_number / total_students) * 100, 2)
         
-        tests_per_student = round(len(this_tests) / total_students, 2)
+        tests_per_student = round(this_cohort.tests / total_students, 2)
 
         # 4. Comparison Logic (Excluded for 'all_time')
         comparison = None
@@ -228,9 +172,8 @@ class AnalyticsService:
         change_direction = "same"
 
         if time_range != "all_time":
-            students_practiced_last_period = set(t.student_id for t in last_tests)
             current_rate = practiced_number / total_students
-            previous_rate = len(students_practiced_last_period) / total_students if total_students > 0 else 0.0
+            previous_rate = len(last_cohort.students) / total_students if total_students > 0 else 0.0
 
             if previous_rate > 0:
                 # Relative % change between the two periods
@@ -244,10 +187,10 @@ class AnalyticsService:
                 change_direction = "up"
 
         # 5. Tier Distribution
-        test_counts = Counter(t.student_id for t in this_tests)
+        tier_counts = this_cohort.tier_counts(thresholds)
 
-        def get_tier_stats(min_t: int, max_t: int) -> Dict[str, Any]:
-            count = sum(1 for c in test_counts.values() if min_t <= c <= max_t)
+        def get_tier_stats(tier: str) -> Dict[str, Any]:
+            count = tier_counts[tier]
             return {
                 "number": count,
                 "percent": round((count / total_students) * 100, 2)
@@ -258,9 +201,9 @@ class AnalyticsService:
                 "number": total_students - practiced_number,
                 "percent": round(100 - practiced_percent, 2),
             },
-            "minimal_practice": get_tier_stats(*thresholds["minimal"]),
-            "consistent_practice": get_tier_stats(*thresholds["consistent"]),
-            "high_practice": get_tier_stats(*thresholds["high"]),
+            "minimal_practice": get_tier_stats("minimal"),
+            "consistent_practice": get_tier_stats("consistent"),
+            "high_practice": get_tier_stats("high"),
         }
 
         return {
@@ -296,73 +239,44 @@ class AnalyticsService:
             "total_students": 0,
         }
 
-    def calculate_student_average_performance(
-        self,
-        total_number_of_students: int,
-        tests,
-        performance_band: str,
-    ):
+    def band_distribution(self, total_number_of_students: int, cohort: Cohort):
         """
-        Calculates how many students fall into a given performance band
-        based on their AVERAGE score over the provided tests.
-
-        Args:
-        total_number_of_students (int): Total students in the cohort
-                                        (including those with no tests)
-        tests (list): List of tests within the selected time range/subject
-                        Each test is expected to have .student_id and .score_acquired
-        performance_band (str): Target band
-                                e.g. 'highly_proficient', 'proficient',
-                                'approaching_proficient', 'developing', 'emerging'
+        How many students fall into each performance band by their AVERAGE
+        score over the cohort's tests.
 
         Returns:
-        dict:
-            - count: number of students in that band
-            - percentage: percentage of total students in that band (0–100)
+        dict: band -> {"count": students in the band,
+                       "percentage": share of total_number_of_students (0–100)}
+        Students without tests count towards the total but not into any band.
         """
-        # Guard: no students or no tests → nothing in this band
-        if total_number_of_students == 0 or not tests:
-            return {"count": 0, "percentage": 0.0}
-
-        # Collect scores per student
-        scores_by_student = defaultdict(list)
-        for test in tests:
-            scores_by_student[test.student_id].append(test.score_acquired)
-
-        # Classify each student by their AVERAGE score band
-        number_of_students_in_band = 0
-        for student_id, scores in scores_by_student.items():
-            avg_score = sum(scores) / len(scores)
-            band = self.get_performance_band(avg_score)
-            if band == performance_band:
-                number_of_students_in_band += 1
-
-        percentage_of_students_in_band = (
-            number_of_students_in_band / total_number_of_students
-        ) * 100
-
+        band_counts = cohort.band_counts(self.get_performance_band)
         return {
-            "count": number_of_students_in_band,
-            "percentage": round(percentage_of_students_in_band, 2),
+            band: {
+                "count": band_counts[band],
+                "percentage": (
+                    round(band_counts[band] / total_number_of_students * 100, 2)
+                    if total_number_of_students
+                    else 0.0
+                ),
+            }
+            for band in self.performance_bands
         }
 
     def get_performance_distribution(
         self, school_id, batch_id, time_range, subject_id=None
     ):
-        this_tests, last_tests, all_student_ids = (
+        this_cohort, last_cohort, all_student_ids = (
             self.configure_performance_requirements(
                 school_id, batch_id, time_range, subject_id
             )
         )
 
         # Decide which tests to use based on the time range
-        if time_range == "this_week":
-            tests = this_tests
-        elif time_range == "last_week":
-            tests = last_tests
+        # the previous period only feeds comparisons, never the distribution itself
+        if time_range == "last_week":
+            cohort = last_cohort
         else:
-            # e.g. "this_month", "all_time" → combine
-            tests = this_tests + last_tests
+            cohort = this_cohort
 
         # Subject label
         if subject_id:
@@ -396,32 +310,13 @@ class AnalyticsService:
             }
 
         # --- Average score across tests (0–100) ---
-        if tests:
-            average_score = sum(test.score_acquired for test in tests) / len(tests)
-        else:
-            average_score = 0.0
+        average_score = cohort.average_score
 
         proficiency_percent = round(average_score, 2)
         proficiency_status = self.get_performance_band(average_score)
 
-        # --- Tier distribution (student-based; uses calculate_student_average_performance) ---
-        tier_distribution = {
-            "highly_proficient": self.calculate_student_average_performance(
-                total_students, tests, "highly_proficient"
-            ),
-            "proficient": self.calculate_student_average_performance(
-                total_students, tests, "proficient"
-            ),
-            "approaching_proficient": self.calculate_student_average_performance(
-                total_students, tests, "approaching_proficient"
-            ),
-            "developing": self.calculate_student_average_performance(
-                total_students, tests, "developing"
-            ),
-            "emerging": self.calculate_student_average_performance(
-                total_students, tests, "emerging"
-            ),
-        }
+        # --- Tier distribution (student-based) ---
+        tier_distribution = self.band_distribution(total_students, cohort)
 
         # --- Rollup: At/Above Proficiency vs At Risk (student-based) ---
         # At/Above Proficiency = Highly Proficient + Proficient + Approaching Proficient
@@ -444,16 +339,12 @@ class AnalyticsService:
         )
 
         # --- Average tests and time per student ---
-        if tests:
+        if cohort.tests:
             # average number of tests per student in this cohort
-            avg_tests_per_student = len(tests) / total_students
+            avg_tests_per_student = cohort.tests / total_students
 
             # average time per test in minutes
-            total_seconds = sum(
-                (abs(test.finished_on - test.started_on)).total_seconds() for test in tests
-            )
-
-            avg_time_minutes = (total_seconds / len(tests)) / 60.0
+            avg_time_minutes = (cohort.seconds / cohort.tests) / 60.0
         else:
             avg_tests_per_student = 0.0
             avg_time_minutes = 0.0
@@ -483,7 +374,7 @@ class AnalyticsService:
             "proficiency_status": proficiency_status,
             "tier_distribution": tier_distribution,
             "summary_distribution": summary_distribution,
-            "last_updated": self.most_recent_created_at(tests),
+            "last_updated": cohort.last_created_at,
         }
 
     from collections import defaultdict
@@ -502,25 +393,23 @@ class AnalyticsService:
         if not student_ids:
             return []
 
-        # 2. Get all tests for these students (optionally filtered by subject)
-        tests = test_manager.get_tests_by_student_ids(student_ids)
-        if subject_id:
-            tests = [test for test in tests if test.subject_id == subject_id]
+        # 2. Per-student totals for each subject (optionally just one subject)
+        cohorts = Cohort.load_by_subject(student_ids, subject_id=subject_id)
 
         # 3. Decide which subjects to report on
         if subject_id:
-            subject = subject_manager.get_subject_by_id(subject_id)
+            subject = reference_catalog.subject(subject_id)
             subjects = [subject] if subject else []
         else:
-            subjects = subject_manager.get_subject_by_curriculum("bece")
+            subjects = reference_catalog.subjects_by_curriculum("bece")
 
         subject_distribution = []
 
         for subject in subjects:
             # All tests for this subject
-            subject_tests = [t for t in tests if t.subject_id == subject.id]
+            cohort = cohorts.get(subject.id)
 
-            if not subject_tests:
+            if not cohort:
                 # No data for this subject in this context
                 subject_distribution.append(
                     {
@@ -533,14 +422,9 @@ class AnalyticsService:
                 )
                 continue
 
-            # 4. Build per-student average score for THIS subject
-            scores_by_student = defaultdict(list)
-            for test in subject_tests:
-                scores_by_student[test.student_id].append(test.score_acquired)
-
+            # 4. Per-student average score for THIS subject
             avg_by_student = {
-                sid: (sum(scores) / len(scores))
-                for sid, scores in scores_by_student.items()
+                sid: aggregate.average_score for sid, aggregate in cohort.students.items()
             }
 
             # 5. Classify each student by their average band
@@ -580,7 +464,7 @@ class AnalyticsService:
                 }
             )
 
-            return subject_distribution
+        return subject_distribution
 
     def get_recent_tests_activities(self, school_id, batch_id, subject_id=None):
         if batch_id:
@@ -591,16 +475,14 @@ class AnalyticsService:
             students = student_manager.get_active_students_by_school(school_id)
             student_ids = [student.id for student in students]
 
-        tests = test_manager.get_tests_by_student_ids(student_ids)
-        if subject_id:
-            tests = [test for test in tests if test.subject_id == subject_id]
+        tests = test_manager.get_test_summaries(student_ids, subject_id=subject_id)
 
         sorted_tests = sorted(tests, key=lambda test: test.created_at, reverse=True)[
             :10
         ]
         student_ids = [test.student_id for test in sorted_tests]
         students = student_manager.get_students_by_ids(student_ids)
-        subjects = subject_manager.get_subject_by_curriculum("bece")
+        subjects = reference_catalog.subjects_by_curriculum("bece")
 
         student_dict = {student.id: student for student in students}
         subject_dict = {subject.id: subject for subject in subjects}
@@ -618,23 +500,6 @@ class AnalyticsService:
 
         return tests_info
 
-    def group_students_by_proficiency(self, tests):
-        student_scores = defaultdict(list)
-        for test in tests:
-            student_scores[test.student_id].append(test.score_acquired)
-
-        # Step 2: calculate averages
-        student_avg = {
-            sid: sum(scores) / len(scores) for sid, scores in student_scores.items()
-        }
-
-        band_counts = defaultdict(int)
-        for avg_score in student_avg.values():
-            band = self.get_performance_band(avg_score)
-            band_counts[band] += 1
-
-        return band_counts
-
     def get_proficiency_distribution(self, school_id, batch_id, subject_id=None):
         if batch_id:
             batch = batch_manager.get_batch_by_id(batch_id)
@@ -644,11 +509,9 @@ class AnalyticsService:
             students = student_manager.get_active_students_by_school(school_id)
             student_ids = [student.id for student in students]
 
-        tests = test_manager.get_tests_by_student_ids(student_ids)
-        if subject_id:
-            tests = [test for test in tests if test.subject_id == subject_id]
-
-        band_counts = self.group_students_by_proficiency(tests)
+        band_counts = Cohort.load(student_ids, subject_id=subject_id).band_counts(
+            self.get_performance_band
+        )
 
         total_students = len(student_ids)
 
@@ -673,9 +536,9 @@ class AnalyticsService:
             },
             {
                 "name": "approaching_proficient",
-                "students": band_counts["approaching"],
+                "students": band_counts["approaching_proficient"],
                 "percentage": (
-                    round(band_counts["approaching"] / total_students, 2) * 100
+                    round(band_counts["approaching_proficient"] / total_students, 2) * 100
                     if total_students > 0
                     else 0
                 ),
@@ -702,12 +565,21 @@ class AnalyticsService:
 
         return distribution
 
-    def group_average_scores_by_month(self, tests):
-        month_counts = defaultdict(list)
-        for test in tests:
-            key = (test.created_at.year, test.created_at.month)  # (year, month)
-            month_counts[key].append(test.score_acquired)
-        return month_counts
+    def group_score_totals_by_month(self, student_ids, subject_id=None):
+        """(year, month) -> [tests, score_sum], from the daily rollup when it's on."""
+        month_totals = defaultdict(lambda: [0, 0.0])
+        if rollup_enabled():
+            for day, tests, score_sum in rollup_manager.get_daily_scores(student_ids, subject_id):
+                totals = month_totals[(day.year, day.month)]
+                totals[0] += tests
+                totals[1] += float(score_sum)
+            return month_totals
+
+        for test in test_manager.get_test_summaries(student_ids, subject_id=subject_id):
+            totals = month_totals[(test.created_at.year, test.created_at.month)]  # (year, month)
+            totals[0] += 1
+            totals[1] += float(test.score_acquired)
+        return month_totals
 
     def get_average_score_trend(self, school_id, batch_id, subject_id=None):
         if batch_id:
@@ -718,16 +590,12 @@ class AnalyticsService:
             students = student_manager.get_active_students_by_school(school_id)
             student_ids = [student.id for student in students]
 
-        tests = test_manager.get_tests_by_student_ids(student_ids)
-        if subject_id:
-            tests = [test for test in tests if test.subject_id == subject_id]
-
-        average_scores = self.group_average_scores_by_month(tests)
+        month_totals = self.group_score_totals_by_month(student_ids, subject_id)
 
         month_scores_named = {}
-        for year, month in sorted(average_scores.keys()):
-            scores = average_scores[(year, month)]
-            avg_score = sum(scores) / len(scores)
+        for year, month in sorted(month_totals.keys()):
+            tests, score_sum = month_totals[(year, month)]
+            avg_score = score_sum / tests
             avg_score = round(avg_score, 2)  # 2 decimal places
             month_name = f"{calendar.month_name[month]} {year}"  # e.g. "January 2025"
             month_scores_named[month_name] = avg_score
@@ -743,27 +611,16 @@ class AnalyticsService:
             students = student_manager.get_active_students_by_school(school_id)
             student_ids = [student.id for student in students]
 
-        tests = test_manager.get_tests_by_student_ids(student_ids)
-        if subject_id:
-            tests = [test for test in tests if test.subject_id == subject_id]
+        cohort = Cohort.load(student_ids, subject_id=subject_id)
 
-        average_score = round(
-            (
-                sum(test.score_acquired for test in tests) / len(tests)
-                if len(tests) > 0
-                else 0
-            ),
-            2,
-        )
+        average_score = round(cohort.average_score, 2)
 
-        highly_proficient_students = len(
-            [
-                test
-                for test in tests
-                if self.get_performance_band(test.score_acquired) == "highly_proficient"
-                and test.student_id in student_ids
-            ]
-        )  # filter to make sure deleted students are not part of the count
+        # tests in the highly proficient band; only `student_ids` are counted, so deleted
+        # students are not part of it. Read from the test table even with DASHBOARD_ROLLUP,
+        # which keeps score sums but not per-test bands.
+        highly_proficient_students = test_manager.count_tests_scoring(
+            student_ids, self.performance_bands["highly_proficient"], subject_id=subject_id
+        )
 
         total_students = len(set(student_ids))
 
@@ -779,9 +636,7 @@ class AnalyticsService:
         students_dict = {student["id"]: student for student in students}
         student_ids = [student["id"] for student in students]
 
-        tests = test_manager.get_tests_by_student_ids(student_ids)
-        if subject_id:
-            tests = [test for test in tests if test.subject_id == subject_id]
+        tests = test_manager.get_test_summaries(student_ids, subject_id=subject_id)
 
         students_proficiency = []
 
@@ -861,14 +716,12 @@ class AnalyticsService:
 
     def get_performance_indicators(self, student_id, subject_id=None, batch_id=None):
         student = student_manager.get_student_by_id(student_id)
-        tests = test_manager.get_tests_by_student_ids([student_id])
-        if subject_id:
-            tests = [test for test in tests if test.subject_id == subject_id]
+        tests = test_manager.get_test_summaries([student_id], subject_id=subject_id)
 
         if subject_id:
             average_score = self._get_weighted_preparedness_for_subject(student_id, subject_id)
         else:
-            subjects = subject_manager.get_subject_by_curriculum("bece")
+            subjects = reference_catalog.subjects_by_curriculum("bece")
             subject_scores = [
                 self._get_weighted_preparedness_for_subject(student_id, s.id)
                 for s in subjects
@@ -895,7 +748,7 @@ class AnalyticsService:
         }
 
     def get_subject_proficiency(self, student_id, subject_id=None, batch_id=None):
-        subjects = subject_manager.get_subject_by_curriculum("bece")
+        subjects = reference_catalog.subjects_by_curriculum("bece")
         if subject_id:
             subjects = [s for s in subjects if s.id == subject_id]
 
@@ -917,9 +770,7 @@ class AnalyticsService:
         return subject_performance
 
     def get_test_history(self, student_id, subject_id=None, batch_id=None):
-        tests = test_manager.get_tests_by_student_ids([student_id])
-        if subject_id:
-            tests = [test for test in tests if test.subject_id == subject_id]
+        tests = test_manager.get_test_summaries([student_id], subject_id=subject_id)
 
         tests = sorted(tests, key=lambda test: test.created_at, reverse=True)
 
@@ -1017,19 +868,8 @@ class AnalyticsService:
         return failing_topics
 
     def get_student_average_and_band(self, student_id, subject_id=None, batch_id=None):
-        tests = test_manager.get_tests_by_student_ids([student_id])
         student = student_manager.get_student_by_id(student_id)
-        if subject_id:
-            tests = [test for test in tests if test.subject_id == subject_id]
-
-        average_score = round(
-            (
-                sum(test.score_acquired for test in tests) / len(tests)
-                if len(tests) > 0
-                else 0
-            ),
-            2,
-        )
+        average_score = round(stats_manager.get_average_score(student_id, subject_id), 2)
         proficiency = self.get_performance_band(average_score)
 
         return {
@@ -1186,13 +1026,12 @@ class AnalyticsService:
         highest_streak: int
         total_achievements: int
         """
-        tests = test_manager.get_tests_by_student_ids([student_id])
         student = student_manager.get_student_by_id(student_id)
         achievements = student_has_achievement_manager.get_student_achievements_number(
             student_id
         )
         return {
-            "total_tests": len(tests),
+            "total_tests": stats_manager.get_tests_completed(student_id),
             "current_streak": student.current_streak,
             "highest_streak": student.highest_streak,
             "total_achievements": achievements,
@@ -1281,7 +1120,7 @@ class AnalyticsService:
         if subject_id:
             overall_avg = self._get_weighted_preparedness_for_subject(student_id, subject_id)
         else:
-            subjects = subject_manager.get_subject_by_curriculum("bece")
+            subjects = reference_catalog.subjects_by_curriculum("bece")
             subject_scores = [
                 self._get_weighted_preparedness_for_subject(student_id, s.id)
                 for s in subjects
@@ -1413,107 +1252,20 @@ class AnalyticsService:
 
         return messages
 
-    def _ach_progress_percent(self, ach, student, tests, max_level) -> float:
-        """Compute progress (0–100) for one locked achievement using pre-loaded data.
+    def _ach_progress_percent(self, ach, snapshot, catalog) -> float:
+        """Compute progress (0–100) for one locked achievement from the student's metrics snapshot.
 
-        Callers are responsible for short-circuiting earned achievements (progress = 100).
+        Uses the same compiled rules that award achievements. Callers are
+        responsible for short-circuiting earned achievements (progress = 100).
         """
-        if not ach.requirements:
-            return 0.0
-        try:
-            requirements = json.loads(ach.requirements)
-        except Exception:
-            return 0.0
-        if not requirements:
-            return 0.0
-
-        ach_class = ach.achievement_class
-
-        if ach_class == "volume_practice":
-            target = int(requirements.get("number_of_tests") or 0)
-            if target <= 0:
-                return 0.0
-            return round((min(len(tests), target) / target) * 100.0, 2)
-
-        if ach_class == "continuous_practice":
-            target = int(requirements.get("streak_days") or 0)
-            if target <= 0:
-                return 0.0
-            current = min(int(student.current_streak or 0), target)
-            return round((current / target) * 100.0, 2)
-
-        if ach_class == "level_ups":
-            target = int(requirements.get("level") or 0)
-            if target <= 0:
-                return 0.0
-            return round((min(max_level, target) / target) * 100.0, 2)
-
-        if ach_class == "mastery_level":
-            score_min = float(requirements.get("score_band_min") or 0)
-            score_max = float(requirements.get("score_band_max") or 0)
-            target = int(requirements.get("number_of_tests") or 0)
-            if target <= 0:
-                return 0.0
-            within = sum(1 for t in tests if score_min <= float(t.score_acquired) <= score_max)
-            return round((min(within, target) / target) * 100.0, 2)
-
-        if ach_class == "speed_and_accuracy":
-            expected_q = requirements.get("questions_count")
-            if expected_q is None:
-                return 0.0
-
-            candidates = []
-            for t in tests:
-                tmeta = t.meta or {}
-                tq = (tmeta.get("total_questions") if isinstance(tmeta, dict) else None) or t.question_number
-                if tq is None:
-                    continue
-                if int(tq) == int(expected_q):
-                    candidates.append(t)
-            if not candidates:
-                return 0.0
-
-            metric = requirements.get("metric")
-            requires_finish = bool(requirements.get("requires_finish_before_time_end"))
-
-            best = 0.0
-            for t in candidates:
-                tmeta = t.meta or {}
-                out_time = (tmeta.get("out_time") or 0) if isinstance(tmeta, dict) else 0
-                if requires_finish and not (out_time and int(out_time) > 0):
-                    continue
-
-                if metric == "score_percent":
-                    score_min = float(requirements.get("score_min") or 0)
-                    score_max = float(requirements.get("score_max") or 100)
-                    pct = 100.0 if (score_min <= float(t.score_acquired) <= score_max) else 0.0
-                    best = max(best, pct)
-                    continue
-
-                if metric == "mistakes_count":
-                    max_mistakes = int(requirements.get("max_mistakes") or 0)
-                    mistakes = tmeta.get("mistakes_count") if isinstance(tmeta, dict) else None
-                    if mistakes is None:
-                        continue
-
-                    mistakes = int(mistakes)
-                    if mistakes <= max_mistakes:
-                        best = max(best, 100.0)
-                    else:
-                        extra = mistakes - max_mistakes
-                        best = max(best, 50.0 if extra == 1 else 0.0)
-                    continue
-
-            return best
-
-        return 0.0
+        return catalog.progress(ach.id, snapshot)
 
     def get_student_achievements(
         self, student_id: int, include_requirements: bool = False
     ) -> List[Dict[str, Any]]:
         """Return ALL achievements (earned and locked) with progress percentages."""
         from app.achievements.models import StudentHasAchievement, Achievement
-        from app.student.models import StudentSubjectLevel
+        from app.achievements.rule_engine import StudentMetricsSnapshot, get_compiled_catalog
         from app.extensions import db
 
         all_achievements = Achievement.query.filter_by(is_deleted=False).all()
@@ -1527,16 +1279,11 @@ class AnalyticsService:
         )
         earned_map = {sha.achievement_id: sha for sha in earned_rows}
 
-        # Pre-load per-student data once so progress for N locked achievements
+        # Load the student's metrics once so progress for N locked achievements
         # doesn't fan out into 3N queries.
         needs_progress = any(ach.id not in earned_map for ach in all_achievements)
-        student = student_manager.get_student_by_id(student_id) if needs_progress else None
-        if student:
-            tests = test_manager.get_tests_by_student_ids([student_id])
-            levels = StudentSubjectLevel.query.filter_by(student_id=student_id).all()
-            max_level = max((lvl.level for lvl in levels), default=0)
-        else:
-            tests, max_level = [], 0
+        snapshot = StudentMetricsSnapshot.load(student_id) if needs_progress else None
+        catalog = get_compiled_catalog() if needs_progress else None
 
         results: List[Dict[str, Any]] = []
         for ach in all_achievements:
@@ -1546,8 +1293,8 @@ class AnalyticsService:
 
             if is_earned:
                 progress_percentage = 100.0
-            elif student is not None:
-                progress_percentage = self._ach_progress_percent(ach, student, tests, max_level)
+            elif snapshot is not None:
+                progress_percentage = self._ach_progress_percent(ach, snapshot, catalog)
             else:
                 progress_percentage = 0.0
 
@@ -1606,14 +1353,8 @@ class AnalyticsService:
                 },
             }
 
-        tests = test_manager.get_tests_by_student_ids(student_ids)
+        cohort = Cohort.load(student_ids)
         total_students = len(student_ids)
-        avg = (sum(t.score_acquired for t in tests) / len(tests)) if tests else 0.0
-
-        tiers = {
-            band: self.calculate_student_average_performance(total_students, tests, band)
-            for band in self.performance_bands.keys()
-        }
 
         return {
             "batch_id": batch.id,
@@ -1622,9 +1363,9 @@ class AnalyticsService:
             "academic_year": batch.academic_year,
             "exam_year": batch.exam_year,
             "total_students": total_students,
-            "average_score": round(avg, 2),
-            "total_tests": len(tests),
-            "tier_distribution": tiers,
+            "average_score": round(cohort.average_score, 2),
+            "total_tests": cohort.tests,
+            "tier_distribution": self.band_distribution(total_students, cohort),
         }
 
     def compare_batches(self, batch_ids, school_id=None):
@@ -1780,8 +1521,7 @@ class AnalyticsService:
         Sub-questions are not surfaced individually — they contribute to scoring but
         don't carry a per-question timing signal from the client.
         """
-        questions = test.questions or []
-        for q in questions:
+        for q in question_items(test.questions):
             if not isinstance(q, dict):
                 continue
             meta = q.get("meta") or {}
@@ -1911,7 +1651,7 @@ class AnalyticsService:
         results.sort(key=lambda r: r["average_score"], reverse=True)
         return results[: self.BEST_TOPICS_LIMIT]
 
-    INTEGRITY_OUT_TIME_THRESHOLD_MS = 10000
+    INTEGRITY_OUT_TIME_THRESHOLD_MS = integrity_manager.OUT_TIME_FLAG_MS
     INTEGRITY_WINDOW_SIZE = 15
     INTEGRITY_FLAG_THRESHOLD = 5
 
@@ -1940,23 +1680,33 @@ class AnalyticsService:
         Returns the count, threshold, window size, and the flagged tests themselves so
         the teacher can investigate rather than just see a number.
         """
-        tests = test_manager.get_tests_by_student_ids([student_id])
-        if subject_id:
-            tests = [t for t in tests if t.subject_id == subject_id]
-
-        # Only completed tests count — in-progress submissions would skew the window
-        tests = [t for t in tests if t.is_completed and t.created_at is not None]
-        tests.sort(key=lambda t: t.created_at, reverse=True)
-        window = tests[: self.INTEGRITY_WINDOW_SIZE]
+        # walk the per-day counters back until they cover the window; when they show
+        # no flagged test there is nothing to load
+        since = None
+        covered = flagged_count = 0
+        for day, tests_completed, out_time_flagged in integrity_manager.get_daily_counts(student_id, subject_id):
+            covered += int(tests_completed or 0)
+            flagged_count += int(out_time_flagged or 0)
+            if covered >= self.INTEGRITY_WINDOW_SIZE:
+                since = datetime.combine(day, datetime.min.time())
+                break
+
+        window = []
+        if since is None or flagged_count:
+            # counters that don't reach back far enough (history from before they
+            # existed) fall back to reading the latest tests directly
+            window = test_manager.get_recent_completed_test_rows(
+                student_id, subject_id, since=since, limit=self.INTEGRITY_WINDOW_SIZE
+            )
 
         flagged = []
-        for t in window:
-            out_ms = self._extract_outside_time_ms(t.meta)
+        for test_id, finished_on, meta in window:
+            out_ms = self._extract_outside_time_ms(meta)
             if out_ms >= self.INTEGRITY_OUT_TIME_THRESHOLD_MS:
-                meta = t.meta or {}
+                meta = meta or {}
                 flagged.append({
-                    "test_id": t.id,
-                    "date": (t.created_at.isoformat() if t.created_at else None),
+                    "test_id": test_id,
+                    "date": (finished_on.isoformat() if finished_on else None),
                     "out_time_ms": out_ms,
                     "outside_events": int(meta.get("outside_events") or 0) if isinstance(meta, dict) else 0,
                     "max_outside_event_ms": int(meta.get("max_outside_event_ms") or 0) if isinstance(meta, dict) else 0,
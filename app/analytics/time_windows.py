@@ -0,0 +1,78 @@
+"""
+Calendar periods for the dashboards' `time_range` filter.
+
+`period_windows("this_week")` gives the current and the previous ISO week as
+half-open [start, end) bounds, in the naive UTC that `created_at` columns
+hold, so callers filter with plain range predicates instead of loading rows
+and comparing `isocalendar()` in Python. Weeks and months start at local
+midnight in ANALYTICS_TIMEZONE (Africa/Accra, like the weekly goals), and
+"all_time" is one unbounded window with no previous period.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple, Optional, Tuple
+
+import pytz
+from flask import current_app
+
+
+class TimeWindow(NamedTuple):
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+    def __contains__(self, moment: datetime) -> bool:
+        return (self.start is None or moment >= self.start) and (self.end is None or moment < self.end)
+
+
+ALL_TIME = TimeWindow(None, None)
+
+
+def local_timezone():
+    return pytz.timezone(current_app.config.get("ANALYTICS_TIMEZONE", "Africa/Accra"))
+
+
+def local_day(moment: datetime, tz=None) -> date:
+    """The local date of a naive-UTC (or aware) timestamp."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(tz or local_timezone()).date()
+
+
+def window_days(window: TimeWindow, tz=None) -> Tuple[Optional[date], Optional[date]]:
+    """The window as half-open [first, after) local days, for tables keyed by day."""
+    return tuple(None if bound is None else local_day(bound, tz) for bound in window)
+
+
+def _utc(day: date, tz) -> datetime:
+    """Naive UTC for local midnight at the start of `day`."""
+    local = tz.localize(datetime(day.year, day.month, day.day))
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def day_start(day: date, tz=None) -> datetime:
+    """Naive UTC for local midnight at the start of `day`."""
+    return _utc(day, tz or local_timezone())
+
+
+def _window(first: date, after: date, tz) -> TimeWindow:
+    return TimeWindow(_utc(first, tz), _utc(after, tz))
+
+
+def _month_after(first: date) -> date:
+    return (first + timedelta(days=32)).replace(day=1)
+
+
+def period_windows(time_range: str, now: datetime = None, tz=None) -> Tuple[TimeWindow, Optional[TimeWindow]]:
+    """(current, previous) windows for "this_week" or "this_month"; (ALL_TIME, None) for anything else."""
+    tz = tz or local_timezone()
+    today = (now or datetime.now(timezone.utc)).astimezone(tz).date()
+
+    if time_range == "this_week":
+        monday = today - timedelta(days=today.weekday())
+        last_monday = monday - timedelta(days=7)
+        return _window(monday, monday + timedelta(days=7), tz), _window(last_monday, monday, tz)
+    if time_range == "this_month":
+        first = today.replace(day=1)
+        last_first = (first - timedelta(days=1)).replace(day=1)
+        return _window(first, _month_after(first), tz), _window(last_first, first, tz)
+    return ALL_TIME, None
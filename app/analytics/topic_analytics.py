@@ -1,3 +1,4 @@
+from app.analytics.models import StudentBestSubject, StudentSubjectRecommendation
 from app.analytics.operations import sts_manager, sbs_manager, ssr_manager
 from typing import List, Dict, Tuple
 from app._shared.decorators import async_method
@@ -61,17 +62,6 @@ class RecommendationLevels:
 
 
 class TopicAnalytics:
-    @staticmethod
-    def __compare(old_list, new_list):
-        old_set = set(old_list)
-        new_set = set(new_list)
-
-        added = list(new_set - old_set)
-        removed = list(old_set - new_set)
-        remaining = list(old_set & new_set)
-
-        return {"added": added, "removed": removed, "remaining": remaining}
-
     # @async_method
     @staticmethod
     def save_topic_scores_for_student(
@@ -191,7 +181,7 @@ class TopicAnalytics:
         - Low priority recommended: 70-85%
         """
         from app.test.operations import test_manager
-        from app.app_admin.operations import topic_manager
+        from app.app_admin.catalog import reference_catalog
 
         test = test_manager.get_test_by_id(test_id)
 
@@ -226,43 +216,62 @@ class TopicAnalytics:
         
         for topic_id in highly_recommended:
             recommendations.append({
-                "topic": topic_manager.get_topic_by_id(topic_id).name,
+                "topic": reference_catalog.topic(topic_id).name,
                 "level": RecommendationLevels.high,
             })
         
         for topic_id in moderately_recommended:
             recommendations.append({
-                "topic": topic_manager.get_topic_by_id(topic_id).name,
+                "topic": reference_catalog.topic(topic_id).name,
                 "level": RecommendationLevels.moderate,
             })
         
         for topic_id in low_recommended:
             recommendations.append({
-                "topic": topic_manager.get_topic_by_id(topic_id).name,
+                "topic": reference_catalog.topic(topic_id).name,
                 "level": RecommendationLevels.low,
             })
 
         topic_analytics = {
             "best_topics": [
-                topic_manager.get_topic_by_id(id).name for id in best_topics
+                reference_catalog.topic(id).name for id in best_topics
             ],
             "recommendations": recommendations,
         }
         
-        meta = {}
-        meta["out_time"] = test.meta.get("out_time", 0)
+        # merge into the existing meta: marking stats and anti-cheat metrics live there too
+        meta = dict(test.meta or {})
+        meta.setdefault("out_time", 0)
         meta["topic_analytics"] = topic_analytics
         test.meta = meta
         test.save()
 
     @staticmethod
-    def __archive_the_removed(removed_obj: List):
-        for entity in removed_obj:
-            entity.is_archived = True
-            entity.save()
+    def __sync_plan(current_rows, target: Dict[int, str]):
+        """
+        Diff the active (id, topic_id, level) rows against the target {topic_id: level}.
+        Returns the row ids to archive and the (topic_id, level) pairs to insert;
+        rows whose topic and level are unchanged are left alone.
+        """
+        wanted = set(target.items())
+        kept = set()
+        to_archive = []
+        for row_id, topic_id, level in current_rows:
+            key = (topic_id, level)
+            if key in wanted and key not in kept:
+                kept.add(key)
+            else:
+                to_archive.append(row_id)
+        to_insert = sorted(wanted - kept)
+        return to_archive, to_insert
 
     @staticmethod
     def student_level_topic_analytics(student_id, subject_id):
+        """
+        Bring the student's best topics and recommendations for the subject in
+        line with their topic averages: archive rows that no longer apply and
+        insert the new ones, one statement each per table.
+        """
 
         # get the averages from topic_ids for the subject_id
         averages: List[Tuple[int, float]] = (
@@ -294,62 +303,57 @@ class TopicAnalytics:
         if recommendation_scores:
             _, worst_topics = TopicAnalytics.__calculate_topic_recommendations_per_avg(recommendation_scores)
 
-        proficient = sbs_manager.select_student_best(student_id, subject_id)
-        recommended = ssr_manager.select_student_recommendations(student_id, subject_id)
+        # target state: {topic_id: level}, keeping only topics that meet the threshold
+        target_best = {}
+        for t in best_topics:
+            for topic_id, score in t.items():
+                level = RecommendationLevels.calculate_recommendation_level_for_avg(
+                    score, recommendation=False
+                )
+                if level is not None:
+                    target_best[topic_id] = level
 
-        # fetch the current best topics
-        # check if the current best topics, are the same as the old and archive and create new ones if applicable else leave as is
+        target_recommended = {}
+        for t in worst_topics:
+            for topic_id, score in t.items():
+                level = RecommendationLevels.calculate_recommendation_level_for_avg(
+                    score, recommendation=True
+                )
+                if level is not None:
+                    target_recommended[topic_id] = level
 
-        proficient_comparisons = TopicAnalytics.__compare(
-            [p.id for p in proficient], [list(b.keys())[0] for b in best_topics]
+        best_archive, best_insert = TopicAnalytics.__sync_plan(
+            sbs_manager.select_active_best_levels(student_id, subject_id), target_best
         )
-        recommended_comparisons = TopicAnalytics.__compare(
-            [r.id for r in recommended], [list(r.keys())[0] for r in worst_topics]
+        recommended_archive, recommended_insert = TopicAnalytics.__sync_plan(
+            ssr_manager.select_active_recommendation_levels(student_id, subject_id),
+            target_recommended,
         )
 
-        # get the removed and the added topics
-        # archived the removed
-        TopicAnalytics.__archive_the_removed(
-            [p for p in proficient if p.id in proficient_comparisons["removed"]]
+        sbs_manager.archive_bests(best_archive)
+        sbs_manager.bulk_insert(
+            StudentBestSubject,
+            [
+                {
+                    "student_id": student_id,
+                    "subject_id": subject_id,
+                    "topic_id": topic_id,
+                    "proficiency_level": level,
+                }
+                for topic_id, level in best_insert
+            ],
         )
-        TopicAnalytics.__archive_the_removed(
-            [r for r in recommended if r.id in recommended_comparisons["removed"]]
+        ssr_manager.archive_recommendations(recommended_archive)
+        ssr_manager.bulk_insert(
+            StudentSubjectRecommendation,
+            [
+                {
+                    "student_id": student_id,
+                    "subject_id": subject_id,
+                    "topic_id": topic_id,
+                    "recommendation_level": level,
+                }
+                for topic_id, level in recommended_insert
+            ],
         )
-
-        worst_objs = {}
-        best_objs = {}
-
-        for t in worst_topics:
-            key: List = list(t.keys())
-            worst_objs[key[0]] = list(t.values())[0]
-
-        for t in best_topics:
-            key: List = list(t.keys())
-            best_objs[key[0]] = list(t.values())[0]
-
-        # add the new recommendations and best topics (only if they meet the threshold)
-        for topic_id in recommended_comparisons["added"]:
-            recommendation_level = RecommendationLevels.calculate_recommendation_level_for_avg(
-                worst_objs[topic_id], recommendation=True
-            )
-            # Only save if the score is below 85% (recommendation_level is not None)
-            if recommendation_level is not None:
-                ssr_manager.insert_student_recommendation(
-                    student_id,
-                    subject_id,
-                    topic_id,
-                    recommendation_level,
-                )
-
-        for topic_id in proficient_comparisons["added"]:
-            proficiency_level = RecommendationLevels.calculate_recommendation_level_for_avg(
-                best_objs[topic_id], recommendation=False
-            )
-            # Only save if the score is at least 50% (proficiency_level is not None)
-            if proficiency_level is not None:
-                sbs_manager.insert_student_best(
-                    student_id,
-                    subject_id,
-                    topic_id,
-                    proficiency_level,
-                )
+        sbs_manager.commit()
@@ -1,8 +1,9 @@
 from app.app_admin.models import Subject, Theme, Topic
-from flask_admin.contrib.sqla import ModelView
+from app._shared.cache import CacheNamespaces, VersionedModelView
 from app.extensions import admin, db
 
-class SubjectAdmin(ModelView):
+class SubjectAdmin(VersionedModelView):
+    cache_namespace = CacheNamespaces.subject
     form_columns = ['name', 'short_name', 'curriculum', 'max_duration']
     form_choices = {
         'curriculum': [
@@ -11,10 +12,12 @@ class SubjectAdmin(ModelView):
         ]
     }
 
-class ThemeAdmin(ModelView):
+class ThemeAdmin(VersionedModelView):
+    cache_namespace = CacheNamespaces.theme
     form_columns = ['name', 'short_name', 'subject_id']  # Explicitly list fields
 
-class TopicAdmin(ModelView):
+class TopicAdmin(VersionedModelView):
+    cache_namespace = CacheNamespaces.topic
     form_columns = ['name', 'short_name', 'level', 'theme_id', 'subject_id']
 
 admin.add_view(SubjectAdmin(Subject, db.session, name="Subjects"))
@@ -0,0 +1,120 @@
+"""
+In-memory reference data: subjects, themes, topics and achievements.
+
+These tables only change through the app_admin routes, the manager create
+methods and flask-admin, all of which bump the matching cache namespace.
+Lookups are served from immutable per-worker snapshots (see app/_shared/cache.py)
+instead of querying inside loops.
+
+Lookups mirror the managers they replace: soft-deleted rows are included
+unless the method says otherwise.
+"""
+
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, NamedTuple, Optional
+
+from app._shared.cache import CacheNamespaces, versioned_cache
+from app.app_admin.models import Subject, Theme, Topic
+
+
+class CachedSubject(NamedTuple):
+    id: int
+    name: str
+    short_name: str
+    curriculum: str
+    max_duration: Optional[int]
+    is_premium: Optional[bool]
+    is_deleted: bool
+
+
+class CachedTheme(NamedTuple):
+    id: int
+    name: str
+    short_name: str
+    subject_id: int
+    is_deleted: bool
+
+
+class CachedTopic(NamedTuple):
+    id: int
+    name: str
+    short_name: str
+    level: int
+    description: Optional[str]
+    theme_id: int
+    subject_id: int
+    is_deleted: bool
+
+
+class CachedAchievement(NamedTuple):
+    id: int
+    name: str
+    description: str
+    image_url: str
+    requirements: Optional[str]
+    achievement_class: Optional[str]
+    is_deleted: bool
+
+
+def _snapshot(model, row_type) -> Mapping[int, NamedTuple]:
+    columns = [getattr(model, field) for field in row_type._fields]
+    rows = model.query.with_entities(*columns).order_by(model.id).all()
+    return MappingProxyType({row.id: row_type(*row) for row in rows})
+
+
+class ReferenceCatalog:
+    def _get(self, namespace, model, row_type) -> Mapping[int, NamedTuple]:
+        return versioned_cache.get(
+            f"catalog.{namespace}", namespace, lambda: _snapshot(model, row_type)
+        )
+
+    def bump(self, *namespaces: str) -> None:
+        versioned_cache.bump(*namespaces)
+
+    # region subjects
+    def subjects(self) -> Mapping[int, CachedSubject]:
+        return self._get(CacheNamespaces.subject, Subject, CachedSubject)
+
+    def subject(self, subject_id) -> Optional[CachedSubject]:
+        return self.subjects().get(subject_id)
+
+    def subjects_by_curriculum(self, curriculum) -> List[CachedSubject]:
+        return [s for s in self.subjects().values() if s.curriculum == curriculum]
+
+    # endregion subjects
+
+    # region themes
+    def themes(self) -> Mapping[int, CachedTheme]:
+        return self._get(CacheNamespaces.theme, Theme, CachedTheme)
+
+    def theme(self, theme_id) -> Optional[CachedTheme]:
+        return self.themes().get(theme_id)
+
+    # endregion themes
+
+    # region topics
+    def topics(self) -> Mapping[int, CachedTopic]:
+        return self._get(CacheNamespaces.topic, Topic, CachedTopic)
+
+    def topic(self, topic_id) -> Optional[CachedTopic]:
+        return self.topics().get(topic_id)
+
+    def topics_by_ids(self, topic_ids: Iterable[int]) -> List[CachedTopic]:
+        topics = self.topics()
+        return [topics[tid] for tid in topic_ids if tid in topics]
+
+    # endregion topics
+
+    # region achievements
+    def achievements(self) -> Mapping[int, CachedAchievement]:
+        from app.achievements.models import Achievement
+
+        return self._get(CacheNamespaces.achievement, Achievement, CachedAchievement)
+
+    def achievement_by_name(self, name) -> Optional[CachedAchievement]:
+        return next((a for a in self.achievements().values() if a.name == name), None)
+
+    # endregion achievements
+
+
+reference_catalog = ReferenceCatalog()
@@ -1,13 +1,11 @@
 from datetime import datetime
 
 from app.extensions import db, admin
+from app._shared.cache import CacheNamespaces, VersionedModelView
 from app._shared.models import BaseModel
 
 from app.staff.models import staff_subjects
 
-from flask_admin.contrib.sqla import ModelView
-
-
 
 class Admin(BaseModel):
     id = db.Column(db.Integer, primary_key=True)
@@ -105,7 +103,8 @@ class Topic(BaseModel):
         }
 
 
-class MinimalSubjectAdmin(ModelView):
+class MinimalSubjectAdmin(VersionedModelView):
     form_columns = ['name', 'is_premium']
+    cache_namespace = CacheNamespaces.subject
 
 admin.add_view(MinimalSubjectAdmin(Subject, db.session, name="Subjects", endpoint='subject_admin'))
\ No newline at end of file
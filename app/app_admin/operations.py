@@ -3,6 +3,7 @@
 from flask_sqlalchemy.pagination import Pagination
 
 from app.app_admin.models import Admin, Subject, Topic, Theme
+from app._shared.cache import CacheNamespaces, versioned_cache
 from app._shared.operations import BaseManager
 from app._shared.services import hash_password
 
@@ -46,6 +47,7 @@ class SubjectManager(BaseManager):
                 subject.is_premium = entry["is_premium"]
             entities.append(subject)
         self.save_multiple(entities)
+        versioned_cache.bump(CacheNamespaces.subject)
         return entities
 
     def get_subjects(self) -> List[Subject]:
@@ -82,6 +84,7 @@ class TopicManager(BaseManager):
             )
 
         self.save_multiple(entities)
+        versioned_cache.bump(CacheNamespaces.topic)
         return entities
 
     def get_topics(self) -> List[Topic]:
@@ -119,6 +122,7 @@ class ThemeManager(BaseManager):
             )
 
         self.save_multiple(entities)
+        versioned_cache.bump(CacheNamespaces.theme)
         return entities
 
     def get_themes(self) -> List[Theme]:
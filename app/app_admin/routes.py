@@ -9,6 +9,7 @@ from app._shared.api_errors import (
 )
 from app._shared.services import check_password, generate_access_token
 from app._shared.decorators import public_protected
+from app._shared.cache import CacheNamespaces, versioned_cache
 
 from app.app_admin.operations import (
     admin_manager,
@@ -138,6 +139,7 @@ def edit_subject(subject_id, json_data):
         if "is_premium" in json_data:
             subject.is_premium = json_data["is_premium"]
         subject.save()
+        versioned_cache.bump(CacheNamespaces.subject)
         return success_response(data=subject.to_json())
     return not_found()
 
@@ -149,6 +151,7 @@ def delete_subject(subject_id):
     subject = subject_manager.get_subject_by_id(subject_id)
     if subject:
         subject.delete()
+        versioned_cache.bump(CacheNamespaces.subject)
         return success_response()
     return not_found()
 
@@ -194,6 +197,7 @@ def edit_theme(theme_id, json_data):
         theme.short_name = json_data["short_name"]
         theme.subject_id = json_data["subject_id"]
         theme.save()
+        versioned_cache.bump(CacheNamespaces.theme)
         return success_response(data=theme.to_json())
     return not_found()
 
@@ -205,6 +209,7 @@ def delete_theme(theme_id):
     theme = theme_manager.get_theme_by_id(theme_id)
     if theme:
         theme.delete()
+        versioned_cache.bump(CacheNamespaces.theme)
         return success_response()
     return not_found()
 
@@ -245,6 +250,7 @@ def edit_topic(topic_id, json_data):
         topic.level = json_data["level"]
         topic.theme_id = json_data["theme_id"]
         topic.save()
+        versioned_cache.bump(CacheNamespaces.topic)
         return success_response(data=topic.to_json())
     return not_found()
 
@@ -256,6 +262,7 @@ def delete_topic(topic_id):
     topic = topic_manager.get_topic_by_id(topic_id)
     if topic:
         topic.delete()
+        versioned_cache.bump(CacheNamespaces.topic)
         return success_response()
     return not_found()
 
@@ -91,7 +91,7 @@ def calculate_max_streak_30d(student_id: int, current_date: date) -> int:
     start_date = current_date - timedelta(days=30)
     
     # Get all completed tests in the last 30 days
-    tests = test_manager.get_tests_by_student_ids([student_id])
+    tests = test_manager.get_test_summaries([student_id])
     
     # Filter tests to only those completed in last 30 days
     completed_dates = set()
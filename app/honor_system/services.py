@@ -4,9 +4,14 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
 
+from app.analytics.operations import integrity_manager
 from app.integrations.mailer import mailer
 from app.integrations.pusher import pusher
-from app.notifications.operations import notification_manager, recipient_manager
+from app.notifications.operations import (
+    notification_dedupe_manager,
+    notification_manager,
+    recipient_manager,
+)
 from app._shared.schemas import UserTypes
 from app.app_admin.models import Subject
 from app.staff.models import Staff
@@ -114,57 +119,26 @@ class HonorSystemService:
             .all()
         )
 
-    def _is_duplicate_notification(self, recipient_id: int, alert_type: str, student_id: int, subject_id: int) -> bool:
-        """Avoid spamming: if a similar notification exists within the dedupe window."""
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.config.notification_dedupe_hours)
-        # Use Notification table directly to avoid circular imports in some setups
-        from app.notifications.models import Notification
-
-        recent = (
-            Notification.query.filter(
-                Notification.recipient_id == recipient_id,
-                Notification.alert_type == alert_type,
-                Notification.created_at >= cutoff,
-            )
-            .order_by(Notification.created_at.desc())
-            .all()
+    def _claim_notification(self, recipient_id: int, alert_type: str, student_id: int, subject_id: int) -> bool:
+        """Avoid spamming: False if a similar notification was sent within the dedupe window."""
+        return notification_dedupe_manager.claim(
+            recipient_id,
+            alert_type,
+            student_id,
+            subject_id,
+            window_hours=self.config.notification_dedupe_hours,
         )
 
-        # Attachments is JSON; we do a python check.
-        for n in recent:
-            att = n.attachments or {}
-            if (
-                isinstance(att, dict)
-                and att.get("student_id") == student_id
-                and att.get("subject_id") == subject_id
-            ):
-                return True
-        return False
-
     def _notify_cheating_pattern_if_needed(self, test: Test, student: Student) -> None:
         meta = test.meta or {}
         metrics = self.evaluate_test_meta(meta)
         if not metrics["is_suspicious"]:
             return
 
-        # Pattern across multiple tests
-        cutoff = datetime.now(timezone.utc) - timedelta(days=self.config.cheating_pattern_window_days)
-        recent_tests = (
-            Test.query.filter(
-                Test.student_id == student.id,
-                Test.is_completed == True,
-                Test.created_at >= cutoff,
-                Test.is_deleted == False,
-            )
-            .order_by(Test.created_at.desc())
-            .all()
-        )
-
-        suspicious_count = 0
-        for t in recent_tests:
-            tmeta = t.meta or {}
-            if self.evaluate_test_meta(tmeta).get("is_suspicious"):
-                suspicious_count += 1
+        # Pattern across multiple tests: marking keeps per-day counters, so this
+        # is a sum over at most window_days + 1 rows per subject
+        since = (datetime.now(timezone.utc) - timedelta(days=self.config.cheating_pattern_window_days)).date()
+        suspicious_count = integrity_manager.count_suspicious(student.id, since)
 
         if suspicious_count < self.config.cheating_pattern_min_suspicious_tests:
             return
@@ -189,17 +163,19 @@ class HonorSystemService:
             if not recipient:
                 recipient = recipient_manager.create_recipient(UserTypes.staff, [], staff.email, None)
 
-            if self._is_duplicate_notification(recipient.id, self.ALERT_TYPE_CHEATING, student.id, test.subject_id):
-                continue
-
-            notification_manager.create_notification(
-                title=title,
-                content=content,
-                alert_type=self.ALERT_TYPE_CHEATING,
-                recipient_id=recipient.id,
-                school_id=student.school_id,
-                attachments=attachments,
-            )
+            # the dedupe key and the notification commit together
+            with notification_manager.unit_of_work():
+                if not self._claim_notification(recipient.id, self.ALERT_TYPE_CHEATING, student.id, test.subject_id):
+                    continue
+
+                notification_manager.create_notification(
+                    title=title,
+                    content=content,
+                    alert_type=self.ALERT_TYPE_CHEATING,
+                    recipient_id=recipient.id,
+                    school_id=student.school_id,
+                    attachments=attachments,
+                )
             pusher.notify_devices(title=title, content=content, emails=[staff.email], device_ids=recipient.device_ids)
 
             # email (best-effort)
@@ -284,17 +260,19 @@ class HonorSystemService:
             if not recipient:
                 recipient = recipient_manager.create_recipient(UserTypes.staff, [], staff.email, None)
 
-            if self._is_duplicate_notification(recipient.id, self.ALERT_TYPE_HONOR_VIBES, student.id, test.subject_id):
-                continue
-
-            notification_manager.create_notification(
-                title=title,
-                content=content,
-                alert_type=self.ALERT_TYPE_HONOR_VIBES,
-                recipient_id=recipient.id,
-                school_id=student.school_id,
-                attachments=attachments,
-            )
+            # the dedupe key and the notification commit together
+            with notification_manager.unit_of_work():
+                if not self._claim_notification(recipient.id, self.ALERT_TYPE_HONOR_VIBES, student.id, test.subject_id):
+                    continue
+
+                notification_manager.create_notification(
+                    title=title,
+                    content=content,
+                    alert_type=self.ALERT_TYPE_HONOR_VIBES,
+                    recipient_id=recipient.id,
+                    school_id=student.school_id,
+                    attachments=attachments,
+                )
             pusher.notify_devices(title=title, content=content, emails=[staff.email], device_ids=recipient.device_ids)
 
             try:
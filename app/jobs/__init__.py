@@ -0,0 +1 @@
+from app.jobs.models import *
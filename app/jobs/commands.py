@@ -0,0 +1,20 @@
+import click
+from flask.cli import AppGroup
+
+from app.jobs.services import JobWorker, job_registry
+
+
+worker_cli = AppGroup("worker", help="Background job worker.")
+
+
+@worker_cli.command("run")
+@click.option("--once", is_flag=True, help="Drain the queue and exit instead of polling forever.")
+@click.option("--poll-interval", default=2.0, show_default=True, help="Seconds to sleep when the queue is empty.")
+@click.option("--max-jobs", type=int, default=None, help="Exit after processing this many jobs.")
+@click.option("--job-type", "job_types", multiple=True, help="Only run jobs of this type (repeatable).")
+def run_worker(once, poll_interval, max_jobs, job_types):
+    """Process background jobs."""
+    worker = JobWorker(job_types=job_types or None)
+    click.echo(f"Worker {worker.worker_id} handling: {', '.join(job_types or job_registry.job_types)}")
+    processed = worker.run(poll_interval=poll_interval, max_jobs=max_jobs, stop_when_idle=once)
+    click.echo(f"Processed {processed} job(s)")
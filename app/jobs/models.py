@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from sqlalchemy import Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import JSON
+
+from app.extensions import db
+from app._shared.models import BaseModel
+
+
+class JobStatus:
+    pending = "pending"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class BackgroundJob(BaseModel):
+    __tablename__ = "background_job"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(80), nullable=False)
+    # JSONB is Postgres-only; use JSON when running on sqlite (tests).
+    payload = db.Column(JSONB().with_variant(JSON(), "sqlite"), nullable=False, default=dict)
+    # jobs enqueued twice with the same key collapse into one row
+    idempotency_key = db.Column(db.String(200), nullable=True, unique=True)
+
+    status = db.Column(db.String(20), nullable=False, default=JobStatus.pending)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    last_error = db.Column(db.Text, nullable=True)
+
+    enqueued_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # wall time of the last attempt
+    duration_ms = db.Column(db.Integer, nullable=True)
+
+    __table_args__ = (
+        Index("idx_background_job_status_run_after", "status", "run_after"),
+    )
+
+    def to_json(self):
+        return {
+            "id": self.id,
+            "job_type": self.job_type,
+            "payload": self.payload,
+            "idempotency_key": self.idempotency_key,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "last_error": self.last_error,
+            "enqueued_at": self.enqueued_at,
+            "run_after": self.run_after,
+            "finished_at": self.finished_at,
+            "duration_ms": self.duration_ms,
+        }
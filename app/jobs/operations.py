@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app._shared.operations import BaseManager
+from app.jobs.models import BackgroundJob, JobStatus
+
+
+# region Background Job Manager
+class BackgroundJobManager(BaseManager):
+    # retry backoff: 2^attempt * base, capped
+    RETRY_BASE_SECONDS = 15
+    RETRY_MAX_SECONDS = 30 * 60
+    # a running job whose worker died is handed out again after this long
+    STALE_AFTER_SECONDS = 15 * 60
+
+    def get_job_by_id(self, job_id) -> BackgroundJob:
+        return BackgroundJob.query.filter_by(id=job_id).first()
+
+    def get_job_by_idempotency_key(self, idempotency_key) -> BackgroundJob:
+        return BackgroundJob.query.filter_by(idempotency_key=idempotency_key).first()
+
+    def get_jobs(self, job_type=None, status=None) -> List[BackgroundJob]:
+        query = BackgroundJob.query
+        if job_type:
+            query = query.filter_by(job_type=job_type)
+        if status:
+            query = query.filter_by(status=status)
+        return query.order_by(BackgroundJob.id).all()
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: dict,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = 5,
+        run_after: Optional[datetime] = None,
+    ) -> BackgroundJob:
+        """Insert a pending job. Re-enqueuing an existing idempotency key returns the original job."""
+        if idempotency_key:
+            existing = self.get_job_by_idempotency_key(idempotency_key)
+            if existing:
+                return existing
+
+        job = BackgroundJob(
+            job_type=job_type,
+            payload=payload or {},
+            idempotency_key=idempotency_key,
+            max_attempts=max_attempts,
+            run_after=run_after or datetime.utcnow(),
+        )
+        try:
+            # savepoint, so losing a race on the idempotency key doesn't discard the caller's work
+            with db.session.begin_nested():
+                db.session.add(job)
+        except IntegrityError:
+            return self.get_job_by_idempotency_key(idempotency_key)
+
+        self.commit()
+        return job
+
+    def claim_next(self, worker_id: str, job_types: Optional[Iterable[str]] = None) -> Optional[BackgroundJob]:
+        """Lock the oldest runnable job for this worker (SKIP LOCKED on Postgres)."""
+        while True:
+            now = datetime.utcnow()
+            stale_cutoff = now - timedelta(seconds=self.STALE_AFTER_SECONDS)
+
+            query = BackgroundJob.query.filter(
+                or_(
+                    and_(BackgroundJob.status == JobStatus.pending, BackgroundJob.run_after <= now),
+                    and_(BackgroundJob.status == JobStatus.running, BackgroundJob.locked_at < stale_cutoff),
+                )
+            )
+            if job_types:
+                query = query.filter(BackgroundJob.job_type.in_(list(job_types)))
+
+            job = query.order_by(BackgroundJob.id).with_for_update(skip_locked=True).first()
+            if not job:
+                db.session.rollback()
+                return None
+
+            if job.attempts >= job.max_attempts:
+                # a worker died mid-run on the last attempt
+                job.status = JobStatus.failed
+                job.finished_at = now
+                job.last_error = job.last_error or "Abandoned by worker"
+                self.commit()
+                continue
+
+            job.status = JobStatus.running
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.locked_at = now
+            self.commit()
+            return job
+
+    def mark_succeeded(self, job: BackgroundJob, duration_ms: int) -> BackgroundJob:
+        job.status = JobStatus.succeeded
+        job.finished_at = datetime.utcnow()
+        job.duration_ms = duration_ms
+        job.last_error = None
+        job.locked_by = None
+        self.commit()
+        return job
+
+    def mark_failed(self, job: BackgroundJob, error: str, duration_ms: int) -> BackgroundJob:
+        """Schedule a retry with exponential backoff, or give up once attempts run out."""
+        now = datetime.utcnow()
+        job.last_error = error
+        job.duration_ms = duration_ms
+        job.locked_by = None
+
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.failed
+            job.finished_at = now
+        else:
+            delay = min(self.RETRY_BASE_SECONDS * (2 ** (job.attempts - 1)), self.RETRY_MAX_SECONDS)
+            job.status = JobStatus.pending
+            job.run_after = now + timedelta(seconds=delay)
+
+        self.commit()
+        return job
+
+
+# endregion Background Job Manager
+
+
+job_manager = BackgroundJobManager()
@@ -0,0 +1,95 @@
+"""
+Durable background jobs.
+
+Work that doesn't need to finish before we answer a request is written to the
+`background_job` table and drained by `flask worker run`. Handlers are plain
+functions taking the job payload; register them with `@job_registry.register`.
+Handlers must be safe to run more than once: a job is retried on failure and a
+job whose worker died is handed out again.
+"""
+
+import os
+import socket
+import time
+import traceback
+from logging import info as log_info, error as log_error
+from typing import Callable, Dict, Iterable, Optional
+
+from app.extensions import db
+from app.jobs.models import BackgroundJob
+from app.jobs.operations import job_manager
+
+
+class JobRegistry:
+    def __init__(self):
+        self._handlers: Dict[str, Callable[[dict], None]] = {}
+
+    def register(self, job_type: str):
+        def decorator(func):
+            self._handlers[job_type] = func
+            return func
+
+        return decorator
+
+    def get_handler(self, job_type: str) -> Optional[Callable[[dict], None]]:
+        return self._handlers.get(job_type)
+
+    @property
+    def job_types(self):
+        return sorted(self._handlers)
+
+
+job_registry = JobRegistry()
+
+
+class JobService:
+    @staticmethod
+    def enqueue(job_type: str, payload: dict, idempotency_key: Optional[str] = None, max_attempts: int = 5) -> BackgroundJob:
+        if not job_registry.get_handler(job_type):
+            raise ValueError(f"No handler registered for job type '{job_type}'")
+        return job_manager.enqueue(
+            job_type, payload, idempotency_key=idempotency_key, max_attempts=max_attempts
+        )
+
+
+class JobWorker:
+    def __init__(self, worker_id: Optional[str] = None, job_types: Optional[Iterable[str]] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.job_types = list(job_types) if job_types else None
+
+    def run_once(self) -> Optional[BackgroundJob]:
+        """Claim and run a single job. Returns the job, or None when the queue is empty."""
+        job = job_manager.claim_next(self.worker_id, self.job_types)
+        if not job:
+            return None
+
+        job_id, job_type, payload = job.id, job.job_type, job.payload
+        started = time.perf_counter()
+        try:
+            handler = job_registry.get_handler(job_type)
+            if not handler:
+                raise LookupError(f"No handler registered for job type '{job_type}'")
+            handler(payload)
+        except Exception:
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            db.session.rollback()
+            error = traceback.format_exc()
+            log_error(f"Job {job_id} ({job_type}) failed after {duration_ms}ms: {error}")
+            return job_manager.mark_failed(job_manager.get_job_by_id(job_id), error, duration_ms)
+
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        log_info(f"Job {job_id} ({job_type}) succeeded in {duration_ms}ms")
+        return job_manager.mark_succeeded(job_manager.get_job_by_id(job_id), duration_ms)
+
+    def run(self, poll_interval: float = 2.0, max_jobs: Optional[int] = None, stop_when_idle: bool = False) -> int:
+        """Drain the queue, sleeping `poll_interval` seconds when idle. Returns jobs processed."""
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            job = self.run_once()
+            if job:
+                processed += 1
+                continue
+            if stop_when_idle:
+                break
+            time.sleep(poll_interval)
+        return processed
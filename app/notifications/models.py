@@ -54,5 +54,34 @@ class Notification(BaseModel):
         }
 
 
+class NotificationDedupeKey(db.Model):
+    """
+    One row per (recipient, alert type, student, subject, time bucket) that was
+    notified. The unique index turns duplicate suppression into one insert.
+    """
+
+    __tablename__ = "notification_dedupe_key"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    recipient_id = db.Column(db.Integer, db.ForeignKey("recipient.id"), nullable=False)
+    alert_type = db.Column(db.String(50), nullable=False)
+    student_id = db.Column(db.Integer, nullable=False)
+    subject_id = db.Column(db.Integer, nullable=False)
+    # notified_at // window length, see NotificationDedupeManager.claim
+    bucket = db.Column(db.Integer, nullable=False)
+    notified_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "recipient_id",
+            "alert_type",
+            "student_id",
+            "subject_id",
+            "bucket",
+            name="uq_notification_dedupe_key",
+        ),
+    )
+
+
 # admin.add_view(ModelView(Recipient, db.session, name="Recipients"))
 # admin.add_view(ModelView(Notification, db.session, name="Notifications"))
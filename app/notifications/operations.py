@@ -1,6 +1,9 @@
-from app.notifications.models import Recipient, Notification
+from app.notifications.models import Recipient, Notification, NotificationDedupeKey
 from app._shared.operations import BaseManager
+from app.extensions import db
 
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import IntegrityError
 from typing import List
 
 
@@ -49,5 +52,58 @@ class NotificationManager(BaseManager):
             self.save(notification)
 
 
+class NotificationDedupeManager(BaseManager):
+    KEY_COLUMNS = ["recipient_id", "alert_type", "student_id", "subject_id", "bucket"]
+
+    def claim(
+        self, recipient_id, alert_type, student_id, subject_id, window_hours, now=None
+    ) -> bool:
+        """
+        Record that `recipient` is being notified about (alert_type, student, subject).
+        Returns False if they already were within the last `window_hours`.
+        Joins the caller's transaction.
+
+        Time is cut into buckets of `window_hours`: a claim loses on a conflict
+        in the current bucket, or to a claim late in the previous bucket that is
+        still inside the window.
+        """
+        now = now or datetime.now(timezone.utc)
+        window = timedelta(hours=window_hours)
+        bucket = int(now.timestamp() // window.total_seconds())
+        notified_at = now.astimezone(timezone.utc).replace(tzinfo=None)
+        key = {
+            "recipient_id": recipient_id,
+            "alert_type": alert_type,
+            "student_id": student_id,
+            "subject_id": subject_id,
+        }
+
+        recent = (
+            NotificationDedupeKey.query.with_entities(NotificationDedupeKey.id)
+            .filter_by(bucket=bucket - 1, **key)
+            .filter(NotificationDedupeKey.notified_at > notified_at - window)
+            .first()
+        )
+        if recent:
+            return False
+
+        values = dict(key, bucket=bucket, notified_at=notified_at)
+        stmt = self.dialect_insert(NotificationDedupeKey)
+        if stmt is None:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(NotificationDedupeKey(**values))
+            except IntegrityError:
+                return False
+            self.commit()
+            return True
+
+        stmt = stmt.values(**values).on_conflict_do_nothing(index_elements=self.KEY_COLUMNS)
+        claimed = db.session.execute(stmt).rowcount == 1
+        self.commit()
+        return claimed
+
+
 recipient_manager = RecipientManager()
 notification_manager = NotificationManager()
+notification_dedupe_manager = NotificationDedupeManager()
@@ -17,6 +17,7 @@ from app._shared.services import hash_password, generate_and_send_reset_password
 
 from app.school.schemas import GetSchoolListSchema
 from app.school.operations import school_manager
+from app.analytics.response_cache import analytics_responses
 
 school = APIBlueprint("school", __name__)
 
@@ -250,4 +251,5 @@ def admin_edit_student(student_id):
     except IntegrityError:
         db.session.rollback()
         return bad_request("That email is already in use.")
+    analytics_responses.invalidate_school(student.school_id)
     return success_response(data=student.to_json(include_batch=False))
@@ -256,6 +256,8 @@ def edit_staff_details(staff_id, json_data):
 @staff.output(Responses.DashboardGeneralSchema)
 @token_auth([UserTypes.school_admin])
 def dashboard_general():
+    from app.analytics.cohorts import rollup_enabled
+    from app.analytics.operations import rollup_manager
     from app.student.operations import student_manager, batch_manager
     from app.test.operations import test_manager
 
@@ -275,7 +277,10 @@ def dashboard_general():
     students = student_manager.get_active_students_by_school(school_id)
     total_staff = staff_manager.get_staff_by_school(school_id)
     total_batches = len(batch_manager.get_batches_by_school_id(school_id))
-    total_tests = len(test_manager.get_tests_by_school_id(school_id))
+    if rollup_enabled():
+        total_tests = rollup_manager.count_tests(school_id)
+    else:
+        total_tests = len(test_manager.get_tests_by_school_id(school_id))
     school = school_manager.get_school_by_id(school_id)
     subscription_package = school.subscription_package
     subscription_expiry = school.subscription_expiry_date
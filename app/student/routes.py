@@ -35,7 +35,8 @@ from app.student.services import (
     add_batch_to_student_data,
     sort_results,
 )
-from app.analytics.operations import ssm_manager
+from app.analytics.operations import ssm_manager, stats_manager
+from app.analytics.response_cache import analytics_responses
 from app.subscriptions.constants import SubscriptionLimits, Features
 
 from app.school.operations import school_manager
@@ -99,7 +100,7 @@ def login(json_data):
         school_data.pop("code")
         
         student_json = student.to_json()
-        student_json["tests_completed"] = len(test_manager.get_tests_by_student_ids([student.id]))
+        student_json["tests_completed"] = stats_manager.get_tests_completed(student.id)
 
         # Generate weekly goals on first login of the week
         week_start_date = None
@@ -225,6 +226,7 @@ def approve_student(json_data):
                 html,
                 html=html,
             )
+    analytics_responses.invalidate_school(school_id)
     return success_response()
 
 
@@ -239,6 +241,7 @@ def unapprove_student(json_data):
         if student and student.school_id == school_id:
             student.is_approved = False
             student.save()
+    analytics_responses.invalidate_school(school_id)
     return success_response()
 
 
@@ -312,6 +315,7 @@ def update_student(student_id, json_data):
         student.batches = batches
     
     student.save()
+    analytics_responses.invalidate_school(student.school_id)
     return success_response(data=student.to_json())
 
 
@@ -376,6 +380,7 @@ def create_batch(json_data):
         new_batch.staff = [
             staff_id for staff_id in staff_manager.get_staff_by_ids(staff_ids)
         ]
+    analytics_responses.invalidate_school(school_id)
     return success_response(data=new_batch.to_json())
 
 
@@ -396,6 +401,7 @@ def edit_batch(batch_id, json_data):
         ]
         batch.staff = [staff for staff in staff_manager.get_staff_by_ids(data["staff"])]
         batch.save()
+        analytics_responses.invalidate_school(batch.school_id)
 
     return success_response(data=batch.to_json())
 
@@ -413,6 +419,7 @@ def archive_batch(batch_id):
     if (batch.status or "active") == "archived":
         return bad_request("Batch is already archived.")
     batch_manager.archive_batch(batch, archived_by_user_id=current_user["user_id"])
+    analytics_responses.invalidate_school(batch.school_id)
     return success_response(data=batch.to_json())
 
 
@@ -429,6 +436,7 @@ def unarchive_batch(batch_id):
     if (batch.status or "active") != "archived":
         return bad_request("Batch is not archived.")
     batch_manager.unarchive_batch(batch)
+    analytics_responses.invalidate_school(batch.school_id)
     return success_response(data=batch.to_json())
 
 
@@ -534,8 +542,7 @@ def total_tests(query_data):
             student_id = query_data["student_id"]
         except:
             return bad_request("'student_id' is required query param")
-    total_completed = test_manager.get_tests_by_student_ids([student_id])
-    return success_response(data={"tests_completed": len(total_completed)})
+    return success_response(data={"tests_completed": stats_manager.get_tests_completed(student_id)})
 
 
 @student.get("/students/dashboard/line-chart/")
@@ -728,10 +735,8 @@ def student_averages(query_data):
     student_ids = [student["id"] for student in student_data]
     student_data = {student["id"]: student for student in student_data}
 
-    students_tests = test_manager.get_tests_by_student_ids(
-        student_ids, subject_id=subject_id
-    )
-    students_tests = [test.to_json() for test in students_tests]
+    students_tests = test_manager.get_test_summaries(student_ids, subject_id=subject_id)
+    students_tests = [test._asdict() for test in students_tests]
 
     results = transform_data_for_averages(
         student_data, students_tests, subject_name=subject_name
@@ -7,13 +7,22 @@ minimum coverage requirements.
 """
 
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
+import heapq
+import math
 import random
 
+from flask import current_app
+
 from app.extensions import db
 from app.test.models import Test
 
+
+# share of a practice test given to missed questions that are due for review
+DEFAULT_REVIEW_SHARE = 0.3
+
+
 class PerformanceAnalyzer:
     """Analyzes student performance to identify weak topics and levels"""
     
@@ -44,12 +53,12 @@ class PerformanceAnalyzer:
             'recent_questions': {question_id: outcome}  # Recently attempted questions
         }
         """
-        from app.test.operations import test_manager
         from app.analytics.models import StudentTopicScores
+        from app.analytics.operations import sqo_manager
         
-        # Get last N completed tests
-        recent_tests = (
-            db.session.query(Test)
+        # Last N completed tests, used as a subquery by both reads below
+        recent_test_ids = (
+            db.session.query(Test.id)
             .filter(
                 Test.student_id == student_id,
                 Test.subject_id == subject_id,
@@ -57,10 +66,25 @@ class PerformanceAnalyzer:
             )
             .order_by(Test.finished_on.desc())
             .limit(lookback_tests)
+            .subquery()
+        )
+        recent_test_ids = db.select(recent_test_ids.c.id)
+        
+        # Topic scores for all N tests in one query
+        test_topic_scores = (
+            db.session.query(StudentTopicScores.topic_id, StudentTopicScores.score_acquired)
+            .filter(
+                StudentTopicScores.test_id.in_(recent_test_ids),
+                StudentTopicScores.student_id == student_id
+            )
             .all()
         )
         
-        if not recent_tests:
+        # Per-question outcomes written at marking (newest first), instead of
+        # re-reading every test's questions JSON
+        outcomes = sqo_manager.select_outcomes(student_id, recent_test_ids)
+        
+        if not test_topic_scores and not outcomes:
             return cls._default_weights(subject_id)
         
         # Analyze topic performance
@@ -68,46 +92,24 @@ class PerformanceAnalyzer:
         level_scores = defaultdict(list)
         question_history = {}
         
-        for test in recent_tests:
-            # Get topic scores for this test
-            test_topic_scores = (
-                db.session.query(StudentTopicScores)
-                .filter(
-                    StudentTopicScores.test_id == test.id,
-                    StudentTopicScores.student_id == student_id
-                )
-                .all()
-            )
+        for topic_id, score_acquired in test_topic_scores:
+            topic_scores[topic_id].append(float(score_acquired))
+        
+        # Analyze questions for level performance and history
+        for question_id, topic_id, level, is_correct, answered_at in outcomes:
+            # Store question history (most recent outcome)
+            if question_id not in question_history:
+                question_history[question_id] = {
+                    'correct': is_correct,
+                    'attempts': 1,
+                    'topic_id': topic_id,
+                    'level': level,
+                    'last_seen': answered_at
+                }
             
-            for score_record in test_topic_scores:
-                topic_scores[score_record.topic_id].append(
-                    float(score_record.score_acquired)
-                )
-            
-            # Analyze questions for level performance and history
-            for question in test.questions:
-                topic_id = question.get('topic_id')
-                level = question.get('level')
-                question_id = question.get('id')
-                
-                # Track if question was answered correctly
-                is_correct = (
-                    question.get('student_answer') == question.get('correct_answer')
-                )
-                
-                # Store question history (most recent outcome)
-                if question_id not in question_history:
-                    question_history[question_id] = {
-                        'correct': is_correct,
-                        'attempts': 1,
-                        'topic_id': topic_id,
-                        'level': level,
-                        'last_seen': test.finished_on
-                    }
-                
-                # Track level performance
-                if level:
-                    level_scores[level].append(100 if is_correct else 0)
+            # Track level performance
+            if level:
+                level_scores[level].append(100 if is_correct else 0)
         
         # Calculate weights
         topic_weights = cls._calculate_topic_weights(topic_scores)
@@ -307,16 +309,37 @@ class AdaptiveTestService:
     def generate_adaptive_questions(
         subject_id: int, 
         student_id: int,
-        student_level: int
+        student_level: int,
+        seed: Optional[int] = None
     ) -> List:
         """
         Generate adaptive question set based on student performance
         
         This replaces TestService.generate_random_questions_by_level()
+        
+        Pass `seed` to make the selection reproducible (e.g. in tests).
+        """
+        from app.test.question_pool import QuestionSampler
+        
+        return QuestionSampler.fetch(
+            AdaptiveTestService.generate_adaptive_question_ids(
+                subject_id, student_id, student_level, seed=seed
+            )
+        )
+    
+    @staticmethod
+    def generate_adaptive_question_ids(
+        subject_id: int, 
+        student_id: int,
+        student_level: int,
+        seed: Optional[int] = None
+    ) -> List[int]:
+        """
+        Ids of the adaptive question set, in test order, without loading the questions
         """
-        from app.test.models import Question
-        from app.app_admin.models import Topic
         from app._shared.schemas import QuestionsNumberLimiter
+        from app.analytics.operations import seen_manager
+        from app.test.question_pool import QuestionSampler
         
         # Get total questions needed
         total_questions = QuestionsNumberLimiter.get_question_limit_for_level(
@@ -328,30 +351,41 @@ class AdaptiveTestService:
             student_id, subject_id, lookback_tests=5
         )
         
-        # Generate adaptive distribution
+        rng = random.Random(seed)
+        sampler = QuestionSampler(subject_id, rng=rng)
+        
+        # Missed questions that are due again take a share of the test
+        review_questions = AdaptiveTestService._due_review_questions(
+            sampler.pool, student_id, subject_id, student_level, total_questions
+        )
+        review_ids = {q.id for q in review_questions}
+        
+        # Generate adaptive distribution for the rest
         level_distribution = AdaptiveDistributionEngine.generate_adaptive_distribution(
-            total_questions=total_questions,
+            total_questions=total_questions - len(review_questions),
             student_level=student_level,
             performance_data=performance_data,
             min_per_level=2
         )
         
-        # Select questions for each level with weighted selection
-        selected_questions = []
+        # Questions the student has already been given; recently failed ones stay
+        # eligible so they can be retried
+        seen = seen_manager.get(student_id, subject_id)
+        retry_ids = {
+            question_id
+            for question_id, history in performance_data.get('recent_questions', {}).items()
+            if not history['correct']
+        }
+        
+        # Select questions for each level with weighted selection, from the
+        # in-memory pool of (id, topic_id, level) records
+        selected_questions = list(review_questions)
         
         for level, count in level_distribution.items():
             # Get all available questions for this level
-            available_questions = (
-                db.session.query(Question)
-                .join(Topic, Question.topic_id == Topic.id)
-                .filter(
-                    Topic.level == level,
-                    Topic.subject_id == subject_id,
-                    Question.is_deleted == False,
-                    Question.is_flagged != True
-                )
-                .all()
-            )
+            available_questions = [
+                q for q in sampler.pool.questions(level=level) if q.id not in review_ids
+            ]
             
             if not available_questions:
                 continue
@@ -366,78 +400,121 @@ class AdaptiveTestService:
                 shortage = count - len(selected)
                 if shortage > 0:
                     mastered_questions = AdaptiveTestService._get_mastered_fallback_questions(
-                        subject_id=subject_id,
+                        sampler=sampler,
                         student_level=student_level,
                         needed_count=shortage,
                         performance_data=performance_data,
-                        exclude_ids=[q.id for q in selected]
+                        exclude_ids=[q.id for q in selected_questions + selected],
+                        seen=seen
                     )
                     selected.extend(mastered_questions)
             else:
-                # Weighted selection
-                selected = AdaptiveTestService._weighted_question_selection(
+                # Weighted selection, from unseen questions while there are enough
+                selected = AdaptiveTestService._select_preferring_unseen(
                     available_questions=available_questions,
                     count=count,
-                    performance_data=performance_data
+                    performance_data=performance_data,
+                    seen=seen,
+                    retry_ids=retry_ids,
+                    rng=rng
                 )
             
             selected_questions.extend(selected)
         
         # Final shuffle to randomize order (but maintain weighted selection)
-        random.shuffle(selected_questions)
+        rng.shuffle(selected_questions)
         
-        return selected_questions
+        return [q.id for q in selected_questions]
+    
+    @staticmethod
+    def _due_review_questions(pool, student_id: int, subject_id: int, student_level: int, total_questions: int) -> List:
+        """
+        Pool records of the student's due review items (see StudentReviewQueueManager),
+        at most ADAPTIVE_REVIEW_SHARE of the test, skipping ones above their level
+        or no longer in the bank
+        """
+        from app.analytics.operations import review_manager
+        
+        slots = int(total_questions * current_app.config.get("ADAPTIVE_REVIEW_SHARE", DEFAULT_REVIEW_SHARE))
+        if slots <= 0:
+            return []
+        
+        # read a few extra in case some are unusable
+        due = []
+        for question_id in review_manager.next_due(student_id, subject_id, limit=slots * 2):
+            record = pool.get(question_id)
+            if record and record.level <= student_level:
+                due.append(record)
+        return due[:slots]
+    
+    @staticmethod
+    def _select_preferring_unseen(
+        available_questions: List,
+        count: int,
+        performance_data: Dict,
+        seen,
+        retry_ids,
+        rng: Optional[random.Random] = None
+    ) -> List:
+        """
+        Weighted selection that only falls back to already seen questions
+        (other than ones to retry) when too few unseen ones are left
+        """
+        if not seen:
+            return AdaptiveTestService._weighted_question_selection(
+                available_questions, count, performance_data, rng=rng
+            )
+        
+        fresh, stale = [], []
+        for question in available_questions:
+            if question.id in seen and question.id not in retry_ids:
+                stale.append(question)
+            else:
+                fresh.append(question)
+        
+        if len(fresh) >= count:
+            return AdaptiveTestService._weighted_question_selection(
+                fresh, count, performance_data, rng=rng
+            )
+        return fresh + AdaptiveTestService._weighted_question_selection(
+            stale, count - len(fresh), performance_data, rng=rng
+        )
     
     @staticmethod
     def _weighted_question_selection(
         available_questions: List,
         count: int,
-        performance_data: Dict
+        performance_data: Dict,
+        rng: Optional[random.Random] = None
     ) -> List:
         """
         Select questions using weighted random selection
         Questions from weaker topics have higher probability of selection
+        
+        Weighted sampling without replacement in one pass (Efraimidis-Spirakis):
+        each question gets the key log(u) / weight for u ~ U(0, 1], and the
+        `count` largest keys win. O(n log k) instead of re-normalising the
+        weights on each of the k draws.
         """
-        # Calculate weights for all questions
-        weights = []
-        for question in available_questions:
+        rng = rng or random
+        
+        def key(question):
             weight = AdaptiveDistributionEngine.calculate_question_selection_weight(
                 question, performance_data
             )
-            weights.append(weight)
-        
-        # Weighted random selection without replacement
-        selected = []
-        questions_copy = available_questions.copy()
-        weights_copy = weights.copy()
+            # 1 - random() is in (0, 1], so log() is defined
+            return math.log(1.0 - rng.random()) / weight
         
-        for _ in range(min(count, len(questions_copy))):
-            # Use weights for selection probability
-            total_weight = sum(weights_copy)
-            probabilities = [w / total_weight for w in weights_copy]
-            
-            # Select one question based on probabilities
-            selected_idx = random.choices(
-                range(len(questions_copy)), 
-                weights=probabilities, 
-                k=1
-            )[0]
-            
-            selected.append(questions_copy[selected_idx])
-            
-            # Remove selected question
-            questions_copy.pop(selected_idx)
-            weights_copy.pop(selected_idx)
-        
-        return selected
+        return heapq.nlargest(count, available_questions, key=key)
     
     @staticmethod
     def _get_mastered_fallback_questions(
-        subject_id: int,
+        sampler,
         student_level: int,
         needed_count: int,
         performance_data: Dict,
-        exclude_ids: List[int]
+        exclude_ids: List[int],
+        seen=None
     ) -> List:
         """
         Fallback: Get questions from mastered topics when weak topics 
@@ -446,28 +523,11 @@ class AdaptiveTestService:
         Strategy: Pick from topics with LOWEST mastered average 
         (least mastered among the mastered)
         """
-        from app.test.models import Question
-        from app.app_admin.models import Topic
-        
         mastered_topics = performance_data.get('mastered_topics', [])
         
         if not mastered_topics:
             # No mastered topics, just get any available questions
-            fallback_questions = (
-                db.session.query(Question)
-                .join(Topic, Question.topic_id == Topic.id)
-                .filter(
-                    Topic.subject_id == subject_id,
-                    Topic.level <= student_level,
-                    Question.is_deleted == False,
-                    Question.is_flagged != True,
-                    ~Question.id.in_(exclude_ids)
-                )
-                .order_by(db.func.random())
-                .limit(needed_count)
-                .all()
-            )
-            return fallback_questions
+            return sampler.sample(needed_count, exclude=exclude_ids, avoid=seen, max_level=student_level)
         
         # Sort mastered topics by score (lowest first)
         topic_scores = performance_data.get('topic_weights', {})
@@ -482,19 +542,12 @@ class AdaptiveTestService:
             if len(selected) >= needed_count:
                 break
             
-            questions = (
-                db.session.query(Question)
-                .join(Topic, Question.topic_id == Topic.id)
-                .filter(
-                    Topic.id == topic_id,
-                    Topic.level <= student_level,
-                    Question.is_deleted == False,
-                    Question.is_flagged != True,
-                    ~Question.id.in_(exclude_ids + [q.id for q in selected])
-                )
-                .order_by(db.func.random())
-                .limit(needed_count - len(selected))
-                .all()
+            questions = sampler.sample(
+                needed_count - len(selected),
+                exclude=exclude_ids + [q.id for q in selected],
+                avoid=seen,
+                max_level=student_level,
+                topic_id=topic_id,
             )
             selected.extend(questions)
         
@@ -516,6 +569,7 @@ class AdaptiveTestMetrics:
         - Question distribution effectiveness
         """
         from app.test.operations import test_manager
+        from app.test.question_snapshots import question_items
         
         test = test_manager.get_test_by_id(test_id)
         
@@ -524,7 +578,8 @@ class AdaptiveTestMetrics:
         topic_distribution = defaultdict(int)
         weak_topic_coverage = 0
         
-        for question in test.questions:
+        questions = question_items(test.questions)
+        for question in questions:
             level = question.get('level')
             topic_id = question.get('topic_id')
             
@@ -536,7 +591,7 @@ class AdaptiveTestMetrics:
         return {
             'level_distribution': dict(level_distribution),
             'topic_distribution': dict(topic_distribution),
-            'total_questions': len(test.questions),
+            'total_questions': len(questions),
             'score': float(test.score_acquired)
         }
     
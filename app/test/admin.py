@@ -1,7 +1,7 @@
 from app.extensions import admin, db
+from app._shared.cache import CacheNamespaces, VersionedModelView
 from app.test.models import Question
 from app.app_admin.models import Topic
-from flask_admin.contrib.sqla import ModelView
 from flask_admin.form import Select2Field
 from wtforms import Form, TextAreaField, SelectField, IntegerField, BooleanField
 from wtforms.validators import DataRequired, Optional
@@ -17,7 +17,8 @@ class QuestionForm(Form):
     flag_reason = TextAreaField('Flag Reason', validators=[Optional()])
     year = IntegerField('Year', validators=[Optional()])
     
-class CustomFormQuestionView(ModelView):
+class CustomFormQuestionView(VersionedModelView):
+    cache_namespace = CacheNamespaces.question
     can_edit = True
     can_delete = True
     can_create = True
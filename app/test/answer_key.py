@@ -0,0 +1,63 @@
+"""
+Answer key for marking submitted tests.
+
+Marking used to fetch every question and sub-question one at a time. The
+AnswerKey collects every id referenced by a submission up front and loads
+them with one query per table, so the grading loop runs entirely in memory.
+"""
+
+from typing import Dict, Iterable, NamedTuple, Optional
+
+
+class QuestionKey(NamedTuple):
+    id: int
+    topic_id: int
+    correct_answer: Optional[str]
+    is_flagged: Optional[bool]
+    is_instructional: Optional[bool]
+
+
+class SubQuestionKey(NamedTuple):
+    id: int
+    correct_answer: str
+    is_flagged: Optional[bool]
+
+
+class AnswerKey:
+    def __init__(
+        self,
+        questions: Dict[int, QuestionKey],
+        sub_questions: Dict[int, SubQuestionKey],
+    ):
+        self._questions = questions
+        self._sub_questions = sub_questions
+
+    @classmethod
+    def for_submission(cls, questions: Iterable[dict]) -> "AnswerKey":
+        """Load the key for every question/sub-question referenced in a submitted payload."""
+        from app.test.operations import question_manager
+
+        questions = list(questions)
+        question_ids = [question.get("id") for question in questions]
+        sub_ids = [
+            sub.get("id")
+            for question in questions
+            for sub in (question.get("sub_questions") or [])
+        ]
+
+        question_rows = question_manager.get_answer_key_rows(question_ids)
+        sub_rows = question_manager.get_sub_question_answer_key_rows(sub_ids)
+
+        return cls(
+            questions={row.id: QuestionKey(*row) for row in question_rows},
+            sub_questions={row.id: SubQuestionKey(*row) for row in sub_rows},
+        )
+
+    def question(self, question_id) -> Optional[QuestionKey]:
+        return self._questions.get(question_id)
+
+    def sub_question(self, sub_id) -> Optional[SubQuestionKey]:
+        return self._sub_questions.get(sub_id)
+
+    def __len__(self):
+        return len(self._questions) + len(self._sub_questions)
@@ -0,0 +1,49 @@
+import json
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app._shared.services import is_in_development_environment
+from app.test.question_snapshots import question_snapshots
+from app.test.simulator import AdaptiveEngineSimulator, SimulationConfig
+
+
+tests_cli = AppGroup("tests", help="Maintain stored tests.")
+
+
+@tests_cli.command("compact")
+@click.option("--student-id", "student_ids", type=int, multiple=True, help="Only compact these students' tests (repeatable).")
+def compact_test_questions(student_ids):
+    """Rewrite tests that still store full question payloads in the compact format."""
+    tests = question_snapshots.compact_legacy_rows(student_ids=list(student_ids) or None)
+    click.echo(f"Compacted {tests} test(s)")
+
+
+@tests_cli.command("simulate")
+@click.option("--levels", default=3, show_default=True, help="Topic levels in the synthetic subject.")
+@click.option("--topics-per-level", default=8, show_default=True)
+@click.option("--questions-per-topic", default=40, show_default=True)
+@click.option("--students", default=50, show_default=True, help="Synthetic students, each with a marked history.")
+@click.option("--history-tests", default=5, show_default=True, help="Marked tests seeded per student.")
+@click.option("--generations", default=1000, show_default=True, help="generate_adaptive_questions calls to time.")
+@click.option("--memory-samples", default=50, show_default=True, help="Generations re-run under tracemalloc.")
+@click.option("--seed", default=0, show_default=True)
+@click.option("--output", type=click.Path(dir_okay=False, writable=True), help="Write the JSON report here instead of stdout.")
+@click.option("--force", is_flag=True, help="Run even outside development (the synthetic rows are not removed).")
+def simulate_adaptive_engine(output, force, **options):
+    """Seed a synthetic question bank and students, then benchmark the adaptive generator."""
+    if not (force or is_in_development_environment() or current_app.config.get("TESTING")):
+        raise click.UsageError("Seeds synthetic data into the configured database; use --force outside development.")
+
+    report = AdaptiveEngineSimulator(SimulationConfig(**options)).run()
+    report_json = json.dumps(report, indent=2, sort_keys=True)
+    if output:
+        with open(output, "w") as report_file:
+            report_file.write(report_json + "\n")
+        click.echo(
+            f"p50 {report['latency_ms']['p50']}ms, p95 {report['latency_ms']['p95']}ms, "
+            f"{report['queries_per_generation']['mean']} queries/generation; report written to {output}"
+        )
+    else:
+        click.echo(report_json)
@@ -0,0 +1,139 @@
+"""
+Warm pool of pre-assembled exam papers.
+
+Assembling a BECE paper means sampling every blueprint slot, loading the
+questions and serializing each one. `create_test` in exam mode instead pops a
+ready paper from the `exam_paper` table and a background job tops the pool back
+up. Papers are keyed by a blueprint version (the blueprint itself plus the
+question and topic cache generations), so editing, flagging or deleting a
+question retires every paper assembled before it.
+
+Each paper carries a fingerprint of its question ids. A student is never handed
+a paper whose fingerprint matches one of their recent tests in the subject, and
+of the others gets the one repeating the fewest questions they have already
+seen (app/analytics/seen_questions.py); if nothing else is ready the paper is
+assembled on demand, avoiding those questions.
+"""
+
+import hashlib
+import json
+import time
+from logging import info as log_info
+from typing import Dict
+
+from flask import current_app
+
+from app._shared.cache import CacheNamespaces, versioned_cache
+from app.analytics.operations import seen_manager
+from app.jobs.services import JobService, job_registry
+from app.test.operations import exam_paper_manager, test_manager
+from app.test.question_payloads import question_payloads
+from app.test.services import EXAM_BLUEPRINTS, EXAM_QUESTION_COUNT, TestService
+
+
+REFILL_JOB = "exam_papers.refill"
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_LOW_WATER = 3
+# how many of the student's latest tests in the subject a served paper must not repeat
+RECENT_TESTS_CHECKED = 10
+
+
+def _fingerprint(question_ids) -> str:
+    return hashlib.sha1(",".join(str(qid) for qid in sorted(question_ids)).encode()).hexdigest()
+
+
+class ExamPaperPool:
+    def pool_size(self) -> int:
+        return current_app.config.get("EXAM_PAPER_POOL_SIZE", DEFAULT_POOL_SIZE)
+
+    def low_water(self) -> int:
+        return current_app.config.get("EXAM_PAPER_POOL_LOW_WATER", DEFAULT_LOW_WATER)
+
+    def blueprint_version(self, subject_short_name) -> str:
+        blueprint = EXAM_BLUEPRINTS.get(subject_short_name) or {"count": EXAM_QUESTION_COUNT}
+        generations = [versioned_cache.version(ns) for ns in (CacheNamespaces.question, CacheNamespaces.topic)]
+        raw = json.dumps([blueprint, generations], sort_keys=True)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def assemble(self, subject_short_name, subject_id, seen=None) -> Dict:
+        """A freshly sampled paper, serialized the way `create_test` returns it.
+
+        Pass a student's SeenQuestions as `seen` to avoid repeats for them.
+        """
+        slots = TestService.generate_exam_question_ids(subject_short_name, subject_id, seen=seen)
+        sections = dict(slots)
+        questions = question_payloads.get_many([qid for qid, _ in slots], include_correct_answer=False)
+        for q_json in questions:
+            q_json["section"] = sections[q_json["id"]]
+        # exam marks are flat: a passage parent contributes its gaps, not itself
+        total_points = sum(
+            len(q.get("sub_questions") or []) if q.get("is_instructional") else 1
+            for q in questions
+        )
+        question_ids = [q["id"] for q in questions]
+        return {
+            "question_ids": question_ids,
+            "questions": questions,
+            "total_points": total_points,
+            "fingerprint": _fingerprint(question_ids),
+        }
+
+    def pop(self, student_id, subject_short_name, subject_id) -> Dict:
+        """A paper for this student: the ready one repeating the fewest questions
+        they have seen, else one assembled now around those questions."""
+        version = self.blueprint_version(subject_short_name)
+        recent = test_manager.get_recent_paper_fingerprints(student_id, subject_id, RECENT_TESTS_CHECKED)
+        seen = seen_manager.get(student_id, subject_id)
+        paper = exam_paper_manager.pop(subject_id, version, exclude_fingerprints=recent, seen=seen)
+
+        if paper is None or exam_paper_manager.count_ready(subject_id, version) < self.low_water():
+            self.request_refill(subject_id)
+        if paper is None:
+            paper = self.assemble(subject_short_name, subject_id, seen=seen)
+        return paper
+
+    def request_refill(self, subject_id) -> None:
+        # at most one refill job per subject per minute
+        minute = int(time.time() // 60)
+        JobService.enqueue(
+            REFILL_JOB,
+            {"subject_id": subject_id},
+            idempotency_key=f"{REFILL_JOB}:{subject_id}:{minute}",
+        )
+
+    def refill(self, subject_id) -> int:
+        """Top the subject's pool up to EXAM_PAPER_POOL_SIZE distinct papers. Returns papers added."""
+        from app.app_admin.catalog import reference_catalog
+
+        subject = reference_catalog.subject(subject_id)
+        if not subject:
+            return 0
+
+        version = self.blueprint_version(subject.short_name)
+        exam_paper_manager.purge_stale(subject_id, version)
+
+        ready = set(exam_paper_manager.get_ready_fingerprints(subject_id, version))
+        wanted = self.pool_size() - len(ready)
+        rows = []
+        # a small bank can't produce many distinct papers; don't spin on it
+        for _ in range(max(wanted, 0) * 2):
+            if len(rows) >= wanted:
+                break
+            paper = self.assemble(subject.short_name, subject_id)
+            if not paper["questions"] or paper["fingerprint"] in ready:
+                continue
+            ready.add(paper["fingerprint"])
+            rows.append({"subject_id": subject_id, "blueprint_version": version, **paper})
+
+        exam_paper_manager.add_papers(rows)
+        log_info(f"Exam paper pool for subject {subject_id}: added {len(rows)}")
+        return len(rows)
+
+
+exam_paper_pool = ExamPaperPool()
+
+
+@job_registry.register(REFILL_JOB)
+def run_exam_paper_refill(payload: Dict):
+    exam_paper_pool.refill(payload["subject_id"])
@@ -1,6 +1,7 @@
 from app.extensions import db
 from app._shared.models import BaseModel
 from datetime import datetime
+from sqlalchemy import Index
 import ast
 
 class Question(BaseModel):
@@ -105,6 +106,7 @@ class Test(BaseModel):
     subject_id = db.Column(db.Integer, db.ForeignKey("subject.id"), nullable=False)
     school_id = db.Column(db.Integer, db.ForeignKey("school.id"), nullable=True)
 
+    # compact items referencing question_snapshot rows; older rows hold full payloads
     questions = db.Column(db.JSON, nullable=False)
     question_number = db.Column(db.Integer, nullable=True)
     questions_correct = db.Column(db.Integer, nullable=True)
@@ -122,13 +124,22 @@ class Test(BaseModel):
     meta = db.Column(db.JSON, nullable=True)
     is_completed = db.Column(db.Boolean, default=False, nullable=False)
 
-    def to_json(self):
+    __table_args__ = (
+        # dashboard time windows (app/analytics/time_windows.py)
+        Index("idx_test_student_created", "student_id", "created_at"),
+    )
+
+    def to_json(self, questions=None):
+        """`questions` are the rehydrated payloads (see question_snapshots.expand);
+        without them the stored per-question items are returned."""
+        from app.test.question_snapshots import question_items
+
         return {
             "id": self.id,
             "student_id": self.student_id,
             "subject_id": self.subject_id,
             "school_id": self.school_id,
-            "questions": self.questions,
+            "questions": questions if questions is not None else question_items(self.questions),
             "question_number": self.question_number,
             "questions_correct": self.questions_correct,
             "total_points": self.total_points,
@@ -140,4 +151,48 @@ class Test(BaseModel):
             "meta": self.meta,
             "is_completed": self.is_completed,
             "created_at": self.created_at,
-        }
\ No newline at end of file
+        }
+
+class QuestionSnapshot(db.Model):
+    """Immutable question content, addressed by its hash (app/test/question_snapshots.py)."""
+
+    __tablename__ = "question_snapshot"
+
+    content_hash = db.Column(db.String(40), primary_key=True)
+    question_id = db.Column(db.Integer, nullable=True)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ExamPaper(db.Model):
+    """A pre-assembled, already serialized exam paper waiting to be served (app/test/exam_papers.py)."""
+
+    __tablename__ = "exam_paper"
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey("subject.id"), nullable=False)
+    # blueprint + question bank generation the paper was assembled under
+    blueprint_version = db.Column(db.String(64), nullable=False)
+    # hash of the paper's question ids, compared against a student's recent papers
+    fingerprint = db.Column(db.String(64), nullable=False)
+    # ids of `questions`, ranked against a student's seen questions when popping
+    question_ids = db.Column(db.JSON, nullable=True)
+    questions = db.Column(db.JSON, nullable=False)
+    total_points = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_exam_paper_subject_version", "subject_id", "blueprint_version"),
+    )
+
+    def to_json(self):
+        return {
+            "id": self.id,
+            "subject_id": self.subject_id,
+            "blueprint_version": self.blueprint_version,
+            "fingerprint": self.fingerprint,
+            "question_ids": self.question_ids,
+            "questions": self.questions,
+            "total_points": self.total_points,
+            "created_at": self.created_at,
+        }
@@ -1,8 +1,11 @@
-from app.test.models import Question, SubQuestion, Test, QuestionImage
+from app.test.models import ExamPaper, Question, QuestionSnapshot, SubQuestion, Test, QuestionImage
 from app._shared.operations import BaseManager
+from app.extensions import db
+from app.test.question_pool import QuestionSampler, question_pool
 from datetime import datetime, timezone
 
-from typing import List, Dict, Union
+from typing import Iterator, List, Dict, NamedTuple, Optional, Union
+from sqlalchemy import and_, case
 from sqlalchemy.sql import func
 
 
@@ -12,7 +15,7 @@ class QuestionManager(BaseManager):
     def get_questions(self) -> List[Question]:
         return Question.query.filter_by(is_deleted=False).all()
 
-    def get_questions_paginated(
+    def get_question_ids_paginated(
         self,
         page,
         per_page,
@@ -21,8 +24,8 @@ class QuestionManager(BaseManager):
         topic_id=None,
         search=None,
     ):
+        """A page of `(id,)` rows, newest first; render them with question_payloads."""
         from app.app_admin.models import Topic
-        from sqlalchemy.orm import joinedload, selectinload
 
         query = Question.query.filter_by(is_deleted=False)
 
@@ -37,12 +40,7 @@ class QuestionManager(BaseManager):
         if search and search.strip():
             query = query.filter(Question.text.ilike(f"%{search.strip()}%"))
 
-        query = query.options(
-            joinedload(Question.topic),
-            selectinload(Question.sub_questions),
-            selectinload(Question.images),
-        )
-        return query.order_by(Question.id.desc()).paginate(
+        return query.with_entities(Question.id).order_by(Question.id.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
 
@@ -68,37 +66,13 @@ class QuestionManager(BaseManager):
     def get_questions_by_item_types(self, subject_id, item_types, limit) -> List[Question]:
         """Random non-flagged questions of the given item_type(s) for a subject —
         the building block of exam-mode blueprint assembly."""
-        from app.app_admin.models import Topic
-        return (
-            Question.query.join(Topic, Question.topic_id == Topic.id)
-            .filter(
-                Topic.subject_id == subject_id,
-                Question.item_type.in_(item_types),
-                Question.is_deleted == False,
-                Question.is_flagged != True,
-            )
-            .order_by(func.random())
-            .limit(limit)
-            .all()
-        )
+        return QuestionSampler(subject_id).sample_questions(limit, item_types=item_types)
 
     def get_random_questions_for_subject(self, subject_id, count) -> List[Question]:
         """Random non-flagged questions mixed across ALL levels of a subject — the
         exam paper for subjects without an item_type blueprint (Maths, Science, …).
         Excludes passage parents (is_instructional)."""
-        from app.app_admin.models import Topic
-        return (
-            Question.query.join(Topic, Question.topic_id == Topic.id)
-            .filter(
-                Topic.subject_id == subject_id,
-                Question.is_deleted == False,
-                Question.is_flagged != True,
-                Question.is_instructional != True,
-            )
-            .order_by(func.random())
-            .limit(count)
-            .all()
-        )
+        return QuestionSampler(subject_id).sample_questions(count, include_instructional=False)
 
     def get_question_by_id(self, question_id) -> Question:
         return Question.query.filter_by(id=question_id).first()
@@ -106,6 +80,24 @@ class QuestionManager(BaseManager):
     def get_question_by_ids(self, question_ids) -> List[Question]:
         return Question.query.filter(Question.id.in_(question_ids)).all()
 
+    def get_questions_in_order(self, question_ids: List[int]) -> List[Question]:
+        """The questions with `question_ids`, in that order, with everything `to_json` reads loaded up front."""
+        from sqlalchemy.orm import joinedload, selectinload
+
+        if not question_ids:
+            return []
+        questions = (
+            Question.query.filter(Question.id.in_(question_ids))
+            .options(
+                joinedload(Question.topic),
+                selectinload(Question.sub_questions),
+                selectinload(Question.images),
+            )
+            .all()
+        )
+        by_id = {question.id: question for question in questions}
+        return [by_id[qid] for qid in question_ids if qid in by_id]
+
     def get_subquestion_by_parent(self, question_id) -> List[SubQuestion]:
         return SubQuestion.query.filter_by(parent_question_id=question_id).all()
 
@@ -156,6 +148,7 @@ class QuestionManager(BaseManager):
 
         if is_save_function:
             self.save(new_question)
+            question_pool.bump()
 
         return new_question
 
@@ -168,7 +161,8 @@ class QuestionManager(BaseManager):
             question_images = obj.pop("question_images", [])
             obj.pop("subject_id", None)  # Remove subject_id if present
 
-            new_question = self.create_question(**obj, is_save_function=True)
+            new_question = self.create_question(**obj, is_save_function=False)
+            self.save(new_question)
             questions_list.append(new_question)
 
             if sub_obj:
@@ -190,12 +184,45 @@ class QuestionManager(BaseManager):
 
         # self.save_multiple(questions_list)
         # self.save_multiple(sub_questions_list)
+        question_pool.bump()
 
         return self.get_question_by_ids(question.id for question in questions_list)
 
     def get_sub_question_by_id(self, sub_id) -> SubQuestion:
         return SubQuestion.query.filter_by(id=sub_id).first()
 
+    def get_answer_key_rows(self, question_ids):
+        """(id, topic_id, correct_answer, is_flagged, is_instructional) for each id, in one query."""
+        question_ids = {qid for qid in question_ids if qid is not None}
+        if not question_ids:
+            return []
+        return (
+            Question.query.with_entities(
+                Question.id,
+                Question.topic_id,
+                Question.correct_answer,
+                Question.is_flagged,
+                Question.is_instructional,
+            )
+            .filter(Question.id.in_(question_ids))
+            .all()
+        )
+
+    def get_sub_question_answer_key_rows(self, sub_ids):
+        """(id, correct_answer, is_flagged) for each sub-question id, in one query."""
+        sub_ids = {sid for sid in sub_ids if sid is not None}
+        if not sub_ids:
+            return []
+        return (
+            SubQuestion.query.with_entities(
+                SubQuestion.id,
+                SubQuestion.correct_answer,
+                SubQuestion.is_flagged,
+            )
+            .filter(SubQuestion.id.in_(sub_ids))
+            .all()
+        )
+
     def create_question_image(self, question_id, image_url, label=None, is_for_answer=False):
         new_image = QuestionImage(
             question_id=question_id,
@@ -211,6 +238,19 @@ class QuestionManager(BaseManager):
 
 
 # region TestManager
+class TestSummary(NamedTuple):
+    """The scalar columns of a completed test; what analytics aggregates read."""
+
+    id: int
+    student_id: int
+    subject_id: int
+    score_acquired: float
+    points_acquired: int
+    created_at: datetime
+    started_on: Optional[datetime]
+    finished_on: Optional[datetime]
+
+
 class TestManager(BaseManager):
 
     def get_tests(self):
@@ -248,6 +288,75 @@ class TestManager(BaseManager):
             .all()
         )
 
+    def get_test_summaries(self, student_ids: List[int], subject_id=None) -> List[TestSummary]:
+        """`get_tests_by_student_ids` as `TestSummary` rows: the `questions` and `meta` JSON are never loaded."""
+        if not student_ids:
+            return []
+        query = Test.query.filter(
+            Test.student_id.in_(student_ids), Test.is_completed == True, Test.is_deleted == False
+        )
+        if subject_id:
+            query = query.filter(Test.subject_id == subject_id)
+        rows = query.with_entities(*(getattr(Test, field) for field in TestSummary._fields)).order_by(
+            Test.created_at.desc()
+        )
+        return [TestSummary._make(row) for row in rows]
+
+    def get_cohort_rows(self, student_ids: List[int], subject_id=None, windows=None, by_subject=False):
+        """Completed tests grouped per student (and subject with `by_subject`).
+
+        Rows are ([window,] student_id, [subject_id,] tests, score_sum, seconds, last_created_at).
+        With `windows`, a list of half-open (start, end) created_at bounds, tests are read
+        with one range predicate spanning them all and `window` is the index of the
+        window each group falls in.
+        """
+        if not student_ids:
+            return []
+        keys = [Test.student_id, Test.subject_id] if by_subject else [Test.student_id]
+        query = Test.query.filter(
+            Test.student_id.in_(student_ids), Test.is_completed == True, Test.is_deleted == False
+        )
+        if subject_id:
+            query = query.filter(Test.subject_id == subject_id)
+        if windows:
+            query = query.filter(
+                Test.created_at >= min(start for start, _ in windows),
+                Test.created_at < max(end for _, end in windows),
+            )
+            window = case(
+                *(
+                    (and_(Test.created_at >= start, Test.created_at < end), index)
+                    for index, (start, end) in enumerate(windows)
+                ),
+                else_=None,
+            )
+            keys.insert(0, window)
+        return (
+            query.with_entities(
+                *keys,
+                func.count(Test.id),
+                func.coalesce(func.sum(Test.score_acquired), 0),
+                func.coalesce(func.sum(func.abs(self.seconds_between(Test.started_on, Test.finished_on))), 0),
+                func.max(Test.created_at),
+            )
+            .group_by(*keys)
+            .all()
+        )
+
+    def count_tests_scoring(self, student_ids: List[int], min_score, subject_id=None) -> int:
+        """How many of the students' completed tests scored at least `min_score`."""
+        if not student_ids:
+            return 0
+        query = Test.query.filter(
+            Test.student_id.in_(student_ids),
+            Test.is_completed == True,
+            Test.is_deleted == False,
+            Test.score_acquired >= min_score,
+        )
+        if subject_id:
+            query = query.filter(Test.subject_id == subject_id)
+        return query.count()
+
     def get_last_test_by_student_id(self, student_id, subject_id) -> Test:
         return (
             Test.query.filter_by(
@@ -278,6 +387,43 @@ class TestManager(BaseManager):
 
         return q.order_by(Test.created_at.desc()).limit(limit).all()
 
+    def get_test_metric_rows(self, student_id):
+        """(id, score_acquired, question_number, meta, finished_on) of a student's completed tests, newest first."""
+        return (
+            Test.query.filter(
+                Test.student_id == student_id,
+                Test.is_completed == True,
+                Test.is_deleted == False,
+            )
+            .with_entities(
+                Test.id,
+                Test.score_acquired,
+                Test.question_number,
+                Test.meta,
+                Test.finished_on,
+            )
+            .order_by(Test.finished_on.desc(), Test.id.desc())
+            .all()
+        )
+
+    def get_recent_completed_test_rows(self, student_id, subject_id=None, since=None, limit=None):
+        """(id, finished_on, meta) of a student's completed tests finished on/after `since`, newest first."""
+        query = Test.query.filter(
+            Test.student_id == student_id,
+            Test.is_completed == True,
+            Test.is_deleted == False,
+        )
+        if subject_id:
+            query = query.filter(Test.subject_id == subject_id)
+        if since is not None:
+            query = query.filter(Test.finished_on >= since)
+        query = query.with_entities(Test.id, Test.finished_on, Test.meta).order_by(
+            Test.finished_on.desc(), Test.id.desc()
+        )
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
     def get_average_test_scores(self, student_ids=None) -> List[Dict]:
         return (
             Test.query.filter(Test.is_completed == True)  # Filter for completed tests
@@ -309,10 +455,12 @@ class TestManager(BaseManager):
         meta=None,
         is_completed=False,
     ):
+        from app.test.question_snapshots import question_snapshots
+
         new_test = Test(
             student_id=student_id,
             subject_id=subject_id,
-            questions=questions,
+            questions=question_snapshots.compact(questions),
             total_points=total_points,
             total_score=total_score,
             question_number=question_number,
@@ -329,10 +477,147 @@ class TestManager(BaseManager):
         self.save(new_test)
         return new_test
 
+    def get_recent_paper_fingerprints(self, student_id, subject_id, limit) -> List[str]:
+        """`paper_fingerprint`s recorded on the student's last `limit` tests in the subject."""
+        metas = (
+            Test.query.filter(Test.student_id == student_id, Test.subject_id == subject_id)
+            .with_entities(Test.meta)
+            .order_by(Test.id.desc())
+            .limit(limit)
+            .all()
+        )
+        return [
+            meta["paper_fingerprint"]
+            for (meta,) in metas
+            if isinstance(meta, dict) and meta.get("paper_fingerprint")
+        ]
+
+    def iter_legacy_question_batches(self, batch_size, student_ids=None) -> Iterator[List[Test]]:
+        """Tests whose `questions` still hold full payloads, `batch_size` rows at a time."""
+        query = Test.query.order_by(Test.id)
+        if student_ids:
+            query = query.filter(Test.student_id.in_(student_ids))
+
+        last_id = 0
+        while True:
+            batch = query.filter(Test.id > last_id).limit(batch_size).all()
+            if not batch:
+                return
+            last_id = batch[-1].id
+            legacy = [test for test in batch if isinstance(test.questions, list)]
+            if legacy:
+                yield legacy
+
 
 # endregion TestManager
 
 
+# region ExamPaperManager
+class ExamPaperManager(BaseManager):
+
+    def count_ready(self, subject_id, blueprint_version) -> int:
+        return ExamPaper.query.filter_by(
+            subject_id=subject_id, blueprint_version=blueprint_version
+        ).count()
+
+    def get_ready_fingerprints(self, subject_id, blueprint_version) -> List[str]:
+        rows = (
+            ExamPaper.query.filter_by(subject_id=subject_id, blueprint_version=blueprint_version)
+            .with_entities(ExamPaper.fingerprint)
+            .all()
+        )
+        return [fingerprint for (fingerprint,) in rows]
+
+    def pop(self, subject_id, blueprint_version, exclude_fingerprints=(), seen=None) -> Union[Dict, None]:
+        """Take the oldest ready paper not in `exclude_fingerprints` (SKIP LOCKED on Postgres).
+
+        With `seen` (a student's SeenQuestions), the paper with the fewest seen
+        questions is taken instead, the oldest among equals.
+
+        Returns the paper's `to_json()`; the row itself is deleted.
+        """
+        query = ExamPaper.query.filter_by(subject_id=subject_id, blueprint_version=blueprint_version)
+        if exclude_fingerprints:
+            query = query.filter(ExamPaper.fingerprint.notin_(list(exclude_fingerprints)))
+
+        if seen:
+            candidates = query.with_entities(ExamPaper.id, ExamPaper.question_ids).order_by(ExamPaper.id).all()
+            ranked = sorted(
+                candidates, key=lambda row: sum(1 for qid in row.question_ids or [] if qid in seen)
+            )
+            paper = None
+            for paper_id, _ in ranked:
+                # skip papers another request is taking right now
+                paper = ExamPaper.query.filter_by(id=paper_id).with_for_update(skip_locked=True).first()
+                if paper:
+                    break
+        else:
+            paper = query.order_by(ExamPaper.id).with_for_update(skip_locked=True).first()
+        if not paper:
+            self.commit()
+            return None
+
+        paper_json = paper.to_json()
+        db.session.delete(paper)
+        self.commit()
+        return paper_json
+
+    def add_papers(self, rows: List[Dict]) -> None:
+        self.bulk_insert(ExamPaper, rows)
+        self.commit()
+
+    def purge_stale(self, subject_id, blueprint_version) -> int:
+        """Drop the subject's papers assembled under any other blueprint version."""
+        deleted = ExamPaper.query.filter(
+            ExamPaper.subject_id == subject_id,
+            ExamPaper.blueprint_version != blueprint_version,
+        ).delete(synchronize_session=False)
+        self.commit()
+        return deleted
+
+
+# endregion ExamPaperManager
+
+
+# region QuestionSnapshotManager
+class QuestionSnapshotManager(BaseManager):
+
+    def add_snapshots(self, rows: List[Dict]) -> None:
+        """Store the snapshots in `rows` that aren't stored yet. Joins the caller's transaction."""
+        if not rows:
+            return
+        stored = {
+            content_hash
+            for (content_hash,) in db.session.query(QuestionSnapshot.content_hash).filter(
+                QuestionSnapshot.content_hash.in_([row["content_hash"] for row in rows])
+            )
+        }
+        missing = [row for row in rows if row["content_hash"] not in stored]
+        if not missing:
+            return
+
+        stmt = self.dialect_insert(QuestionSnapshot)
+        if stmt is None:
+            db.session.add_all(QuestionSnapshot(**row) for row in missing)
+        else:
+            # another worker may store the same content concurrently
+            db.session.execute(
+                stmt.values(missing).on_conflict_do_nothing(index_elements=["content_hash"])
+            )
+        self.commit()
+
+    def get_payloads(self, content_hashes) -> Dict[str, Dict]:
+        if not content_hashes:
+            return {}
+        rows = db.session.query(QuestionSnapshot.content_hash, QuestionSnapshot.payload).filter(
+            QuestionSnapshot.content_hash.in_(list(content_hashes))
+        )
+        return {content_hash: payload for content_hash, payload in rows}
+
+
+# endregion QuestionSnapshotManager
+
+
 class QuestionImageManager(BaseManager):
     def create_question_image(self, question_id, image_url, label=None, is_for_answer=False):
         new_image = QuestionImage(
@@ -346,3 +631,5 @@ class QuestionImageManager(BaseManager):
 
 question_manager = QuestionManager()
 test_manager = TestManager()
+exam_paper_manager = ExamPaperManager()
+question_snapshot_manager = QuestionSnapshotManager()
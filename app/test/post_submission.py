@@ -0,0 +1,168 @@
+"""
+Post-submission work for a marked test.
+
+PUT /tests/<id>/mark/ only grades and persists the test; everything derived
+from the result (topic analytics, remarks, streaks, achievements, teacher
+notifications, weekly goals) runs as background jobs drained by
+`flask worker run`. Each handler reloads what it needs by id and is safe to
+retry.
+"""
+
+from datetime import datetime, timezone
+from logging import info as log_info, error as log_error
+from typing import Dict, Optional
+
+from app._shared.schemas import UserTypes
+from app.integrations.pusher import pusher
+from app.jobs.services import JobService, job_registry
+
+
+class PostSubmissionJobs:
+    topic_analytics = "test.topic_analytics"
+    student_progress = "test.student_progress"
+    honor_notifications = "test.honor_notifications"
+
+
+def _topic_rows(topic_scores: Dict, topic_totals: Dict):
+    # JSON object keys are strings; carry topic ids as rows so they stay ints
+    return [
+        [topic_id, score, topic_totals.get(topic_id, 0)]
+        for topic_id, score in topic_scores.items()
+    ]
+
+
+def _topic_dicts(rows):
+    topic_scores = {int(topic_id): score for topic_id, score, _ in rows}
+    topic_totals = {int(topic_id): total for topic_id, _, total in rows}
+    return topic_scores, topic_totals
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def enqueue_post_submission_jobs(
+    test,
+    marked_test: Dict,
+    student_email: Optional[str],
+    last_test_id: Optional[int] = None,
+):
+    """Queue the post-submission jobs for a freshly marked test.
+
+    One of each per submission: the key carries `finished_on`, so re-marking a test
+    queues a fresh set for the new result instead of collapsing onto the first one.
+    """
+    payload = {
+        "test_id": test.id,
+        "student_id": test.student_id,
+        "subject_id": test.subject_id,
+        "email": student_email,
+        "submitted_at": test.finished_on.isoformat(),
+        "xp_earned": float(marked_test["score_acquired"]),
+        "topic_rows": _topic_rows(marked_test["topic_scores"], marked_test["topic_totals"]),
+        "last_test_id": last_test_id,
+    }
+    return [
+        JobService.enqueue(job_type, payload, idempotency_key=f"{job_type}:{test.id}:{payload['submitted_at']}")
+        for job_type in (
+            PostSubmissionJobs.topic_analytics,
+            PostSubmissionJobs.student_progress,
+            PostSubmissionJobs.honor_notifications,
+        )
+    ]
+
+
+@job_registry.register(PostSubmissionJobs.topic_analytics)
+def run_topic_analytics(payload: Dict):
+    from app.analytics.topic_analytics import TopicAnalytics
+    from app.analytics.remarks_analyzer import RemarksAnalyzer
+    from app.test.operations import test_manager
+
+    test = test_manager.get_test_by_id(payload["test_id"])
+    if not test:
+        return
+    topic_scores, topic_totals = _topic_dicts(payload["topic_rows"])
+
+    last_test = (
+        test_manager.get_test_by_id(payload["last_test_id"])
+        if payload.get("last_test_id")
+        else None
+    )
+
+    # topic scores, both analytics passes and the remarks land in one commit
+    with test_manager.unit_of_work():
+        TopicAnalytics.save_topic_scores_for_student(
+            test.student_id, test.subject_id, test.id, topic_scores, topic_totals
+        )
+        TopicAnalytics.test_level_topic_analytics(test.id, topic_scores, topic_totals)
+        TopicAnalytics.student_level_topic_analytics(test.student_id, test.subject_id)
+        RemarksAnalyzer.add_remarks_to_test(test, last_test)
+
+
+@job_registry.register(PostSubmissionJobs.student_progress)
+def run_student_progress(payload: Dict):
+    """Streak, achievements and weekly goals, in that order (both read the new streak)."""
+    from app.achievements.services import AchievementEngine
+    from app.notifications.operations import recipient_manager
+    from app.student.operations import student_manager
+    from app.test.operations import test_manager
+
+    test = test_manager.get_test_by_id(payload["test_id"])
+    student = student_manager.get_student_by_id(payload["student_id"])
+    if not test or not student:
+        return
+
+    submitted_at = datetime.fromisoformat(payload["submitted_at"])
+    email = payload.get("email")
+
+    with student_manager.unit_of_work():
+        # a retry must not count the same submission twice
+        streak_update = None
+        if not student.last_login or _as_naive_utc(student.last_login) < _as_naive_utc(submitted_at):
+            streak_update = student_manager.update_streak(student.id, submitted_at)
+
+        AchievementEngine(student.id).evaluate_for_test(test, email=email)
+
+    if streak_update and streak_update["streak_modified"]:
+        recipient = recipient_manager.get_recipient_by_email(email, UserTypes.student)
+        if recipient:
+            pusher.notify_devices(
+                title=streak_update["message"]["title"],
+                content=streak_update["message"]["content"],
+                device_ids=recipient.device_ids,
+            )
+
+    try:
+        from app.goals.services import UpdateWeeklyGoalsService
+        import pytz
+
+        # week boundaries are in Africa/Accra
+        current_date = submitted_at.astimezone(pytz.timezone("Africa/Accra")).date()
+        result = UpdateWeeklyGoalsService().run(
+            student_id=student.id,
+            current_date=current_date,
+            subject_id=test.subject_id,
+            xp_earned=payload["xp_earned"],
+            current_streak=student.current_streak or 0,
+        )
+        if result["updated"]:
+            log_info(f"Weekly goals update: {result['message']}")
+        else:
+            log_info(f"Weekly goals not updated: {result['message']}")
+    except Exception as e:
+        # Log error but don't fail the job
+        log_error(f"Error updating weekly goals for student {student.id}: {str(e)}")
+
+
+@job_registry.register(PostSubmissionJobs.honor_notifications)
+def run_honor_notifications(payload: Dict):
+    from app.honor_system.services import HonorSystemService
+    from app.student.operations import student_manager
+    from app.test.operations import test_manager
+
+    test = test_manager.get_test_by_id(payload["test_id"])
+    student = student_manager.get_student_by_id(payload["student_id"])
+    if test and student:
+        HonorSystemService().notify_if_needed(test, student)
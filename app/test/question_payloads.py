@@ -0,0 +1,51 @@
+"""
+Pre-rendered `Question.to_json` payloads.
+
+Rendering a question parses `possible_answers` for it and each sub-question and
+walks its topic, sub-questions and images. Payloads are rendered once per
+worker, with and without answers, for a whole batch of questions at a time, and
+kept in the versioned cache under the `question` and `topic` namespaces, which
+the question create/edit/flag/delete paths and topic changes already bump.
+
+Callers get a shallow copy of each payload, so adding keys (e.g. `section`) is
+safe; nested lists are shared and must not be mutated.
+"""
+
+from typing import Dict, Iterable, List
+
+from app._shared.cache import CacheNamespaces, versioned_cache
+
+
+WITH_ANSWERS = "with_answers"
+WITHOUT_ANSWERS = "without_answers"
+
+
+def _key(question_id) -> str:
+    return f"question_payload.{question_id}"
+
+
+def _render(keys: List[str]) -> Dict[str, Dict]:
+    from app.test.operations import question_manager
+
+    question_ids = [int(key.rsplit(".", 1)[1]) for key in keys]
+    return {
+        _key(question.id): {
+            WITH_ANSWERS: question.to_json(include_correct_answer=True),
+            WITHOUT_ANSWERS: question.to_json(include_correct_answer=False),
+        }
+        for question in question_manager.get_questions_in_order(question_ids)
+    }
+
+
+class QuestionPayloadCache:
+    namespaces = (CacheNamespaces.question, CacheNamespaces.topic)
+
+    def get_many(self, question_ids: Iterable[int], include_correct_answer: bool = True) -> List[Dict]:
+        """Payloads for `question_ids`, in order; ids that don't exist are skipped."""
+        keys = [_key(qid) for qid in question_ids]
+        payloads = versioned_cache.get_many(keys, self.namespaces, _render)
+        variant = WITH_ANSWERS if include_correct_answer else WITHOUT_ANSWERS
+        return [dict(payloads[key][variant]) for key in keys if key in payloads]
+
+
+question_payloads = QuestionPayloadCache()
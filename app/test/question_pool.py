@@ -0,0 +1,215 @@
+"""
+Per-subject index of the questions tests are drawn from.
+
+Generating a test used to load every non-flagged Question (with its topic) for
+each level and weigh the ORM objects in Python. The pool keeps only
+(id, topic_id, level, flags, item_type) per question, in flat arrays grouped by
+(level, topic_id, item_type, flags), so sampling happens in memory and only the
+chosen questions are fetched. `QuestionSampler` is the entry point for random
+picks (adaptive tests, the legacy level generator and exam papers).
+
+Pools live in the versioned cache (app/_shared/cache.py). The question create,
+edit, flag and delete paths bump the `question` namespace; topic changes (which
+can move a question to another level or subject) bump `topic`.
+"""
+
+import random
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app._shared.cache import CacheNamespaces, versioned_cache
+from app.extensions import db
+
+
+FLAG_INSTRUCTIONAL = 1
+# how much `sample(avoid=...)` over-draws to find records outside `avoid`
+AVOID_OVERDRAW = 3
+
+
+class PooledQuestion(NamedTuple):
+    id: int
+    topic_id: int
+    level: int
+    flags: int
+    item_type: Optional[str]
+
+    @property
+    def is_instructional(self) -> bool:
+        return bool(self.flags & FLAG_INSTRUCTIONAL)
+
+
+GroupKey = Tuple[int, int, Optional[str], int]
+
+
+class SubjectQuestionPool:
+    """The usable (not deleted, not flagged) questions of one subject."""
+
+    def __init__(self, subject_id: int, rows: Iterable[Tuple]):
+        self.subject_id = subject_id
+        self.ids = array("l")
+        self.topic_ids = array("l")
+        self.levels = array("h")
+        self.flags = array("B")
+        self.item_types: List[Optional[str]] = []
+        # (level, topic_id, item_type, flags) -> positions in the arrays above
+        self.groups: Dict[GroupKey, array] = {}
+        self.positions: Dict[int, int] = {}
+
+        for question_id, topic_id, level, is_instructional, item_type in rows:
+            position = len(self.ids)
+            self.positions[question_id] = position
+            flags = FLAG_INSTRUCTIONAL if is_instructional else 0
+            self.ids.append(question_id)
+            self.topic_ids.append(topic_id)
+            self.levels.append(level or 0)
+            self.flags.append(flags)
+            self.item_types.append(item_type)
+            self.groups.setdefault((level or 0, topic_id, item_type, flags), array("l")).append(position)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def record(self, position: int) -> PooledQuestion:
+        return PooledQuestion(
+            self.ids[position],
+            self.topic_ids[position],
+            self.levels[position],
+            self.flags[position],
+            self.item_types[position],
+        )
+
+    def get(self, question_id: int) -> Optional[PooledQuestion]:
+        """The record for `question_id`, or None if it isn't usable any more."""
+        position = self.positions.get(question_id)
+        return self.record(position) if position is not None else None
+
+    def _matching_groups(
+        self,
+        level: Optional[int] = None,
+        max_level: Optional[int] = None,
+        topic_id: Optional[int] = None,
+        item_types: Optional[Iterable[str]] = None,
+        include_instructional: bool = True,
+    ) -> List[array]:
+        item_types = set(item_types) if item_types is not None else None
+        matching = []
+        for (group_level, group_topic, group_item_type, group_flags), group in self.groups.items():
+            if level is not None and group_level != level:
+                continue
+            if max_level is not None and group_level > max_level:
+                continue
+            if topic_id is not None and group_topic != topic_id:
+                continue
+            if item_types is not None and group_item_type not in item_types:
+                continue
+            if not include_instructional and group_flags & FLAG_INSTRUCTIONAL:
+                continue
+            matching.append(group)
+        return matching
+
+    def questions(self, **filters) -> List[PooledQuestion]:
+        """Records matching every given filter (see `_matching_groups`), in id order."""
+        positions = sorted(p for group in self._matching_groups(**filters) for p in group)
+        return [self.record(position) for position in positions]
+
+    def sample(
+        self, count: int, rng=random, exclude: Iterable[int] = (), avoid=None, **filters
+    ) -> List[PooledQuestion]:
+        """Up to `count` distinct random records matching `filters`, skipping ids in `exclude`.
+
+        Ids in `avoid` (anything supporting `in`, e.g. a student's SeenQuestions)
+        are only used when too few other records turn up in an over-draw of
+        AVOID_OVERDRAW x `count`.
+
+        Draws positions by index over the matching groups, so the cost grows with
+        `count` (and the number of groups), not with the size of the bank.
+        """
+        groups = self._matching_groups(**filters)
+        offsets = list(accumulate(len(group) for group in groups))
+        total = offsets[-1] if offsets else 0
+        exclude = set(exclude)
+
+        # over-draw by len(exclude) so dropping excluded ids still leaves `count`
+        draw = count + len(exclude)
+        if avoid:
+            draw += count * (AVOID_OVERDRAW - 1)
+        picked, avoided = [], []
+        for index in rng.sample(range(total), min(total, draw)):
+            group_index = bisect_right(offsets, index)
+            start = offsets[group_index - 1] if group_index else 0
+            record = self.record(groups[group_index][index - start])
+            if record.id in exclude:
+                continue
+            if avoid and record.id in avoid:
+                avoided.append(record)
+                continue
+            picked.append(record)
+            if len(picked) == count:
+                break
+        return picked + avoided[:count - len(picked)]
+
+
+def _load_pool(subject_id: int) -> SubjectQuestionPool:
+    from app.app_admin.models import Topic
+    from app.test.models import Question
+
+    rows = (
+        db.session.query(
+            Question.id,
+            Question.topic_id,
+            Topic.level,
+            Question.is_instructional,
+            Question.item_type,
+        )
+        .join(Topic, Question.topic_id == Topic.id)
+        .filter(
+            Topic.subject_id == subject_id,
+            Question.is_deleted == False,
+            Question.is_flagged != True,
+        )
+        .order_by(Question.id)
+        .all()
+    )
+    return SubjectQuestionPool(subject_id, rows)
+
+
+class QuestionPoolIndex:
+    namespaces = (CacheNamespaces.question, CacheNamespaces.topic)
+
+    def for_subject(self, subject_id: int) -> SubjectQuestionPool:
+        return versioned_cache.get(
+            f"question_pool.{subject_id}", self.namespaces, lambda: _load_pool(subject_id)
+        )
+
+    def bump(self) -> None:
+        """Invalidate every subject's pool. Joins the caller's transaction."""
+        versioned_cache.bump(CacheNamespaces.question)
+
+
+question_pool = QuestionPoolIndex()
+
+
+class QuestionSampler:
+    """Random questions of one subject, drawn from its pool rather than `ORDER BY random()`."""
+
+    def __init__(self, subject_id: int, rng: Optional[random.Random] = None):
+        self.pool = question_pool.for_subject(subject_id)
+        self.rng = rng or random
+
+    def sample(self, count: int, exclude: Iterable[int] = (), avoid=None, **filters) -> List[PooledQuestion]:
+        return self.pool.sample(count, rng=self.rng, exclude=exclude, avoid=avoid, **filters)
+
+    def sample_ids(self, count: int, exclude: Iterable[int] = (), avoid=None, **filters) -> List[int]:
+        return [record.id for record in self.sample(count, exclude=exclude, avoid=avoid, **filters)]
+
+    @staticmethod
+    def fetch(question_ids: List[int]) -> List:
+        """The Question rows for `question_ids`, in that order."""
+        from app.test.operations import question_manager
+
+        return question_manager.get_questions_in_order(question_ids)
+
+    def sample_questions(self, count: int, exclude: Iterable[int] = (), **filters) -> List:
+        return self.fetch(self.sample_ids(count, exclude=exclude, **filters))
@@ -0,0 +1,170 @@
+"""
+Compact storage for `Test.questions`.
+
+A test used to store every question payload it was served (text, options,
+images, sub-questions) and marking wrote the whole thing back. Now the column
+holds
+
+    {"format": "compact-v1", "items": [...]}
+
+with one small item per question: its id, the hash of the content the student
+was served (`v`), topic and level, and the per-student state (answers,
+correctness, points, `meta` timing). The content itself is kept once per
+distinct hash in `question_snapshot`, so an edited question gets a new
+snapshot while old tests keep pointing at what they showed.
+
+Readers that only need answers and timing use `question_items`; full payloads
+are rehydrated with `QuestionSnapshotStore.expand` when a client needs them.
+Rows written before this change (a plain list of payloads) are read as-is, and
+setting COMPACT_TEST_QUESTIONS = False keeps writing that format.
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+
+
+FORMAT = "compact-v1"
+
+# per-student keys of a question payload; everything else is content
+ITEM_FIELDS = ("index", "section", "student_answer", "correct_answer", "points", "meta", "opened", "options")
+SUB_ITEM_FIELDS = ("student_answer", "correct_answer")
+# keys of an item that aren't part of the rehydrated payload
+_ITEM_ONLY = ("v", "subs", "is_correct")
+
+
+def is_compact(stored) -> bool:
+    return isinstance(stored, dict) and stored.get("format") == FORMAT
+
+
+def question_items(stored) -> List[Dict]:
+    """Per-question dicts with at least `id`, `topic_id`, `level`, the answers and `meta`.
+
+    Works for both formats: legacy rows already are a list of such dicts.
+    """
+    if is_compact(stored):
+        return stored["items"]
+    return stored or []
+
+
+def content_version(content: Dict) -> str:
+    raw = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def split_question(payload: Dict) -> Tuple[Dict, Dict]:
+    """(content, item) for one question payload; `item["v"]` is the content's hash."""
+    content = {key: value for key, value in payload.items() if key not in ITEM_FIELDS}
+    sub_states = []
+    if payload.get("sub_questions") is not None:
+        content["sub_questions"] = []
+        for sub in payload["sub_questions"]:
+            content["sub_questions"].append(
+                {key: value for key, value in sub.items() if key not in SUB_ITEM_FIELDS}
+            )
+            state = {key: sub[key] for key in SUB_ITEM_FIELDS if key in sub}
+            if state:
+                sub_states.append({"id": sub.get("id"), **state})
+
+    item = {
+        "id": payload.get("id"),
+        "v": content_version(content),
+        "topic_id": payload.get("topic_id"),
+        "level": payload.get("level"),
+    }
+    item.update((key, payload[key]) for key in ITEM_FIELDS if key in payload)
+    if sub_states:
+        item["subs"] = sub_states
+    if "correct_answer" in item:
+        item["is_correct"] = item.get("student_answer") == item["correct_answer"]
+    return content, item
+
+
+def merge_item(content: Dict, item: Dict) -> Dict:
+    """The full payload for `item`, given its snapshot `content`."""
+    payload = dict(content)
+    payload.update((key, value) for key, value in item.items() if key not in _ITEM_ONLY)
+    if item.get("subs"):
+        states = {state["id"]: state for state in item["subs"]}
+        payload["sub_questions"] = [
+            {**sub, **{k: v for k, v in states.get(sub.get("id"), {}).items() if k != "id"}}
+            for sub in content.get("sub_questions") or []
+        ]
+    return payload
+
+
+class QuestionSnapshotStore:
+    def enabled(self) -> bool:
+        return current_app.config.get("COMPACT_TEST_QUESTIONS", True)
+
+    def compact(self, questions: List[Dict], previous=None):
+        """The value to store in `Test.questions` for these payloads.
+
+        Pass the test's current value as `previous` when re-storing a submission:
+        questions it already holds keep their served snapshot, whatever the client
+        sent back as content. Writes any new snapshots; joins the caller's transaction.
+        """
+        from app.test.operations import question_snapshot_manager
+
+        if not self.enabled():
+            return questions
+
+        served = {item["id"]: item["v"] for item in question_items(previous) if item.get("v")}
+        items, snapshots = [], {}
+        for payload in questions:
+            content, item = split_question(payload)
+            if served.get(item["id"]):
+                item["v"] = served[item["id"]]
+            else:
+                snapshots[item["v"]] = {
+                    "content_hash": item["v"],
+                    "question_id": item["id"],
+                    "payload": content,
+                }
+            items.append(item)
+
+        question_snapshot_manager.add_snapshots(list(snapshots.values()))
+        return {"format": FORMAT, "items": items}
+
+    def expand(self, stored) -> List[Dict]:
+        """Full question payloads for a stored `Test.questions` value."""
+        return self.expand_many([stored])[0]
+
+    def expand_many(self, stored_values: Iterable) -> List[List[Dict]]:
+        """`expand` for several tests with one snapshot lookup."""
+        from app.test.operations import question_snapshot_manager
+
+        stored_values = list(stored_values)
+        hashes = {
+            item["v"] for stored in stored_values if is_compact(stored) for item in stored["items"]
+        }
+        contents = question_snapshot_manager.get_payloads(hashes)
+
+        expanded = []
+        for stored in stored_values:
+            if not is_compact(stored):
+                expanded.append(stored or [])
+                continue
+            expanded.append([
+                merge_item(contents.get(item["v"], {}), item) for item in stored["items"]
+            ])
+        return expanded
+
+    def compact_legacy_rows(self, batch_size: int = 500, student_ids: Optional[List[int]] = None) -> int:
+        """Rewrite tests still holding full payloads in the compact format. Returns tests rewritten."""
+        from app.test.operations import test_manager
+
+        if not self.enabled():
+            return 0
+        rewritten = 0
+        for batch in test_manager.iter_legacy_question_batches(batch_size, student_ids=student_ids):
+            with test_manager.unit_of_work():
+                for test in batch:
+                    test.questions = self.compact(test.questions)
+            rewritten += len(batch)
+        return rewritten
+
+
+question_snapshots = QuestionSnapshotStore()
@@ -16,8 +16,20 @@ from app._shared.services import get_current_user
 from app.extensions import db
 
 from app.app_admin.operations import subject_manager
-
+from app.analytics.operations import (
+    integrity_manager,
+    review_manager,
+    rollup_manager,
+    seen_manager,
+    sqo_manager,
+    stats_manager,
+)
+from app.analytics.response_cache import analytics_responses
 from app.test.operations import question_manager, test_manager
+from app.test.exam_papers import exam_paper_pool
+from app.test.question_payloads import question_payloads
+from app.test.question_pool import question_pool
+from app.test.question_snapshots import question_snapshots
 from app.test.schemas import (
     TestQuestionsListSchema,
     QuestionListSchema,
@@ -39,14 +51,9 @@ from app.subscriptions.constants import (
     FeatureStatus,
     TierNames,
 )
-from app.notifications.operations import recipient_manager
 
-
-from app.analytics.topic_analytics import TopicAnalytics
-from app.analytics.remarks_analyzer import RemarksAnalyzer
-from app.achievements.services import AchievementEngine
 from app.honor_system.services import HonorSystemService
-from app.integrations.pusher import pusher
+from app.test.post_submission import enqueue_post_submission_jobs
 from app.integrations.mailer import mailer
 
 import json
@@ -62,7 +69,7 @@ testr = APIBlueprint("testr", __name__)
 @testr.output(QuestionListSchema, 200)
 @token_auth([UserTypes.admin])
 def get_questions(query_data):
-    pagination = question_manager.get_questions_paginated(
+    pagination = question_manager.get_question_ids_paginated(
         page=query_data["page"],
         per_page=query_data["per_page"],
         subject_id=query_data.get("subject_id"),
@@ -71,7 +78,7 @@ def get_questions(query_data):
         search=query_data.get("search"),
     )
     return success_response(
-        data=[question.to_json() for question in pagination.items],
+        data=question_payloads.get_many(question_id for (question_id,) in pagination.items),
         pagination={
             "page": pagination.page,
             "per_page": pagination.per_page,
@@ -93,6 +100,8 @@ def post_questions(json_data):
     if sub:
         for s in sub:
             question_manager.create_subquestion(parent_question_id=new_question.id, **s)
+        # rendered payloads must pick up the sub-questions too
+        question_pool.bump()
     return success_response(data=new_question.to_json())
 
 
@@ -140,6 +149,7 @@ def edit_questions(question_id, json_data):
         db.session.add(new_sub)
 
     db.session.commit()
+    question_pool.bump()
     return success_response(data=question.to_json())
 
 
@@ -155,6 +165,7 @@ def delete_questions(question_id):
             sub.delete()
 
         question.delete()
+        question_pool.bump()
     return success_response()
 
 
@@ -175,6 +186,7 @@ def flag_questions(json_data):
             question.is_flagged = True
             question.flag_reason = json.dumps(objects[question.id])
             question.save()
+        question_pool.bump()
         html = render_template("flagged_questions.html", questions=questions)
          # send notification to admins here
 
@@ -218,7 +230,9 @@ def test_history(query_data: Dict):
 
     subjects = {subject.id: subject for subject in subjects}
 
-    tests = [test.to_json() for test in tests]
+    # one snapshot lookup rehydrates every test's questions
+    expanded = question_snapshots.expand_many(test.questions for test in tests)
+    tests = [test.to_json(questions=questions) for test, questions in zip(tests, expanded)]
     for test in tests:
         test["subject_name"] = subjects[test["subject_id"]].to_json()["name"]
 
@@ -271,24 +285,18 @@ def create_test(json_data):
     # and a 40-question paper mixed across ALL levels for every other subject. Level
     # (practice) mode uses the adaptive, performance-based generator.
     is_exam_paper = exam_mode == ExamModes.exam
+    test_meta = {"mode": exam_mode}
     if is_exam_paper:
-        questions = []
-        for q, section in TestService.generate_exam_questions(subject.short_name, subject_id):
-            q_json = q.to_json(include_correct_answer=False)
-            q_json["section"] = section
-            questions.append(q_json)
-        # exam marks are flat: a passage parent contributes its gaps, not itself
-        total_points = sum(
-            len(q.get("sub_questions") or []) if q.get("is_instructional") else 1
-            for q in questions
-        )
+        # ready-made papers come from the warm pool (app/test/exam_papers.py)
+        paper = exam_paper_pool.pop(student.id, subject.short_name, subject_id)
+        questions = paper["questions"]
+        total_points = paper["total_points"]
+        test_meta["paper_fingerprint"] = paper["fingerprint"]
     else:
-        question_objs = TestService.generate_adaptive_questions(
+        question_ids = TestService.generate_adaptive_question_ids(
             subject_id, student.id, student_level.level
         )
-        questions = [
-            question.to_json(include_correct_answer=False) for question in question_objs
-        ]
+        questions = question_payloads.get_many(question_ids, include_correct_answer=False)
         total_points = TestService.determine_total_test_points(questions)
 
     # number of questions should include sub questions
@@ -301,10 +309,10 @@ def create_test(json_data):
         total_points=total_points,
         question_number=len(questions),
         school_id=student.school_id,
-        meta={"mode": exam_mode},
+        meta=test_meta,
     )
 
-    test_obj = new_test.to_json()
+    test_obj = new_test.to_json(questions=questions)
     test_obj["duration"] = (
         TestService.get_exam_duration(subject.short_name)
         if is_exam_paper
@@ -318,6 +326,8 @@ def create_test(json_data):
 @testr.input(Requests.MarkTestSchema)
 @testr.output(SuccessMessage, 200)
 @token_auth([UserTypes.student])
+# grading, the level update and the queued follow-up jobs commit together
+@test_manager.unit_of_work()
 def mark_test(test_id, json_data):
     json_data = json_data["data"]
     test = test_manager.get_test_by_id(test_id)
@@ -329,6 +339,7 @@ def mark_test(test_id, json_data):
         return not_found(message="The requested Test does not exist!")
 
     if test:
+        newly_completed = not test.is_completed
         test.is_completed = True
         # TODO: Determine the level that'll deduct points
 
@@ -366,13 +377,26 @@ def mark_test(test_id, json_data):
             marked_test["correct_count"] = 0
             test_meta["terminated_reason"] = "anti_cheat"
         test.meta = test_meta
-        test.questions = marked_test["questions"]
+        # answers and timing per item; the content stays in its served snapshot
+        test.questions = question_snapshots.compact(marked_test["questions"], previous=test.questions)
         # questions_correct should be a count, not the percent score.
         test.questions_correct = marked_test.get("correct_count")
         test.question_number = marked_test.get("total_questions")
         test.points_acquired = marked_test["points_acquired"]
         test.score_acquired = marked_test["score_acquired"]
         test.save()
+        sqo_manager.record_test(test)
+        seen_manager.record_test(test)
+
+        if newly_completed:
+            stats_manager.record_test(test)
+            integrity_manager.record_test(test)
+            review_manager.record_test(test)
+            rollup_manager.record_test(test)
+        else:
+            # a re-mark changes a score the rollup already counted
+            rollup_manager.refresh_test_day(test)
+        analytics_responses.invalidate_school(test.school_id or student.get("school_id"))
 
         # update their points
         stusublvl = stusublvl_manager.get_student_subject_level(
@@ -388,85 +412,16 @@ def mark_test(test_id, json_data):
         # and then add the history accordingly
         SubjectLevelManager.check_and_level_up(stu_sub_level=stusublvl)
 
-        log_info("Running analytics...")
-        # adding topic_scores
-        # TODO: probably pass the test metadata here and then handle saving it here when they all return their responses
-        TopicAnalytics.save_topic_scores_for_student(
-            student_id, test.subject_id, test.id, marked_test["topic_scores"], marked_test["topic_totals"]
-        )
-        TopicAnalytics.test_level_topic_analytics(test.id, marked_test["topic_scores"], marked_test["topic_totals"])
-        TopicAnalytics.student_level_topic_analytics(student_id, test.subject_id)
-        RemarksAnalyzer.add_remarks_to_test(test, last_test)
-
-        streak_update = student_manager.update_streak(student_id, datetime.now(timezone.utc))
-
-        # Evaluate achievements after streak update so streak-based achievements
-        # use the latest streak value.
-        test_count = len(test_manager.get_tests_by_student_ids([student_id]))
-
-        engine = AchievementEngine(student_id)
-        engine.check_test_achievements(
-            test.subject_id,
-            test.score_acquired,
-            test_count,
-            email=student["user_email"],
+        # topic analytics, remarks, streaks, achievements, teacher notifications and
+        # weekly goals run in the background (see app/test/post_submission.py)
+        enqueue_post_submission_jobs(
+            test,
+            marked_test,
+            student_email=student["user_email"],
+            last_test_id=last_test.id if last_test else None,
         )
-        engine.check_level_achievements(email=student["user_email"])
-
-        # Teacher notifications: cheating too much / honor vibes
-        try:
-            student_obj = student_manager.get_student_by_id(student_id)
-            if student_obj:
-                honor.notify_if_needed(test, student_obj)
-        except Exception:
-            pass
-
-        if streak_update["streak_modified"]:
-            recipient = recipient_manager.get_recipient_by_email(
-                student["user_email"], UserTypes.student
-            )
-            if recipient:
-                pusher.notify_devices(
-                    title=streak_update["message"]["title"],
-                    content=streak_update["message"]["content"],
-                    device_ids=recipient.device_ids,
-                )
-
-        # Update weekly goals
-        try:
-            from app.goals.services import UpdateWeeklyGoalsService
-            import pytz
-            
-            # Get current date in Africa/Accra timezone
-            accra_tz = pytz.timezone('Africa/Accra')
-            current_date = datetime.now(accra_tz).date()
-            
-            # Get student's current streak
-            student_obj = student_manager.get_student_by_id(student_id)
-            
-            # Update weekly goals using the service
-            update_service = UpdateWeeklyGoalsService()
-            result = update_service.run(
-                student_id=student_id,
-                current_date=current_date,
-                subject_id=test.subject_id,
-                xp_earned=marked_test["score_acquired"],
-                current_streak=student_obj.current_streak if student_obj else 0
-            )
-            
-            if result["updated"]:
-                log_info(f"Weekly goals update: {result['message']}")
-            else:
-                log_info(f"Weekly goals not updated: {result['message']}")
-                
-        except Exception as e:
-            # Log error but don't fail the test marking
-            from logging import error as log_error
-            log_error(f"Error updating weekly goals for student {student_id}: {str(e)}")
-
-        log_info("Analytics ran successfully...")
-
-    return success_response(data=test.to_json())
+
+    return success_response(data=test.to_json(questions=marked_test["questions"]))
 
 
 # endregion Tests
@@ -16,10 +16,9 @@ from .adaptive_test_service import (
 )
 
 
-from app.extensions import db
 from app._shared.schemas import ExamModes, QuestionsNumberLimiter, QuestionPoints
-from app.app_admin.models import Topic
 from app.test.models import Question
+from app.test.question_pool import QuestionSampler
 
 
 # Every BECE objective paper is 40 questions. Subjects without an item_type blueprint
@@ -64,30 +63,41 @@ class TestService:
         return bp["duration"] if bp else 3000
 
     @staticmethod
-    def generate_exam_questions(subject_short_name, subject_id):
+    def generate_exam_questions(subject_short_name, subject_id, seen=None):
         """Assemble a real exam paper as a list of (Question, section_name) pairs.
 
+        See generate_exam_question_ids for the composition.
+        """
+        slots = TestService.generate_exam_question_ids(subject_short_name, subject_id, seen=seen)
+        sections = dict(slots)
+        questions = QuestionSampler.fetch([qid for qid, _ in slots])
+        return [(q, sections[q.id]) for q in questions]
+
+    @staticmethod
+    def generate_exam_question_ids(subject_short_name, subject_id, seen=None):
+        """Assemble a real exam paper as a list of (question_id, section_name) pairs.
+
         - Subjects WITH a blueprint (English) get the fixed sectioned composition.
         - Every other subject gets EXAM_QUESTION_COUNT questions mixed across ALL
           levels (a full mock paper), under a single "Objective Test" section.
+
+        Questions in `seen` (a student's SeenQuestions) are avoided where the bank allows.
         """
-        from app.test.operations import question_manager
+        sampler = QuestionSampler(subject_id)
 
         bp = EXAM_BLUEPRINTS.get(subject_short_name)
         if bp:
-            out = []
-            for section_name, slots in bp["sections"]:
-                for item_types, count in slots:
-                    for q in question_manager.get_questions_by_item_types(
-                        subject_id, item_types, count
-                    ):
-                        out.append((q, section_name))
-            return out
-
-        questions = question_manager.get_random_questions_for_subject(
-            subject_id, EXAM_QUESTION_COUNT
-        )
-        return [(q, "Objective Test") for q in questions]
+            slots = []
+            for section_name, section_slots in bp["sections"]:
+                for item_types, count in section_slots:
+                    slots.extend(
+                        (qid, section_name)
+                        for qid in sampler.sample_ids(count, avoid=seen, item_types=item_types)
+                    )
+            return slots
+
+        question_ids = sampler.sample_ids(EXAM_QUESTION_COUNT, avoid=seen, include_instructional=False)
+        return [(qid, "Objective Test") for qid in question_ids]
 
     @staticmethod
     def is_mode_accessible(exam_mode, student_level):
@@ -190,27 +200,15 @@ class TestService:
             total_questions, student_level
         )  # max level is student_level
 
-        questions = []
+        sampler = QuestionSampler(subject_id)
+        question_ids = []
 
         for level, count in level_counts.items():
-            level_questions = (
-                db.session.query(Question)
-                .join(Topic, Question.topic_id == Topic.id)
-                .filter(
-                    Topic.level == level,
-                    Topic.subject_id == subject_id,
-                    Question.is_deleted == False,
-                    Question.is_flagged != True,
-                )
-                .order_by(db.func.random())
-                .limit(count)
-                .all()
-            )
-            questions.extend(level_questions)
+            question_ids.extend(sampler.sample_ids(count, level=level))
 
         # Shuffle the final list to ensure overall randomness
-        random.shuffle(questions)
-        return questions
+        random.shuffle(question_ids)
+        return sampler.fetch(question_ids)
     
     @staticmethod
     def generate_adaptive_questions(
@@ -243,6 +241,15 @@ class TestService:
             student_level=student_level
         )
     
+    @staticmethod
+    def generate_adaptive_question_ids(subject_id: int, student_id: int, student_level: int) -> List[int]:
+        """Ids of generate_adaptive_questions(), for callers that render from cached payloads."""
+        return AdaptiveTestService.generate_adaptive_question_ids(
+            subject_id=subject_id,
+            student_id=student_id,
+            student_level=student_level
+        )
+    
     @staticmethod
     def get_test_generation_preview(
         subject_id: int,
@@ -265,7 +272,7 @@ class TestService:
                 'performance_summary': {...}
             }
         """
-        from app.app_admin.operations import topic_manager
+        from app.app_admin.catalog import reference_catalog
         
         # Analyze performance
         performance_data = PerformanceAnalyzer.analyze_recent_performance(
@@ -287,17 +294,17 @@ class TestService:
         
         # Get topic names
         critical_topics = [
-            topic_manager.get_topic_by_id(tid).name 
+            reference_catalog.topic(tid).name 
             for tid in performance_data['critical_topics']
         ]
         mastered_topics = [
-            topic_manager.get_topic_by_id(tid).name 
+            reference_catalog.topic(tid).name 
             for tid in performance_data['mastered_topics']
         ]
         
         # Get weak topics (not critical but below proficient)
         weak_topics = [
-            topic_manager.get_topic_by_id(tid).name
+            reference_catalog.topic(tid).name
             for tid, score in performance_data['topic_weights'].items()
             if score < 70 and tid not in performance_data['critical_topics']
         ]
@@ -340,11 +347,11 @@ class TestService:
         )
         
         # Get topic names
-        from app.app_admin.operations import topic_manager
+        from app.app_admin.catalog import reference_catalog
         
         strengths = [
             {
-                'topic': topic_manager.get_topic_by_id(tid).name,
+                'topic': reference_catalog.topic(tid).name,
                 'score': performance_data['topic_weights'][tid]
             }
             for tid in performance_data['mastered_topics']
@@ -352,7 +359,7 @@ class TestService:
         
         areas_for_improvement = [
             {
-                'topic': topic_manager.get_topic_by_id(tid).name,
+                'topic': reference_catalog.topic(tid).name,
                 'score': performance_data['topic_weights'][tid],
                 'priority': 'high' if tid in performance_data['critical_topics'] else 'medium'
             }
@@ -481,7 +488,7 @@ class TestService:
     
     @staticmethod
     def mark_test(questions, deduct_points=False, flat=False):
-        from app.test.operations import question_manager
+        from app.test.answer_key import AnswerKey
         # flat=True -> exam scoring: every correct answer is worth exactly 1 mark
         # (main or sub). flat=False -> level-weighted practice points.
 
@@ -495,8 +502,11 @@ class TestService:
         topic_scores = {question["topic_id"]: 0 for question in questions}
         topic_totals = {question["topic_id"]: 0 for question in questions}
 
+        # every referenced question/sub-question is loaded up front; no queries below
+        answer_key = AnswerKey.for_submission(questions)
+
         for question in questions:
-            q = question_manager.get_question_by_id(question["id"])
+            q = answer_key.question(question["id"])
             if not q:
                 total_number -= 1
                 continue 
@@ -525,7 +535,7 @@ class TestService:
             if len(question["sub_questions"]) > 0:
                 total_number += len(question["sub_questions"])
                 for sub in question["sub_questions"]:
-                    s = question_manager.get_sub_question_by_id(sub["id"])
+                    s = answer_key.sub_question(sub["id"])
                     if not s:
                         total_number -= 1
                         continue
@@ -0,0 +1,328 @@
+"""
+Offline simulator and benchmark for the adaptive test generator.
+
+`AdaptiveEngineSimulator` seeds a synthetic subject (themes, topics, questions)
+and synthetic students with marked test histories into the configured
+database, then calls `AdaptiveTestService.generate_adaptive_questions` many
+times and reports latency, queries per generation, memory and how well the
+generated tests are spread (topic coverage, repeats of recently seen
+questions). The report is a plain dict so `flask tests simulate --output` can
+write it as JSON and CI can diff it against a previous run.
+
+Point it at a scratch database (a local SQLite file or a throwaway Postgres);
+the seeded rows are not removed afterwards.
+"""
+
+import math
+import random
+import resource
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import event
+
+from app._shared.operations import BaseManager
+from app.extensions import db
+
+
+REPORT_VERSION = 1
+
+
+@dataclass
+class SimulationConfig:
+    levels: int = 3
+    topics_per_level: int = 8
+    questions_per_topic: int = 40
+    students: int = 50
+    history_tests: int = 5
+    questions_per_history_test: int = 10
+    generations: int = 1000
+    # generations re-run under tracemalloc, which is too slow for the timed pass
+    memory_samples: int = 50
+    seed: int = 0
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50": round(_percentile(values, 50), 3),
+        "p95": round(_percentile(values, 95), 3),
+        "p99": round(_percentile(values, 99), 3),
+        "max": round(max(values), 3) if values else 0.0,
+    }
+
+
+class AdaptiveEngineSimulator:
+    def __init__(self, config: SimulationConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.token = uuid.uuid4().hex[:6]
+        self.subject_id = None
+        self.topic_levels: Dict[int, int] = {}
+        # student_id -> (level, question ids answered in the seeded history)
+        self.students: Dict[int, tuple] = {}
+
+    # region seeding
+
+    def seed(self) -> None:
+        """Create the synthetic subject, question bank and student histories, in one transaction."""
+        with BaseManager.unit_of_work():
+            school_id = self._seed_catalog()
+            questions = self._seed_questions()
+            self._seed_students(school_id, questions)
+
+    def _seed_catalog(self) -> int:
+        from app.app_admin.models import Subject, Theme, Topic
+        from app.school.models import School
+
+        config = self.config
+        school = School(
+            name=f"Simulated School {self.token}",
+            short_name=f"sim{self.token}",
+            code=f"SIM-{self.token}",
+            location="Simulation",
+        )
+        subject = Subject(name=f"Simulated {self.token}", short_name=f"SIM{self.token}", curriculum="bece")
+        db.session.add_all([school, subject])
+        db.session.flush()
+        theme = Theme(name=f"Simulated {self.token}", short_name=f"SIMT{self.token}", subject_id=subject.id)
+        db.session.add(theme)
+        db.session.flush()
+
+        topics = [
+            Topic(
+                name=f"Topic {level}.{index}",
+                short_name=f"S{self.token}{level:02d}{index:03d}",
+                level=level,
+                theme_id=theme.id,
+                subject_id=subject.id,
+            )
+            for level in range(1, config.levels + 1)
+            for index in range(config.topics_per_level)
+        ]
+        db.session.add_all(topics)
+        db.session.flush()
+        self.subject_id = subject.id
+        self.topic_levels = {topic.id: topic.level for topic in topics}
+        return school.id
+
+    def _seed_questions(self) -> Dict[int, List[tuple]]:
+        """Insert the question bank; returns level -> [(question_id, topic_id, level)]."""
+        from app.test.models import Question
+
+        rows = [
+            {
+                "text": f"Synthetic question {topic_id}.{index}",
+                "possible_answers": "['A', 'B', 'C', 'D']",
+                "correct_answer": "A",
+                "topic_id": topic_id,
+                "is_flagged": False,
+                "is_instructional": False,
+                "is_deleted": False,
+            }
+            for topic_id in self.topic_levels
+            for index in range(self.config.questions_per_topic)
+        ]
+        BaseManager.bulk_insert(Question, rows)
+
+        by_level: Dict[int, List[tuple]] = {}
+        question_rows = db.session.query(Question.id, Question.topic_id).filter(
+            Question.topic_id.in_(list(self.topic_levels))
+        )
+        for question_id, topic_id in question_rows:
+            level = self.topic_levels[topic_id]
+            by_level.setdefault(level, []).append((question_id, topic_id, level))
+        return by_level
+
+    def _seed_students(self, school_id, questions: Dict[int, List[tuple]]) -> None:
+        from app.analytics.models import StudentTopicScores
+        from app.analytics.operations import review_manager, seen_manager, sqo_manager
+        from app.student.models import Student
+        from app.test.models import Test
+        from app.test.question_snapshots import question_snapshots
+
+        config = self.config
+        now = datetime.utcnow()
+        for index in range(config.students):
+            student = Student(
+                first_name="Sim",
+                surname=f"Student {index}",
+                email=f"sim-{self.token}-{index}@testora.sim",
+                password_hash="!",
+                school_id=school_id,
+                is_approved=True,
+            )
+            db.session.add(student)
+            db.session.flush()
+
+            level = self.rng.randint(1, config.levels)
+            # each student is strong in some topics and weak in others
+            skill = {topic_id: self.rng.uniform(0.2, 0.95) for topic_id in self.topic_levels}
+            bank = [q for lvl in range(1, level + 1) for q in questions.get(lvl, [])]
+            seen = []
+
+            for age in range(config.history_tests, 0, -1):
+                picked = self.rng.sample(bank, min(len(bank), config.questions_per_history_test))
+                payloads, topic_results = [], {}
+                for question_id, topic_id, question_level in picked:
+                    correct = self.rng.random() < skill[topic_id]
+                    payloads.append({
+                        "id": question_id,
+                        "topic_id": topic_id,
+                        "level": question_level,
+                        "student_answer": "A" if correct else "B",
+                        "correct_answer": "A",
+                        "sub_questions": [],
+                    })
+                    topic_results.setdefault(topic_id, []).append(correct)
+                    seen.append(question_id)
+
+                finished_on = now - timedelta(days=age)
+                test = Test(
+                    student_id=student.id,
+                    subject_id=self.subject_id,
+                    school_id=school_id,
+                    questions=question_snapshots.compact(payloads),
+                    total_points=len(payloads),
+                    points_acquired=0,
+                    score_acquired=0,
+                    question_number=len(payloads),
+                    is_completed=True,
+                    started_on=finished_on - timedelta(minutes=20),
+                    finished_on=finished_on,
+                )
+                db.session.add(test)
+                db.session.flush()
+                sqo_manager.record_test(test)
+                seen_manager.record_test(test)
+                review_manager.record_test(test)
+                BaseManager.bulk_insert(
+                    StudentTopicScores,
+                    [
+                        {
+                            "student_id": student.id,
+                            "subject_id": self.subject_id,
+                            "test_id": test.id,
+                            "topic_id": topic_id,
+                            "score_acquired": round(100 * sum(results) / len(results), 2),
+                        }
+                        for topic_id, results in topic_results.items()
+                    ],
+                )
+
+            self.students[student.id] = (level, set(seen))
+
+    # endregion seeding
+
+    # region benchmark
+
+    def _generate(self, student_id, level, seed):
+        from app.test.adaptive_test_service import AdaptiveTestService
+
+        return AdaptiveTestService.generate_adaptive_questions(
+            self.subject_id, student_id, level, seed=seed
+        )
+
+    def run(self) -> Dict:
+        """Seed, run the generations and return the report."""
+        started = time.perf_counter()
+        self.seed()
+        seed_seconds = time.perf_counter() - started
+
+        config = self.config
+        student_ids = list(self.students)
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        latencies, query_counts = [], []
+        coverage, repeats, sizes = [], [], []
+        levels = Counter()
+
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            # the first call also loads the question pool
+            cold_started = time.perf_counter()
+            self._generate(student_ids[0], self.students[student_ids[0]][0], seed=config.seed)
+            cold_ms = (time.perf_counter() - cold_started) * 1000
+            db.session.rollback()
+
+            for generation in range(config.generations):
+                student_id = student_ids[generation % len(student_ids)]
+                level, seen = self.students[student_id]
+                statements.clear()
+
+                generation_started = time.perf_counter()
+                questions = self._generate(student_id, level, seed=config.seed + generation)
+                latencies.append((time.perf_counter() - generation_started) * 1000)
+                query_counts.append(len(statements))
+
+                ids = [question.id for question in questions]
+                topics = {question.topic_id for question in questions}
+                available_topics = min(level * config.topics_per_level, len(ids)) or 1
+                sizes.append(len(ids))
+                coverage.append(len(topics) / available_topics)
+                repeats.append(sum(1 for qid in ids if qid in seen) / len(ids) if ids else 0.0)
+                levels.update(self.topic_levels[question.topic_id] for question in questions)
+                # drop the identity map so every generation starts like a fresh request
+                db.session.rollback()
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+        tracemalloc.start()
+        peaks = []
+        try:
+            for generation in range(min(config.memory_samples, config.generations)):
+                student_id = student_ids[generation % len(student_ids)]
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                self._generate(student_id, self.students[student_id][0], seed=config.seed + generation)
+                peaks.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+                db.session.rollback()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "report_version": REPORT_VERSION,
+            "database": engine.dialect.name,
+            "config": asdict(config),
+            "bank": {
+                "topics": len(self.topic_levels),
+                "questions": len(self.topic_levels) * config.questions_per_topic,
+                "students": len(student_ids),
+            },
+            "seed_seconds": round(seed_seconds, 3),
+            "generations": config.generations,
+            "cold_latency_ms": round(cold_ms, 3),
+            "latency_ms": _summary(latencies),
+            "queries_per_generation": _summary(query_counts),
+            "memory": {
+                "peak_kb_per_generation": _summary(peaks),
+                # ru_maxrss is KiB on Linux
+                "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            },
+            "distribution": {
+                "questions_per_test": _summary(sizes),
+                "topic_coverage": _summary(coverage),
+                "repeat_rate": _summary(repeats),
+                "level_histogram": {str(level): count for level, count in sorted(levels.items())},
+            },
+        }
+
+    # endregion benchmark
@@ -9,6 +9,25 @@ load_dotenv()
 class BaseConfig(object):
     basedir = os.path.abspath(os.path.dirname(__file__))
     DEBUG = False
+    # how often each worker re-reads the cache_version counters (app/_shared/cache.py)
+    CACHE_VERSION_CHECK_SECONDS = 5
+    # ready exam papers kept per subject, refilled in the background below the low-water mark
+    EXAM_PAPER_POOL_SIZE = 10
+    EXAM_PAPER_POOL_LOW_WATER = 3
+    # store Test.questions as compact items + question snapshots (app/test/question_snapshots.py);
+    # False keeps writing full payloads. Both formats are always readable.
+    COMPACT_TEST_QUESTIONS = True
+    # share of each practice test drawn from missed questions that are due for review
+    ADAPTIVE_REVIEW_SHARE = 0.3
+    # where dashboard weeks and months start (app/analytics/time_windows.py)
+    ANALYTICS_TIMEZONE = "Africa/Accra"
+    # read the school dashboards from daily_activity_rollup instead of the test table;
+    # turn on once `flask stats rebuild` has backfilled the rollup
+    DASHBOARD_ROLLUP = False
+    # stores for cached school analytics responses, fastest first (app/analytics/response_cache.py);
+    # an empty tuple turns the cache off
+    ANALYTICS_RESPONSE_CACHE = ("memory", "database")
+    ANALYTICS_RESPONSE_CACHE_SIZE = 1024
 
 
 class DevelopmentConfig(BaseConfig):
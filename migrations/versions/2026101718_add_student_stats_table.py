@@ -0,0 +1,62 @@
+"""add student_stats table
+
+Revision ID: 2026101718
+Revises: 2026101618
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101718"
+down_revision = "2026101618"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "student_stats",
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column("tests_completed", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("time_spent_seconds", sa.BigInteger(), nullable=False),
+        sa.Column("last_test_at", sa.DateTime(), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["student_id"], ["student.id"]),
+        sa.ForeignKeyConstraint(["subject_id"], ["subject.id"]),
+        sa.PrimaryKeyConstraint("student_id", "subject_id"),
+    )
+
+    # backfill from existing tests; `flask stats rebuild` does the same on any database
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            """
+            INSERT INTO student_stats (
+                student_id, subject_id, tests_completed, score_sum, time_spent_seconds,
+                last_test_at, is_deleted, created_at, updated_at
+            )
+            SELECT
+                student_id,
+                subject_id,
+                COUNT(*),
+                COALESCE(SUM(score_acquired), 0),
+                COALESCE(SUM(GREATEST(EXTRACT(EPOCH FROM (finished_on - started_on)), 0)), 0)::bigint,
+                MAX(finished_on),
+                false,
+                NOW(),
+                NOW()
+            FROM test
+            WHERE is_completed = true AND is_deleted = false
+            GROUP BY student_id, subject_id
+            """
+        )
+
+
+def downgrade():
+    op.drop_table("student_stats")
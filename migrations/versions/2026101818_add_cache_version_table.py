@@ -0,0 +1,30 @@
+"""add cache_version table
+
+Revision ID: 2026101818
+Revises: 2026101718
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101818"
+down_revision = "2026101718"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cache_version",
+        sa.Column("namespace", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("namespace"),
+    )
+
+
+def downgrade():
+    op.drop_table("cache_version")
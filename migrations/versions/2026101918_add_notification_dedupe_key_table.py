@@ -0,0 +1,43 @@
+"""add notification_dedupe_key table
+
+Revision ID: 2026101918
+Revises: 2026101818
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026101918"
+down_revision = "2026101818"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notification_dedupe_key",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("recipient_id", sa.Integer(), nullable=False),
+        sa.Column("alert_type", sa.String(length=50), nullable=False),
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.Integer(), nullable=False),
+        sa.Column("notified_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["recipient_id"], ["recipient.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "recipient_id",
+            "alert_type",
+            "student_id",
+            "subject_id",
+            "bucket",
+            name="uq_notification_dedupe_key",
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("notification_dedupe_key")
@@ -0,0 +1,39 @@
+"""add student_integrity_daily table
+
+Revision ID: 2026102018
+Revises: 2026101918
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102018"
+down_revision = "2026101918"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "student_integrity_daily",
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("tests_completed", sa.Integer(), nullable=False),
+        sa.Column("suspicious_tests", sa.Integer(), nullable=False),
+        sa.Column("out_time_flagged_tests", sa.Integer(), nullable=False),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["student_id"], ["student.id"]),
+        sa.ForeignKeyConstraint(["subject_id"], ["subject.id"]),
+        sa.PrimaryKeyConstraint("student_id", "subject_id", "day"),
+    )
+    # existing tests are counted by `flask stats rebuild`
+
+
+def downgrade():
+    op.drop_table("student_integrity_daily")
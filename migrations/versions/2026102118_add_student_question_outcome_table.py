@@ -0,0 +1,48 @@
+"""add student_question_outcome table
+
+Revision ID: 2026102118
+Revises: 2026102018
+Create Date: 2026-10-21 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102118"
+down_revision = "2026102018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "student_question_outcome",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column("test_id", sa.Integer(), nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("topic_id", sa.Integer(), nullable=True),
+        sa.Column("level", sa.Integer(), nullable=True),
+        sa.Column("is_correct", sa.Boolean(), nullable=False),
+        sa.Column("answered_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["student_id"], ["student.id"]),
+        sa.ForeignKeyConstraint(["subject_id"], ["subject.id"]),
+        sa.ForeignKeyConstraint(["test_id"], ["test.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_student_question_outcome_test", "student_question_outcome", ["test_id"])
+    op.create_index(
+        "idx_student_question_outcome_student_question",
+        "student_question_outcome",
+        ["student_id", "question_id"],
+    )
+    # existing tests are written by `flask stats backfill-outcomes`
+
+
+def downgrade():
+    op.drop_index("idx_student_question_outcome_student_question", table_name="student_question_outcome")
+    op.drop_index("idx_student_question_outcome_test", table_name="student_question_outcome")
+    op.drop_table("student_question_outcome")
@@ -0,0 +1,37 @@
+"""add exam_paper table
+
+Revision ID: 2026102218
+Revises: 2026102118
+Create Date: 2026-10-22 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102218"
+down_revision = "2026102118"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "exam_paper",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column("blueprint_version", sa.String(length=64), nullable=False),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("questions", sa.JSON(), nullable=False),
+        sa.Column("total_points", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["subject_id"], ["subject.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_exam_paper_subject_version", "exam_paper", ["subject_id", "blueprint_version"])
+
+
+def downgrade():
+    op.drop_index("idx_exam_paper_subject_version", table_name="exam_paper")
+    op.drop_table("exam_paper")
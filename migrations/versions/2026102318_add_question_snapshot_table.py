@@ -0,0 +1,164 @@
+"""add question_snapshot table and compact test.questions
+
+Revision ID: 2026102318
+Revises: 2026102218
+Create Date: 2026-10-23 12:00:00.000000
+
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102318"
+down_revision = "2026102218"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+# A frozen copy of the compact-v1 layout from app/test/question_snapshots.py as of
+# this revision, so later changes there don't change what this migration writes.
+FORMAT = "compact-v1"
+ITEM_FIELDS = ("index", "section", "student_answer", "correct_answer", "points", "meta", "opened", "options")
+SUB_ITEM_FIELDS = ("student_answer", "correct_answer")
+ITEM_ONLY = ("v", "subs", "is_correct")
+
+test_table = sa.table("test", sa.column("id", sa.Integer()), sa.column("questions", sa.JSON()))
+snapshot_table = sa.table(
+    "question_snapshot",
+    sa.column("content_hash", sa.String()),
+    sa.column("question_id", sa.Integer()),
+    sa.column("payload", sa.JSON()),
+    sa.column("created_at", sa.DateTime()),
+)
+
+
+def content_version(content):
+    raw = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def split_question(payload):
+    content = {key: value for key, value in payload.items() if key not in ITEM_FIELDS}
+    sub_states = []
+    if payload.get("sub_questions") is not None:
+        content["sub_questions"] = []
+        for sub in payload["sub_questions"]:
+            content["sub_questions"].append(
+                {key: value for key, value in sub.items() if key not in SUB_ITEM_FIELDS}
+            )
+            state = {key: sub[key] for key in SUB_ITEM_FIELDS if key in sub}
+            if state:
+                sub_states.append({"id": sub.get("id"), **state})
+
+    item = {
+        "id": payload.get("id"),
+        "v": content_version(content),
+        "topic_id": payload.get("topic_id"),
+        "level": payload.get("level"),
+    }
+    item.update((key, payload[key]) for key in ITEM_FIELDS if key in payload)
+    if sub_states:
+        item["subs"] = sub_states
+    if "correct_answer" in item:
+        item["is_correct"] = item.get("student_answer") == item["correct_answer"]
+    return content, item
+
+
+def merge_item(content, item):
+    payload = dict(content)
+    payload.update((key, value) for key, value in item.items() if key not in ITEM_ONLY)
+    if item.get("subs"):
+        states = {state["id"]: state for state in item["subs"]}
+        payload["sub_questions"] = [
+            {**sub, **{k: v for k, v in states.get(sub.get("id"), {}).items() if k != "id"}}
+            for sub in content.get("sub_questions") or []
+        ]
+    return payload
+
+
+def _batches(bind):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(test_table.c.id, test_table.c.questions)
+            .where(test_table.c.id > last_id)
+            .order_by(test_table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield rows
+
+
+def upgrade():
+    op.create_table(
+        "question_snapshot",
+        sa.Column("content_hash", sa.String(length=40), nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("content_hash"),
+    )
+
+    # rewrite existing tests; `flask tests compact` does the same for rows written with
+    # COMPACT_TEST_QUESTIONS off
+    bind = op.get_bind()
+    stored = set()
+    for rows in _batches(bind):
+        snapshots = []
+        for test_id, questions in rows:
+            if not isinstance(questions, list):
+                continue
+            items = []
+            for payload in questions:
+                content, item = split_question(payload)
+                if item["v"] not in stored:
+                    stored.add(item["v"])
+                    snapshots.append({
+                        "content_hash": item["v"],
+                        "question_id": item["id"],
+                        "payload": content,
+                        "created_at": datetime.utcnow(),
+                    })
+                items.append(item)
+            bind.execute(
+                test_table.update()
+                .where(test_table.c.id == test_id)
+                .values(questions={"format": FORMAT, "items": items})
+            )
+        if snapshots:
+            bind.execute(snapshot_table.insert(), snapshots)
+
+
+def downgrade():
+    bind = op.get_bind()
+    for rows in _batches(bind):
+        hashes = {
+            item["v"]
+            for _, questions in rows
+            if isinstance(questions, dict)
+            for item in questions.get("items", [])
+        }
+        contents = dict(
+            bind.execute(
+                sa.select(snapshot_table.c.content_hash, snapshot_table.c.payload)
+                .where(snapshot_table.c.content_hash.in_(hashes))
+            ).all()
+        ) if hashes else {}
+        for test_id, questions in rows:
+            if not isinstance(questions, dict):
+                continue
+            bind.execute(
+                test_table.update()
+                .where(test_table.c.id == test_id)
+                .values(questions=[merge_item(contents.get(item["v"], {}), item) for item in questions["items"]])
+            )
+
+    op.drop_table("question_snapshot")
@@ -0,0 +1,41 @@
+"""add student_seen_questions table and exam_paper.question_ids
+
+Revision ID: 2026102418
+Revises: 2026102318
+Create Date: 2026-10-24 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102418"
+down_revision = "2026102318"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "student_seen_questions",
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column("base_id", sa.Integer(), nullable=False),
+        sa.Column("bitmap", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["student_id"], ["student.id"]),
+        sa.ForeignKeyConstraint(["subject_id"], ["subject.id"]),
+        sa.PrimaryKeyConstraint("student_id", "subject_id"),
+    )
+    # papers already in the pool have none; they rank as unseen until refilled
+    with op.batch_alter_table("exam_paper") as batch_op:
+        batch_op.add_column(sa.Column("question_ids", sa.JSON(), nullable=True))
+
+    # the bitmaps are built from student_question_outcome by `flask stats rebuild`
+
+
+def downgrade():
+    with op.batch_alter_table("exam_paper") as batch_op:
+        batch_op.drop_column("question_ids")
+    op.drop_table("student_seen_questions")
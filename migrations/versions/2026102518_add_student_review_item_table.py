@@ -0,0 +1,44 @@
+"""add student_review_item table
+
+Revision ID: 2026102518
+Revises: 2026102418
+Create Date: 2026-10-25 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102518"
+down_revision = "2026102418"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "student_review_item",
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("topic_id", sa.Integer(), nullable=True),
+        sa.Column("due_at", sa.DateTime(), nullable=False),
+        sa.Column("step", sa.Integer(), nullable=False),
+        sa.Column("lapses", sa.Integer(), nullable=False),
+        sa.Column("last_answered_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["student_id"], ["student.id"]),
+        sa.ForeignKeyConstraint(["subject_id"], ["subject.id"]),
+        sa.PrimaryKeyConstraint("student_id", "subject_id", "question_id"),
+    )
+    op.create_index(
+        "idx_student_review_item_due",
+        "student_review_item",
+        ["student_id", "subject_id", "due_at"],
+    )
+    # existing history is replayed into the queue by `flask stats rebuild`
+
+
+def downgrade():
+    op.drop_index("idx_student_review_item_due", table_name="student_review_item")
+    op.drop_table("student_review_item")
@@ -0,0 +1,23 @@
+"""add test (student_id, created_at) index
+
+Revision ID: 2026102618
+Revises: 2026102518
+Create Date: 2026-10-26 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102618"
+down_revision = "2026102518"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("idx_test_student_created", "test", ["student_id", "created_at"])
+
+
+def downgrade():
+    op.drop_index("idx_test_student_created", table_name="test")
@@ -0,0 +1,49 @@
+"""add daily_activity_rollup table
+
+Revision ID: 2026102718
+Revises: 2026102618
+Create Date: 2026-10-27 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102718"
+down_revision = "2026102618"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "daily_activity_rollup",
+        sa.Column("school_id", sa.Integer(), nullable=False),
+        sa.Column("batch_id", sa.Integer(), nullable=False),
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("test_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Numeric(12, 2), nullable=False),
+        sa.Column("score_sq_sum", sa.Numeric(16, 2), nullable=False),
+        sa.Column("duration_seconds", sa.BigInteger(), nullable=False),
+        sa.Column("last_created_at", sa.DateTime(), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["student_id"], ["student.id"]),
+        sa.ForeignKeyConstraint(["subject_id"], ["subject.id"]),
+        sa.PrimaryKeyConstraint("school_id", "batch_id", "student_id", "subject_id", "day"),
+    )
+    op.create_index(
+        "idx_daily_activity_rollup_student_day",
+        "daily_activity_rollup",
+        ["student_id", "day"],
+    )
+    # existing tests are folded in by `flask stats rebuild`; enable DASHBOARD_ROLLUP afterwards
+
+
+def downgrade():
+    op.drop_index("idx_daily_activity_rollup_student_day", table_name="daily_activity_rollup")
+    op.drop_table("daily_activity_rollup")
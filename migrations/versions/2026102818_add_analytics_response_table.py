@@ -0,0 +1,36 @@
+"""add analytics_response table
+
+Revision ID: 2026102818
+Revises: 2026102718
+Create Date: 2026-10-28 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102818"
+down_revision = "2026102718"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "analytics_response",
+        sa.Column("cache_key", sa.String(length=40), nullable=False),
+        sa.Column("school_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index(
+        op.f("ix_analytics_response_school_id"), "analytics_response", ["school_id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_analytics_response_school_id"), table_name="analytics_response")
+    op.drop_table("analytics_response")
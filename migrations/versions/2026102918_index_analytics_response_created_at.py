@@ -0,0 +1,26 @@
+"""index analytics_response.created_at
+
+Revision ID: 2026102918
+Revises: 2026102818
+Create Date: 2026-10-29 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "2026102918"
+down_revision = "2026102818"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # responses from earlier local days are purged by created_at
+    op.create_index(
+        op.f("ix_analytics_response_created_at"), "analytics_response", ["created_at"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_analytics_response_created_at"), table_name="analytics_response")
@@ -525,6 +525,29 @@ def multiple_questions(app, db_session, sample_subject, sample_topic):
     return questions
 
 
+@pytest.fixture
+def question_bank(app, db_session, sample_subject, sample_topic):
+    """Factory for a bank of questions: question_bank(count, **fields) adds `count`
+    questions to sample_topic (answer "A", extra Question fields applied to all)
+    and returns their ids."""
+    def build(count, **fields):
+        questions = [
+            Question(
+                text=f'Question {i}?',
+                possible_answers="['A', 'B', 'C', 'D']",
+                correct_answer='A',
+                topic_id=sample_topic.id,
+                **fields
+            )
+            for i in range(count)
+        ]
+        db_session.add_all(questions)
+        db_session.commit()
+        return [question.id for question in questions]
+
+    return build
+
+
 @pytest.fixture
 def sample_test(app, db_session, sample_student, sample_subject, sample_question):
     """Create a sample test."""
@@ -690,7 +713,7 @@ def mock_pusher():
         patch('app.integrations.pusher.pusher', mock),
         patch('app.notifications.routes.pusher', mock),
         patch('app.student.routes.pusher', mock),
-        patch('app.test.routes.pusher', mock),
+        patch('app.test.post_submission.pusher', mock),
     ]
     for p in patches:
         p.start()
@@ -728,3 +751,26 @@ def mock_paystack():
 def json_content_type():
     """Return JSON content type header."""
     return {'Content-Type': 'application/json'}
+
+
+@pytest.fixture
+def query_counter(app):
+    """Count the SQL statements executed inside a ``with query_counter() as counter:`` block."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _count():
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+    return _count
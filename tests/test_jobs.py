@@ -0,0 +1,108 @@
+"""
+Tests for the background job queue (app/jobs) and the `flask worker run` command.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.jobs.models import JobStatus
+from app.jobs.operations import job_manager
+from app.jobs.services import JobService, JobWorker, job_registry
+
+
+calls = []
+
+
+@job_registry.register("tests.record")
+def _record(payload):
+    calls.append(payload["value"])
+
+
+@job_registry.register("tests.explode")
+def _explode(payload):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+    yield
+    calls.clear()
+
+
+class TestJobQueue:
+    """Tests for enqueueing and running jobs."""
+
+    def test_enqueue_unknown_job_type_raises(self, app):
+        """Test enqueueing a job type with no handler is rejected."""
+        with pytest.raises(ValueError):
+            JobService.enqueue("tests.missing", {})
+
+    def test_enqueue_is_idempotent(self, app):
+        """Test the same idempotency key only ever creates one job."""
+        first = JobService.enqueue("tests.record", {"value": 1}, idempotency_key="record:1")
+        second = JobService.enqueue("tests.record", {"value": 2}, idempotency_key="record:1")
+
+        assert first.id == second.id
+        assert len(job_manager.get_jobs(job_type="tests.record")) == 1
+
+    def test_worker_runs_jobs_in_order_and_records_timing(self, app):
+        """Test the worker drains pending jobs oldest first."""
+        for value in range(3):
+            JobService.enqueue("tests.record", {"value": value})
+
+        processed = JobWorker(worker_id="test").run(stop_when_idle=True)
+
+        assert processed == 3
+        assert calls == [0, 1, 2]
+        for job in job_manager.get_jobs(job_type="tests.record"):
+            assert job.status == JobStatus.succeeded
+            assert job.attempts == 1
+            assert job.duration_ms is not None
+            assert job.finished_at is not None
+
+    def test_failed_job_is_retried_with_backoff(self, app):
+        """Test a failing job goes back to pending with a later run_after."""
+        job = JobService.enqueue("tests.explode", {}, max_attempts=2)
+
+        JobWorker().run_once()
+
+        job = job_manager.get_job_by_id(job.id)
+        assert job.status == JobStatus.pending
+        assert job.attempts == 1
+        assert "boom" in job.last_error
+        assert job.run_after > datetime.utcnow()
+        # not runnable again until the backoff expires
+        assert JobWorker().run_once() is None
+
+        job.run_after = datetime.utcnow() - timedelta(seconds=1)
+        job_manager.commit()
+        JobWorker().run_once()
+
+        job = job_manager.get_job_by_id(job.id)
+        assert job.status == JobStatus.failed
+        assert job.attempts == 2
+
+    def test_stale_running_job_is_reclaimed(self, app):
+        """Test a job left running by a dead worker is handed out again."""
+        job = JobService.enqueue("tests.record", {"value": 7})
+        job.status = JobStatus.running
+        job.attempts = 1
+        job.locked_at = datetime.utcnow() - timedelta(hours=1)
+        job_manager.commit()
+
+        JobWorker().run_once()
+
+        assert calls == [7]
+        assert job_manager.get_job_by_id(job.id).status == JobStatus.succeeded
+
+    def test_worker_run_command(self, app):
+        """Test `flask worker run --once` drains the queue and exits."""
+        JobService.enqueue("tests.record", {"value": 5})
+
+        result = app.test_cli_runner().invoke(args=["worker", "run", "--once"])
+
+        assert result.exit_code == 0, result.output
+        assert "Processed 1 job(s)" in result.output
+        assert calls == [5]
@@ -347,3 +347,246 @@ class TestSubjectPerformance:
         data = json.loads(response.data)
         assert 'best_performing_subjects' in data['data']
         assert 'worst_performing_subjects' in data['data']
+
+
+class TestMarkTest:
+    """Tests for marking a submitted test."""
+
+    def _payload(self, questions, meta=None):
+        return {"data": {"questions": questions, "meta": meta or {"out_time": 0}}}
+
+    def test_put_tests_mark_scores_submission(
+        self, client, student_headers, sample_test, sample_question,
+        student_subject_level, mock_pusher, mock_mailer
+    ):
+        """Test PUT /tests/<id>/mark/ grades the submitted answers."""
+        payload = self._payload([{
+            "id": sample_question.id,
+            "text": sample_question.text,
+            "possible_answers": ["2", "3", "4", "5"],
+            "topic_id": sample_question.topic_id,
+            "level": 1,
+            "student_answer": "4",
+            "sub_questions": [],
+        }])
+
+        response = client.put(
+            f'/tests/{sample_test.id}/mark/',
+            data=json.dumps(payload),
+            content_type='application/json',
+            headers=student_headers
+        )
+
+        assert response.status_code == 200
+        data = json.loads(response.data)['data']
+        assert data['is_completed'] is True
+        assert data['questions_correct'] == 1
+        assert float(data['score_acquired']) == 100.0
+        assert data['questions'][0]['correct_answer'] == '4'
+
+    def test_put_tests_mark_defers_post_submission_work(
+        self, app, client, student_headers, sample_test, sample_question,
+        student_subject_level, mock_pusher, mock_mailer
+    ):
+        """Test PUT /tests/<id>/mark/ queues analytics and progress jobs for the worker."""
+        from app.jobs.models import JobStatus
+        from app.jobs.operations import job_manager
+        from app.jobs.services import JobWorker
+        from app.test.operations import test_manager
+        from app.student.models import Student
+
+        payload = self._payload([{
+            "id": sample_question.id,
+            "text": sample_question.text,
+            "possible_answers": ["2", "3", "4", "5"],
+            "topic_id": sample_question.topic_id,
+            "level": 1,
+            "student_answer": "4",
+            "sub_questions": [],
+        }])
+
+        response = client.put(
+            f'/tests/{sample_test.id}/mark/',
+            data=json.dumps(payload),
+            content_type='application/json',
+            headers=student_headers
+        )
+        assert response.status_code == 200
+
+        jobs = job_manager.get_jobs()
+        assert {job.job_type for job in jobs} == {
+            "test.topic_analytics", "test.student_progress", "test.honor_notifications"
+        }
+        assert 'remarks' not in (test_manager.get_test_by_id(sample_test.id).meta or {})
+
+        # re-marking is a new submission: its jobs run with the new result
+        client.put(
+            f'/tests/{sample_test.id}/mark/',
+            data=json.dumps(payload),
+            content_type='application/json',
+            headers=student_headers
+        )
+        assert len(job_manager.get_jobs()) == 6
+
+        assert JobWorker().run(stop_when_idle=True) == 6
+        assert all(job.status == JobStatus.succeeded for job in job_manager.get_jobs())
+
+        test = test_manager.get_test_by_id(sample_test.id)
+        assert 'remarks' in test.meta
+        assert 'topic_analytics' in test.meta
+        assert Student.query.get(test.student_id).current_streak == 1
+
+    def test_put_tests_mark_commits_once(
+        self, client, student_headers, sample_test, sample_question,
+        student_subject_level, mock_pusher, mock_mailer
+    ):
+        """Test PUT /tests/<id>/mark/ persists the graded test in a single commit."""
+        from sqlalchemy import event
+        from app.extensions import db
+
+        commits = []
+
+        def _on_commit(conn):
+            commits.append(conn)
+
+        payload = self._payload([{
+            "id": sample_question.id,
+            "text": sample_question.text,
+            "possible_answers": ["2", "3", "4", "5"],
+            "topic_id": sample_question.topic_id,
+            "level": 1,
+            "student_answer": "3",
+            "sub_questions": [],
+        }])
+
+        event.listen(db.engine, "commit", _on_commit)
+        try:
+            response = client.put(
+                f'/tests/{sample_test.id}/mark/',
+                data=json.dumps(payload),
+                content_type='application/json',
+                headers=student_headers
+            )
+        finally:
+            event.remove(db.engine, "commit", _on_commit)
+
+        assert response.status_code == 200
+        assert len(commits) == 1
+
+    def test_mark_test_loads_answer_key_in_bulk(
+        self, app, db_session, sample_topic, query_counter
+    ):
+        """TestService.mark_test issues a fixed number of queries regardless of size."""
+        from app.test.models import Question, SubQuestion
+        from app.test.services import TestService
+
+        questions = []
+        for i in range(8):
+            question = Question(
+                text=f'Passage {i}',
+                possible_answers="['A', 'B']",
+                correct_answer='A',
+                topic_id=sample_topic.id,
+                is_flagged=(i == 7),
+            )
+            db_session.add(question)
+            db_session.flush()
+            subs = [
+                SubQuestion(
+                    parent_question_id=question.id,
+                    text=f'Sub {i}.{j}',
+                    correct_answer='B',
+                    possible_answers="['A', 'B']",
+                    points=1,
+                    is_flagged=(j == 2),
+                )
+                for j in range(3)
+            ]
+            db_session.add_all(subs)
+            db_session.flush()
+            questions.append((question, subs))
+        db_session.commit()
+
+        submitted = [
+            {
+                "id": question.id,
+                "topic_id": sample_topic.id,
+                "level": 1,
+                "student_answer": "A" if index % 2 == 0 else "B",
+                "sub_questions": [
+                    {"id": sub.id, "student_answer": "B"} for sub in subs
+                ],
+            }
+            for index, (question, subs) in enumerate(questions)
+        ]
+        # an unknown question is dropped from the total, as before
+        submitted.append({
+            "id": 99999, "topic_id": sample_topic.id, "level": 1,
+            "student_answer": "A", "sub_questions": [],
+        })
+
+        with query_counter() as statements:
+            result = TestService.mark_test(submitted)
+
+        assert len(statements) <= 2
+        # 8 mains + 24 subs; flagged items stay in the total but never score
+        assert result["total_questions"] == 32
+        assert result["correct_count"] == 20
+        assert result["mistakes_count"] == 12
+        assert submitted[0]["sub_questions"][0]["correct_answer"] == "B"
+        assert "correct_answer" not in submitted[0]["sub_questions"][2]
+
+
+class TestStudentStats:
+    """Tests for the incrementally maintained student_stats table."""
+
+    def _mark(self, client, headers, test, question, answer="4"):
+        payload = {"data": {"questions": [{
+            "id": question.id,
+            "text": question.text,
+            "possible_answers": ["2", "3", "4", "5"],
+            "topic_id": question.topic_id,
+            "level": 1,
+            "student_answer": answer,
+            "sub_questions": [],
+        }], "meta": {"out_time": 0}}}
+        return client.put(
+            f'/tests/{test.id}/mark/',
+            data=json.dumps(payload),
+            content_type='application/json',
+            headers=headers
+        )
+
+    def test_marking_updates_student_stats(
+        self, client, student_headers, sample_test, sample_question,
+        student_subject_level, mock_pusher, mock_mailer
+    ):
+        """Test marking a test folds it into student_stats exactly once."""
+        from app.analytics.operations import stats_manager
+
+        assert self._mark(client, student_headers, sample_test, sample_question).status_code == 200
+        # re-submitting an already completed test doesn't count it again
+        assert self._mark(client, student_headers, sample_test, sample_question).status_code == 200
+
+        [stats] = stats_manager.get_stats(sample_test.student_id)
+        assert stats.subject_id == sample_test.subject_id
+        assert stats.tests_completed == 1
+        assert float(stats.score_sum) == 100.0
+        assert stats.last_test_at is not None
+
+        response = client.get('/students/dashboard/total-tests/', headers=student_headers)
+        assert json.loads(response.data)['data']['tests_completed'] == 1
+
+    def test_stats_rebuild_command(self, app, db_session, completed_test):
+        """Test `flask stats rebuild` recomputes rows from completed tests."""
+        from app.analytics.operations import stats_manager
+
+        assert stats_manager.get_tests_completed(completed_test.student_id) == 0
+
+        result = app.test_cli_runner().invoke(args=["stats", "rebuild"])
+
+        assert result.exit_code == 0, result.output
+        assert stats_manager.get_tests_completed(completed_test.student_id) == 1
+        assert stats_manager.get_average_score(
+            completed_test.student_id, completed_test.subject_id
+        ) == float(completed_test.score_acquired)
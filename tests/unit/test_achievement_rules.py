@@ -0,0 +1,132 @@
+"""
+Tests for the compiled achievement rules (app/achievements/rule_engine.py).
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from app._shared.cache import CacheNamespaces, versioned_cache
+from app.achievements.models import Achievement, StudentHasAchievement
+from app.achievements.rule_engine import (
+    StudentMetricsSnapshot,
+    TestMetrics,
+    compile_catalog,
+    get_compiled_catalog,
+)
+from app.achievements.services import AchievementEngine
+from app.analytics.services import AnalyticsService
+from app.test.models import Test
+
+
+def _achievement(db_session, name, achievement_class, requirements):
+    achievement = Achievement(
+        name=name,
+        description=name,
+        image_url="https://example.com/achievement.png",
+        achievement_class=achievement_class,
+        requirements=json.dumps(requirements),
+    )
+    db_session.add(achievement)
+    db_session.commit()
+    return achievement
+
+
+def _completed_tests(db_session, student, subject, scores):
+    now = datetime.now(timezone.utc)
+    tests = []
+    for i, score in enumerate(scores):
+        test = Test(
+            student_id=student.id,
+            subject_id=subject.id,
+            school_id=student.school_id,
+            questions=[],
+            total_points=10,
+            question_number=10,
+            points_acquired=score / 10,
+            score_acquired=score,
+            is_completed=True,
+            finished_on=now - timedelta(minutes=len(scores) - i),
+            meta={"total_questions": 10, "mistakes_count": 1, "out_time": 30},
+        )
+        db_session.add(test)
+        tests.append(test)
+    db_session.commit()
+    return tests
+
+
+def test_catalog_indexes_rules_by_class(app, db_session):
+    catalog = compile_catalog(
+        [
+            (1, "Ten tests", "volume_practice", json.dumps({"number_of_tests": 10})),
+            (2, "Streak", "continuous_practice", json.dumps({"streak_days": 3})),
+            (3, "Broken", "volume_practice", "not json"),
+        ]
+    )
+
+    assert [rule.achievement_id for rule in catalog.by_class["volume_practice"]] == [1, 3]
+    assert catalog.by_id[2].target == 3
+
+    snapshot = StudentMetricsSnapshot(student_id=1, tests=[], current_streak=2, max_level=0)
+    assert catalog.progress(2, snapshot) == round(2 / 3 * 100, 2)
+    # unparseable requirements never make progress
+    assert catalog.progress(3, snapshot) == 0.0
+
+
+def test_compiled_catalog_is_reused_until_the_achievement_generation_moves(app, db_session):
+    achievement = _achievement(db_session, "Ten tests", "volume_practice", {"number_of_tests": 10})
+
+    catalog = get_compiled_catalog()
+    achievement.requirements = json.dumps({"number_of_tests": 5})
+    db_session.commit()
+    assert get_compiled_catalog() is catalog
+
+    versioned_cache.bump(CacheNamespaces.achievement)
+
+    recompiled = get_compiled_catalog()
+    assert recompiled is not catalog
+    assert recompiled.by_id[achievement.id].target == 5
+
+
+def test_evaluate_awards_once_and_matches_progress(app, db_session, sample_student, sample_subject):
+    volume = _achievement(db_session, "Three tests", "volume_practice", {"number_of_tests": 3})
+    mastery = _achievement(
+        db_session,
+        "Two high scores",
+        "mastery_level",
+        {"score_band_min": 80, "score_band_max": 100, "number_of_tests": 2},
+    )
+    speed = _achievement(
+        db_session,
+        "Quick and clean",
+        "speed_and_accuracy",
+        {
+            "questions_count": 10,
+            "requires_finish_before_time_end": True,
+            "metric": "mistakes_count",
+            "max_mistakes": 0,
+        },
+    )
+    tests = _completed_tests(db_session, sample_student, sample_subject, [90, 50, 85])
+
+    engine = AchievementEngine(sample_student.id)
+    unlocked = engine.evaluate_for_test(tests[-1])
+    assert sorted(unlocked) == ["Three tests", "Two high scores"]
+
+    # already-earned achievements are not awarded (or announced) again
+    assert engine.evaluate_for_test(tests[-1]) == []
+    assert StudentHasAchievement.query.filter_by(student_id=sample_student.id).count() == 2
+
+    snapshot = StudentMetricsSnapshot.load(sample_student.id)
+    catalog = get_compiled_catalog()
+    assert catalog.progress(volume.id, snapshot) == 100.0
+    assert catalog.progress(mastery.id, snapshot) == 100.0
+    # one mistake over the limit is half way there
+    assert catalog.progress(speed.id, snapshot) == 50.0
+    assert not catalog.by_id[speed.id].is_met(snapshot, TestMetrics.from_test(tests[-1]))
+
+    achievements = {
+        item["id"]: item
+        for item in AnalyticsService().get_student_achievements(sample_student.id)
+    }
+    assert achievements[volume.id]["is_earned"]
+    assert achievements[speed.id]["progress_percentage"] == 50.0
@@ -0,0 +1,20 @@
+"""
+Tests for BaseModel (app/_shared/models.py).
+"""
+
+import time
+
+from app.app_admin.models import Subject
+
+
+def test_timestamps_are_taken_when_each_row_is_written(app, db_session):
+    first = Subject(name="Subject TS-1", short_name="TS-1", curriculum="bece")
+    db_session.add(first)
+    db_session.commit()
+    time.sleep(0.01)
+    second = Subject(name="Subject TS-2", short_name="TS-2", curriculum="bece")
+    db_session.add(second)
+    db_session.commit()
+
+    assert second.created_at > first.created_at
+    assert second.updated_at > first.updated_at
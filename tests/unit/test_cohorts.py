@@ -0,0 +1,121 @@
+"""
+Tests for the per-student cohort aggregates (app/analytics/cohorts.py) behind
+the school dashboards.
+"""
+
+from datetime import datetime, timedelta
+
+from app.analytics.cohorts import Cohort
+from app.analytics.services import AnalyticsService
+from app.analytics.time_windows import period_windows
+from app.student.models import Student
+from app.test.models import Test
+
+
+def _students(db_session, school, count):
+    students = [
+        Student(
+            first_name=f"Student {i}",
+            surname="Cohort",
+            email=f"cohort{i}@testora.test",
+            password_hash="!",
+            is_approved=True,
+            school_id=school.id,
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(students)
+    db_session.commit()
+    return [student.id for student in students]
+
+
+def _test(student_id, subject_id, score, created_at, minutes=10):
+    return Test(
+        student_id=student_id,
+        subject_id=subject_id,
+        questions=[],
+        total_points=10,
+        points_acquired=0,
+        score_acquired=score,
+        is_completed=True,
+        created_at=created_at,
+        started_on=created_at,
+        finished_on=created_at + timedelta(minutes=minutes),
+    )
+
+
+def test_cohort_aggregates_in_one_query(app, db_session, sample_school, sample_subject, query_counter):
+    first, second, idle = _students(db_session, sample_school, 3)
+    now = datetime.utcnow()
+    db_session.add_all([
+        _test(first, sample_subject.id, 90, now),
+        _test(first, sample_subject.id, 70, now - timedelta(days=1)),
+        _test(second, sample_subject.id, 66, now - timedelta(days=2), minutes=30),
+    ])
+    db_session.commit()
+
+    with query_counter() as statements:
+        cohort = Cohort.load([first, second, idle])
+
+    assert len(statements) == 1
+    assert (cohort.tests, round(cohort.seconds)) == (3, 50 * 60)
+    assert round(cohort.average_score, 2) == round((90 + 70 + 66) / 3, 2)
+    assert cohort.students[first].average_score == 80
+
+    service = AnalyticsService()
+    bands = service.band_distribution(3, cohort)
+    assert bands["highly_proficient"] == {"count": 1, "percentage": 33.33}
+    assert bands["approaching_proficient"]["count"] == 1
+    assert bands["emerging"]["count"] == 0
+
+
+def test_dashboards_classify_students_by_their_average(app, db_session, sample_school, sample_subject):
+    first, second, _idle = _students(db_session, sample_school, 3)
+    now = datetime.utcnow()
+    db_session.add_all([
+        _test(first, sample_subject.id, 90, now),
+        _test(first, sample_subject.id, 40, now - timedelta(days=3)),
+        _test(second, sample_subject.id, 40, now - timedelta(days=3)),
+    ])
+    db_session.commit()
+    service = AnalyticsService()
+
+    [subject] = service.get_subject_performance(sample_school.id, None, subject_id=sample_subject.id)
+    assert (subject["student_readiness_number"], subject["student_readiness_percent"]) == (1, 33.33)
+
+
+def test_dashboards_compare_against_the_previous_period(app, db_session, sample_school, sample_subject):
+    first, second = _students(db_session, sample_school, 2)
+    service = AnalyticsService()
+    start = period_windows("this_week")[0].start
+    db_session.add_all([
+        _test(first, sample_subject.id, 90, start + timedelta(hours=1)),
+        _test(first, sample_subject.id, 40, start - timedelta(days=3)),
+        _test(second, sample_subject.id, 40, start - timedelta(days=3)),
+    ])
+    db_session.commit()
+
+    rate = service.get_practice_rate(sample_school.id, None, "this_week")
+    assert (rate["practiced_number"], rate["change_direction"], rate["change_from"]) == (1, "down", 100.0)
+
+    distribution = service.get_performance_distribution(sample_school.id, None, "all_time")
+    assert distribution["summary_distribution"]["average_tests"]["value"] == 1.5
+    assert distribution["tier_distribution"]["approaching_proficient"]["count"] == 1
+
+
+def test_this_month_distribution_leaves_out_last_month(app, db_session, sample_school, sample_subject):
+    first, second = _students(db_session, sample_school, 2)
+    service = AnalyticsService()
+    start = period_windows("this_month")[0].start
+    db_session.add_all([
+        _test(first, sample_subject.id, 90, start + timedelta(hours=1)),
+        _test(first, sample_subject.id, 40, start - timedelta(days=3)),
+        _test(second, sample_subject.id, 40, start - timedelta(days=3)),
+    ])
+    db_session.commit()
+
+    distribution = service.get_performance_distribution(sample_school.id, None, "this_month")
+    assert distribution["proficiency_percent"] == 90.0
+    assert distribution["summary_distribution"]["average_tests"]["value"] == 0.5
+    assert distribution["tier_distribution"]["highly_proficient"]["count"] == 1
+    assert distribution["tier_distribution"]["approaching_proficient"]["count"] == 0
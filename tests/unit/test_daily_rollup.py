@@ -0,0 +1,107 @@
+"""
+Tests for the daily activity rollup (DailyActivityRollupManager in
+app/analytics/operations.py) and the dashboards' read path over it.
+"""
+
+from datetime import datetime, timedelta
+
+from app.analytics.models import DailyActivityRollup
+from app.analytics.operations import rollup_manager
+from app.analytics.services import AnalyticsService
+from app.test.models import Test
+
+
+def _mark(client, headers, test_id, question, answer):
+    payload = {
+        "id": question.id,
+        "text": question.text,
+        "possible_answers": ["2", "3", "4", "5"],
+        "topic_id": question.topic_id,
+        "level": 1,
+        "student_answer": answer,
+        "sub_questions": [],
+    }
+    return client.put(
+        f"/tests/{test_id}/mark/",
+        json={"data": {"questions": [payload], "meta": {"out_time": 0}}},
+        headers=headers,
+    )
+
+
+def test_marking_adds_the_test_to_its_day(
+    app, client, student_headers, sample_test, sample_question, sample_batch,
+    student_subject_level, mock_pusher, mock_mailer
+):
+    student_id, batch_id, school_id = sample_test.student_id, sample_batch.id, sample_test.school_id
+    response = _mark(client, student_headers, sample_test.id, sample_question, "4")
+    assert response.status_code == 200
+
+    [row] = DailyActivityRollup.query.all()
+    assert (row.school_id, row.batch_id, row.student_id, row.test_count) == (school_id, batch_id, student_id, 1)
+    assert float(row.score_sq_sum) == float(row.score_sum) ** 2
+    assert rollup_manager.count_tests(school_id) == 1
+
+
+def test_re_marking_replaces_the_score_in_its_day(
+    app, client, student_headers, sample_test, sample_question, sample_batch,
+    student_subject_level, mock_pusher, mock_mailer
+):
+    test_id, school_id = sample_test.id, sample_test.school_id
+    service = AnalyticsService()
+    assert _mark(client, student_headers, test_id, sample_question, "4").status_code == 200
+    first_score = float(DailyActivityRollup.query.one().score_sum)
+
+    assert _mark(client, student_headers, test_id, sample_question, "2").status_code == 200
+
+    [row] = DailyActivityRollup.query.all()
+    rescored = Test.query.get(test_id)
+    assert row.test_count == 1
+    assert float(row.score_sum) == float(rescored.score_acquired) != first_score
+
+    from_tests = service.get_performance_general(school_id, None)
+    app.config["DASHBOARD_ROLLUP"] = True
+    assert service.get_performance_general(school_id, None) == from_tests
+
+
+def test_dashboards_read_the_same_numbers_from_the_rollup(
+    app, db_session, sample_school, sample_student, sample_subject
+):
+    student_id, school_id = sample_student.id, sample_school.id
+    now = datetime.utcnow()
+    for days_ago, score, minutes in [(0, 90, 10), (0, 70, 20), (8, 50, 30), (40, 65, 5)]:
+        created_at = now - timedelta(days=days_ago)
+        db_session.add(Test(
+            student_id=student_id,
+            subject_id=sample_subject.id,
+            school_id=school_id,
+            questions=[],
+            total_points=10,
+            points_acquired=0,
+            score_acquired=score,
+            is_completed=True,
+            created_at=created_at,
+            started_on=created_at,
+            finished_on=created_at + timedelta(minutes=minutes),
+        ))
+    db_session.commit()
+    assert rollup_manager.rebuild() == 3
+
+    service = AnalyticsService()
+
+    def _dashboards():
+        return (
+            service.get_practice_rate(school_id, None, "this_week"),
+            service.get_performance_distribution(school_id, None, "this_month"),
+            service.get_performance_distribution(school_id, None, "all_time"),
+            service.get_average_score_trend(school_id, None),
+            service.get_performance_general(school_id, None),
+        )
+
+    from_tests = _dashboards()
+    app.config["DASHBOARD_ROLLUP"] = True
+    from_rollup = _dashboards()
+
+    assert from_rollup == from_tests
+    assert from_rollup[4]["average_score"] == 68.75
+    # one test scored 80 or more, though the student's average is below it
+    assert from_rollup[4]["highly_proficient_students"] == 1
@@ -0,0 +1,76 @@
+"""
+Tests for the warm pool of pre-assembled exam papers (app/test/exam_papers.py).
+"""
+
+from app._shared.cache import versioned_cache
+from app.jobs.operations import job_manager
+from app.test.exam_papers import REFILL_JOB, exam_paper_pool
+from app.test.models import ExamPaper, Test
+from app.test.question_pool import question_pool
+
+
+def test_pop_serves_a_ready_paper_and_requests_a_refill(
+    app, sample_student, sample_subject, question_bank
+):
+    app.config.update(EXAM_PAPER_POOL_SIZE=3, EXAM_PAPER_POOL_LOW_WATER=3)
+    question_bank(50)
+    student_id, subject_id, short_name = sample_student.id, sample_subject.id, sample_subject.short_name
+
+    assert exam_paper_pool.refill(subject_id) == 3
+    [first_ready, *_] = ExamPaper.query.order_by(ExamPaper.id).all()
+    expected = first_ready.fingerprint
+
+    paper = exam_paper_pool.pop(student_id, short_name, subject_id)
+
+    assert paper["fingerprint"] == expected
+    assert len(paper["questions"]) == paper["total_points"] == 40
+    assert "correct_answer" not in paper["questions"][0]
+    assert ExamPaper.query.count() == 2
+    # below the low-water mark: a refill is queued, and running it tops the pool up
+    [job] = job_manager.get_jobs(job_type=REFILL_JOB)
+    assert job.payload == {"subject_id": subject_id}
+    assert exam_paper_pool.refill(subject_id) == 1
+
+
+def test_recently_served_papers_are_not_handed_out_again(
+    app, db_session, sample_student, sample_subject, question_bank
+):
+    app.config.update(EXAM_PAPER_POOL_SIZE=1)
+    question_bank(45)
+    student_id, subject_id, short_name = sample_student.id, sample_subject.id, sample_subject.short_name
+    exam_paper_pool.refill(subject_id)
+    ready = ExamPaper.query.one().fingerprint
+
+    db_session.add(
+        Test(
+            student_id=student_id,
+            subject_id=subject_id,
+            questions=[],
+            total_points=40,
+            points_acquired=0,
+            score_acquired=0,
+            meta={"mode": "exam", "paper_fingerprint": ready},
+        )
+    )
+    db_session.commit()
+
+    paper = exam_paper_pool.pop(student_id, short_name, subject_id)
+
+    # assembled on demand; the ready paper stays for someone else
+    assert paper["fingerprint"] != ready
+    assert ExamPaper.query.count() == 1
+
+
+def test_question_changes_retire_ready_papers(app, sample_subject, question_bank):
+    app.config.update(EXAM_PAPER_POOL_SIZE=2, CACHE_VERSION_CHECK_SECONDS=0)
+    question_bank(45)
+    subject_id = sample_subject.id
+    exam_paper_pool.refill(subject_id)
+    old_version = exam_paper_pool.blueprint_version(sample_subject.short_name)
+
+    question_pool.bump()
+    versioned_cache.clear()
+
+    assert exam_paper_pool.blueprint_version(sample_subject.short_name) != old_version
+    assert exam_paper_pool.refill(subject_id) == 2
+    assert ExamPaper.query.filter_by(blueprint_version=old_version).count() == 0
@@ -0,0 +1,91 @@
+"""
+Tests for the per-day integrity counters (StudentIntegrityManager in
+app/analytics/operations.py) and the checks built on them.
+"""
+
+from datetime import datetime, timedelta
+
+from app.analytics.models import StudentIntegrityDaily
+from app.analytics.operations import integrity_manager
+from app.analytics.services import analytics_service
+from app.test.models import Test
+
+
+def _mark(db_session, student, subject, finished_on, outside_time_ms=0, is_suspicious=False):
+    test = Test(
+        student_id=student.id,
+        subject_id=subject.id,
+        school_id=student.school_id,
+        questions=[],
+        total_points=10,
+        points_acquired=5,
+        score_acquired=50,
+        question_number=10,
+        is_completed=True,
+        finished_on=finished_on,
+        meta={"outside_time_ms": outside_time_ms, "is_suspicious": is_suspicious},
+    )
+    db_session.add(test)
+    db_session.commit()
+    integrity_manager.record_test(test)
+    return test.id
+
+
+def test_counters_fold_tests_into_one_row_per_day(app, db_session, sample_student, sample_subject):
+    now = datetime.utcnow()
+    _mark(db_session, sample_student, sample_subject, now, outside_time_ms=12000, is_suspicious=True)
+    _mark(db_session, sample_student, sample_subject, now, is_suspicious=True)
+    _mark(db_session, sample_student, sample_subject, now - timedelta(days=10), is_suspicious=True)
+
+    today = StudentIntegrityDaily.query.get((sample_student.id, sample_subject.id, now.date()))
+    assert (today.tests_completed, today.suspicious_tests, today.out_time_flagged_tests) == (2, 2, 1)
+    assert StudentIntegrityDaily.query.count() == 2
+
+    week_ago = (now - timedelta(days=7)).date()
+    assert integrity_manager.count_suspicious(sample_student.id, week_ago) == 2
+    assert integrity_manager.count_suspicious(sample_student.id, week_ago, subject_id=sample_subject.id + 1) == 0
+
+
+def test_integrity_summary_skips_tests_when_counters_show_nothing(
+    app, db_session, sample_student, sample_subject, query_counter
+):
+    now = datetime.utcnow()
+    for days_ago in range(analytics_service.INTEGRITY_WINDOW_SIZE):
+        _mark(db_session, sample_student, sample_subject, now - timedelta(days=days_ago))
+
+    student_id = sample_student.id
+    with query_counter() as statements:
+        summary = analytics_service.get_integrity_summary(student_id)
+    assert summary["flagged_tests"] == []
+    assert len(statements) == 1
+
+    # a flagged test inside the window is read back from the test table
+    flagged_id = _mark(db_session, sample_student, sample_subject, now, outside_time_ms=15000)
+    summary = analytics_service.get_integrity_summary(student_id, subject_id=sample_subject.id)
+    assert [t["test_id"] for t in summary["flagged_tests"]] == [flagged_id]
+    assert summary["flagged_tests"][0]["out_time_ms"] == 15000
+
+
+def test_rebuild_recounts_from_tests(app, db_session, sample_student, sample_subject):
+    now = datetime.utcnow()
+    # legacy meta: `out_time` only, and the suspicious flag is re-evaluated
+    db_session.add(
+        Test(
+            student_id=sample_student.id,
+            subject_id=sample_subject.id,
+            school_id=sample_student.school_id,
+            questions=[],
+            total_points=10,
+            points_acquired=0,
+            score_acquired=0,
+            question_number=10,
+            is_completed=True,
+            finished_on=now,
+            meta={"out_time": 40000},
+        )
+    )
+    db_session.commit()
+
+    assert integrity_manager.rebuild() == 1
+    [row] = StudentIntegrityDaily.query.all()
+    assert (row.tests_completed, row.suspicious_tests, row.out_time_flagged_tests) == (1, 1, 1)
@@ -0,0 +1,48 @@
+"""
+Tests for NotificationDedupeManager.claim (app/notifications/operations.py).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.notifications.models import NotificationDedupeKey, Recipient
+from app.notifications.operations import notification_dedupe_manager
+
+
+def _recipient(db_session):
+    recipient = Recipient(category="staff", device_ids=[], email="teacher@testora.test")
+    db_session.add(recipient)
+    db_session.commit()
+    return recipient.id
+
+
+def _claim(recipient_id, now, student_id=1, subject_id=1):
+    return notification_dedupe_manager.claim(
+        recipient_id, "cheating_alert", student_id, subject_id, window_hours=24, now=now
+    )
+
+
+def test_second_claim_in_the_window_is_a_duplicate(app, db_session, query_counter):
+    recipient_id = _recipient(db_session)
+    start = datetime(2026, 10, 17, 1, 0, tzinfo=timezone.utc)
+
+    assert _claim(recipient_id, start)
+    with query_counter() as statements:
+        assert not _claim(recipient_id, start + timedelta(hours=5))
+    # previous-bucket lookup + insert-on-conflict
+    assert len(statements) == 2
+
+    # other students and subjects are tracked separately
+    assert _claim(recipient_id, start, student_id=2)
+    assert _claim(recipient_id, start, subject_id=2)
+    assert NotificationDedupeKey.query.count() == 3
+
+
+def test_window_spans_bucket_boundaries(app, db_session):
+    recipient_id = _recipient(db_session)
+    late = datetime(2026, 10, 17, 23, 0, tzinfo=timezone.utc)
+
+    assert _claim(recipient_id, late)
+    # next bucket, but only two hours later
+    assert not _claim(recipient_id, late + timedelta(hours=2))
+    # a full window later
+    assert _claim(recipient_id, late + timedelta(hours=24, minutes=1))
@@ -0,0 +1,98 @@
+"""
+Tests for PerformanceAnalyzer.analyze_recent_performance reading the
+student_question_outcome table (app/analytics/operations.py).
+"""
+
+from datetime import datetime, timedelta
+
+from app.analytics.models import StudentQuestionOutcome, StudentTopicScores
+from app.analytics.operations import sqo_manager
+from app.test.adaptive_test_service import PerformanceAnalyzer
+from app.test.models import Test
+
+
+def _test(db_session, student, subject, topic, finished_on, answers):
+    test = Test(
+        student_id=student.id,
+        subject_id=subject.id,
+        school_id=student.school_id,
+        questions=[
+            {"id": qid, "topic_id": topic.id, "level": 1, "student_answer": answer, "correct_answer": "A"}
+            for qid, answer in answers
+        ],
+        total_points=10,
+        points_acquired=5,
+        score_acquired=50,
+        question_number=len(answers),
+        is_completed=True,
+        finished_on=finished_on,
+    )
+    db_session.add(test)
+    db_session.commit()
+    db_session.add(
+        StudentTopicScores(
+            student_id=student.id, subject_id=subject.id, test_id=test.id, topic_id=topic.id, score_acquired=50
+        )
+    )
+    db_session.commit()
+    return test
+
+
+def test_profile_reads_two_queries_regardless_of_test_count(
+    app, db_session, sample_student, sample_subject, sample_topic, query_counter
+):
+    now = datetime.utcnow()
+    older = _test(db_session, sample_student, sample_subject, sample_topic, now - timedelta(days=3), [(1, "A"), (2, "B")])
+    newer = _test(db_session, sample_student, sample_subject, sample_topic, now, [(1, "B"), (3, "A")])
+    for test in (older, newer):
+        sqo_manager.record_test(test)
+    student_id, subject_id, topic_id = sample_student.id, sample_subject.id, sample_topic.id
+
+    with query_counter() as statements:
+        profile = PerformanceAnalyzer.analyze_recent_performance(student_id, subject_id)
+
+    assert len(statements) == 2
+    assert profile["topic_scores"][topic_id] == [50.0, 50.0]
+    # the most recent outcome wins
+    assert profile["recent_questions"][1]["correct"] is False
+    assert profile["recent_questions"][2]["correct"] is False
+    assert profile["recent_questions"][3]["correct"] is True
+    assert profile["level_weights"] == {1: 50.0}
+
+
+def test_backfill_writes_outcomes_for_tests_marked_earlier(
+    app, db_session, sample_student, sample_subject, sample_topic
+):
+    test = _test(db_session, sample_student, sample_subject, sample_topic, datetime.utcnow(), [(1, "A"), (2, "C")])
+
+    result = app.test_cli_runner().invoke(args=["stats", "backfill-outcomes"])
+    assert result.exit_code == 0, result.output
+    assert sorted(
+        (row.question_id, row.is_correct) for row in StudentQuestionOutcome.query.filter_by(test_id=test.id)
+    ) == [(1, True), (2, False)]
+
+    # already backfilled tests are skipped
+    assert sqo_manager.backfill() == 0
+
+
+def test_marking_writes_question_outcomes(
+    app, client, student_headers, sample_test, sample_question, student_subject_level, mock_pusher, mock_mailer
+):
+    question = {
+        "id": sample_question.id,
+        "text": sample_question.text,
+        "possible_answers": ["2", "3", "4", "5"],
+        "topic_id": sample_question.topic_id,
+        "level": 1,
+        "student_answer": "4",
+        "sub_questions": [],
+    }
+    response = client.put(
+        f"/tests/{sample_test.id}/mark/",
+        json={"data": {"questions": [question], "meta": {"out_time": 0}}},
+        headers=student_headers,
+    )
+
+    assert response.status_code == 200
+    [outcome] = StudentQuestionOutcome.query.filter_by(test_id=sample_test.id).all()
+    assert (outcome.question_id, outcome.level, outcome.is_correct) == (sample_question.id, 1, True)
@@ -0,0 +1,59 @@
+"""
+Tests for the pre-rendered question payload cache (app/test/question_payloads.py).
+"""
+
+from app.test.models import Question
+from app.test.question_payloads import question_payloads
+
+
+def test_payloads_render_once_in_both_variants(app, question_bank, query_counter):
+    question_ids = question_bank(5)
+    expected = [q.to_json(include_correct_answer=False) for q in Question.query.order_by(Question.id.desc())]
+
+    payloads = question_payloads.get_many(reversed(question_ids), include_correct_answer=False)
+    assert payloads == expected
+    assert "correct_answer" not in payloads[0]
+
+    with query_counter() as statements:
+        with_answers = question_payloads.get_many(question_ids)
+        question_payloads.get_many(question_ids[:2], include_correct_answer=False)
+    assert statements == []
+    assert [p["id"] for p in with_answers] == question_ids
+    assert with_answers[0]["correct_answer"] == "A"
+
+    # unknown ids are skipped
+    assert len(question_payloads.get_many([999999] + question_ids)) == 5
+
+    # callers may decorate their copy without touching the cache
+    with_answers[0]["section"] = "Objective Test"
+    assert "section" not in question_payloads.get_many(question_ids[:1])[0]
+
+
+def test_question_edits_refresh_payloads(app, client, auth_headers, sample_topic, sample_question):
+    question_id, topic_id = sample_question.id, sample_topic.id
+    assert question_payloads.get_many([question_id])[0]["sub_questions"] == []
+
+    response = client.put(
+        f"/questions/{question_id}/",
+        json={
+            "data": {
+                "text": "What is 4 + 4?",
+                "possible_answers": ["7", "8"],
+                "correct_answer": "8",
+                "topic_id": topic_id,
+                "points": 1,
+                "sub_questions": [
+                    {"text": "And 4 + 5?", "possible_answers": ["9"], "correct_answer": "9", "points": 1}
+                ],
+            }
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+    payload = question_payloads.get_many([question_id])[0]
+    assert payload["text"] == "What is 4 + 4?"
+    assert [sub["text"] for sub in payload["sub_questions"]] == ["And 4 + 5?"]
+
+    listed = client.get("/questions/", headers=auth_headers).get_json()["data"]
+    assert [q["text"] for q in listed] == ["What is 4 + 4?"]
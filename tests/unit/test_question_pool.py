@@ -0,0 +1,89 @@
+"""
+Tests for the per-subject question pool (app/test/question_pool.py) and the
+adaptive generator that samples from it.
+"""
+
+import random
+import re
+
+from app.test.adaptive_test_service import AdaptiveTestService
+from app.test.question_pool import QuestionSampler, question_pool
+from app.test.services import TestService
+
+
+def test_generation_samples_from_memory_and_fetches_only_the_chosen(
+    app, sample_student, sample_subject, question_bank, query_counter
+):
+    student_id, subject_id = sample_student.id, sample_subject.id
+    question_ids = question_bank(30)
+    question_bank(2, is_flagged=True)
+    pool = question_pool.for_subject(subject_id)
+    assert sorted(pool.ids) == question_ids
+
+    with query_counter() as statements:
+        chosen = AdaptiveTestService.generate_adaptive_questions(subject_id, student_id, 1)
+
+    # QuestionsNumberLimiter: 10 questions at level 1
+    assert len(chosen) == len({q.id for q in chosen}) == 10
+    assert {q.id for q in chosen} <= set(question_ids)
+    assert question_pool.for_subject(subject_id) is pool
+    # no query loads the whole question bank any more
+    question_reads = [s for s in statements if re.search(r"FROM question\b", s)]
+    assert len(question_reads) == 1 and "IN (" in question_reads[0]
+
+
+def test_question_changes_invalidate_the_pool(
+    app, client, auth_headers, student_headers, sample_subject, sample_topic, sample_question, mock_mailer
+):
+    subject_id, question_id = sample_subject.id, sample_question.id
+    assert list(question_pool.for_subject(subject_id).ids) == [question_id]
+
+    response = client.post(
+        "/flag-questions/",
+        json={"data": [{"question_id": question_id, "flag_reason": ["typo"]}]},
+        headers=student_headers,
+    )
+    assert response.status_code == 200
+    assert list(question_pool.for_subject(subject_id).ids) == []
+
+    response = client.post(
+        "/questions/",
+        json={
+            "data": {
+                "text": "What is 3 + 3?",
+                "possible_answers": ["5", "6"],
+                "correct_answer": "6",
+                "topic_id": sample_topic.id,
+                "points": 1,
+            }
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    new_id = response.get_json()["data"]["id"]
+    assert [q.id for q in question_pool.for_subject(subject_id).questions(level=1)] == [new_id]
+
+    assert client.delete(f"/questions/{new_id}/", headers=auth_headers).status_code == 200
+    assert len(question_pool.for_subject(subject_id)) == 0
+
+
+def test_sampler_filters_without_sorting_the_bank(
+    app, sample_subject, question_bank, query_counter
+):
+    subject_id = sample_subject.id
+    plain = question_bank(20)
+    synonyms = question_bank(5, item_type="synonym")
+    passages = question_bank(3, is_instructional=True)
+    sampler = QuestionSampler(subject_id, rng=random.Random(3))
+
+    assert {q.id for q in sampler.sample(10, item_types=["synonym"])} == set(synonyms)
+    picked = sampler.sample_ids(25, exclude=plain[:5], include_instructional=False)
+    assert len(picked) == len(set(picked)) == 20
+    assert not set(picked) & (set(plain[:5]) | set(passages))
+
+    with query_counter() as statements:
+        paper = TestService.generate_exam_questions("MATH", subject_id)
+    # one fetch of the chosen questions (plus eager loads), no ORDER BY random()
+    assert len(paper) == 25
+    assert {section for _, section in paper} == {"Objective Test"}
+    assert not any("random()" in s for s in statements)
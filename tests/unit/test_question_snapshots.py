@@ -0,0 +1,110 @@
+"""
+Tests for compact Test.questions storage (app/test/question_snapshots.py).
+"""
+
+from app.test.models import QuestionSnapshot, Test
+from app.test.question_snapshots import FORMAT, question_items, question_snapshots
+
+
+def _payload(question_id=1, text="What is 2 + 2?", **state):
+    return {
+        "id": question_id,
+        "text": text,
+        "possible_answers": ["3", "4"],
+        "topic_id": 7,
+        "level": 2,
+        "points": 1,
+        "question_images": {},
+        "sub_questions": [{"id": 10, "text": "And 2 + 3?", "possible_answers": ["5"], "points": 1}],
+        **state,
+    }
+
+
+def test_compact_round_trips_and_shares_snapshots(app, db_session):
+    served = [_payload(1), _payload(2, text="What is 3 + 3?")]
+
+    first = question_snapshots.compact(served)
+    second = question_snapshots.compact([_payload(1)])
+    db_session.commit()
+
+    assert first["format"] == FORMAT
+    assert [item["id"] for item in first["items"]] == [1, 2]
+    assert "text" not in first["items"][0]
+    # identical content is stored once
+    assert second["items"][0]["v"] == first["items"][0]["v"]
+    assert QuestionSnapshot.query.count() == 2
+    assert question_snapshots.expand(first) == served
+
+
+def test_marked_items_keep_the_served_snapshot(app, db_session):
+    stored = question_snapshots.compact([_payload()])
+    submitted = _payload(text="tampered", student_answer="4", correct_answer="4", meta={"time_spent": 900})
+    submitted["sub_questions"][0].update(student_answer="6", correct_answer="5")
+
+    marked = question_snapshots.compact([submitted], previous=stored)
+    db_session.commit()
+
+    [item] = question_items(marked)
+    assert item["v"] == stored["items"][0]["v"]
+    assert (item["is_correct"], item["meta"]) == (True, {"time_spent": 900})
+    assert QuestionSnapshot.query.count() == 1
+
+    [payload] = question_snapshots.expand(marked)
+    assert payload["text"] == "What is 2 + 2?"
+    assert payload["sub_questions"][0]["student_answer"] == "6"
+
+
+def test_legacy_rows_are_read_and_compacted(app, db_session, sample_student, sample_subject):
+    legacy = [_payload(student_answer="4", correct_answer="4")]
+    test = Test(
+        student_id=sample_student.id,
+        subject_id=sample_subject.id,
+        questions=legacy,
+        total_points=1,
+        points_acquired=1,
+        score_acquired=100,
+    )
+    db_session.add(test)
+    db_session.commit()
+
+    assert question_items(test.questions) == legacy
+    assert question_snapshots.expand(test.questions) == legacy
+
+    result = app.test_cli_runner().invoke(args=["tests", "compact"])
+    assert result.exit_code == 0, result.output
+    assert "Compacted 1 test(s)" in result.output
+    db_session.refresh(test)
+    assert test.questions["format"] == FORMAT
+    assert question_snapshots.expand(test.questions) == legacy
+
+    app.config["COMPACT_TEST_QUESTIONS"] = False
+    assert question_snapshots.compact(legacy) == legacy
+
+
+def test_marking_stores_compact_items(
+    app, client, student_headers, sample_test, sample_question, student_subject_level, mock_pusher, mock_mailer
+):
+    question = {
+        "id": sample_question.id,
+        "text": sample_question.text,
+        "possible_answers": ["2", "3", "4", "5"],
+        "topic_id": sample_question.topic_id,
+        "level": 1,
+        "student_answer": "4",
+        "sub_questions": [],
+    }
+    response = client.put(
+        f"/tests/{sample_test.id}/mark/",
+        json={"data": {"questions": [question], "meta": {"out_time": 0}}},
+        headers=student_headers,
+    )
+    assert response.status_code == 200
+    assert response.get_json()["data"]["questions"][0]["text"] == sample_question.text
+
+    stored = Test.query.get(sample_test.id).questions
+    assert stored["format"] == FORMAT
+    assert stored["items"][0]["is_correct"] is True
+
+    [listed] = client.get("/tests/", headers=student_headers).get_json()["data"]
+    assert listed["questions"][0]["text"] == sample_question.text
+    assert listed["questions"][0]["student_answer"] == "4"
@@ -0,0 +1,61 @@
+"""
+Tests for the versioned reference-data cache (app/_shared/cache.py, app/app_admin/catalog.py).
+"""
+
+from app._shared.cache import CacheNamespaces, versioned_cache
+from app._shared.operations import cache_version_manager
+from app.app_admin.catalog import reference_catalog
+
+
+def test_lookups_are_served_from_memory(app, sample_subject, sample_topic, query_counter):
+    topic_id, subject_id = sample_topic.id, sample_subject.id
+    assert reference_catalog.topic(topic_id).name == "Linear Equations"
+    assert reference_catalog.subject(subject_id).short_name == "Math"
+
+    with query_counter() as statements:
+        for _ in range(10):
+            assert reference_catalog.topic(topic_id).name == "Linear Equations"
+        assert [s.id for s in reference_catalog.subjects_by_curriculum("bece")] == [subject_id]
+
+    assert statements == []
+
+
+def test_admin_changes_are_visible_immediately(
+    app, client, app_access_headers, sample_subject, sample_theme, sample_topic
+):
+    topic_id = sample_topic.id
+    assert reference_catalog.topic(topic_id).level == 1
+
+    response = client.put(
+        f"/topics/{topic_id}/",
+        json={
+            "data": {
+                "id": topic_id,
+                "name": "Linear Equations",
+                "short_name": "Lin Eq",
+                "subject_id": sample_subject.id,
+                "level": 3,
+                "theme_id": sample_theme.id,
+            }
+        },
+        headers=app_access_headers,
+    )
+
+    assert response.status_code == 200
+    assert reference_catalog.topic(topic_id).level == 3
+    assert cache_version_manager.get_versions()[CacheNamespaces.topic] == 1
+
+
+def test_other_workers_changes_are_picked_up_on_the_next_check(app, db_session, sample_topic):
+    topic_id = sample_topic.id
+    assert reference_catalog.topic(topic_id).level == 1
+
+    # another worker edits the topic and bumps the generation in the database
+    sample_topic.level = 2
+    db_session.commit()
+    cache_version_manager.bump(CacheNamespaces.topic)
+    assert reference_catalog.topic(topic_id).level == 1
+
+    app.config["CACHE_VERSION_CHECK_SECONDS"] = 0
+    assert reference_catalog.topic(topic_id).level == 2
+    assert versioned_cache.version(CacheNamespaces.topic) == 1
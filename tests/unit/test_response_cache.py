@@ -0,0 +1,95 @@
+"""
+Tests for the school analytics response cache (app/analytics/response_cache.py).
+"""
+
+from datetime import datetime, timedelta
+
+from app.analytics.models import AnalyticsResponse
+from app.analytics.operations import response_manager
+from app.analytics.response_cache import LRUStore, analytics_responses
+
+
+def _general(client, headers, batch_id, **extra_headers):
+    return client.get(
+        f"/analytics/performance-general?batch_id={batch_id}",
+        headers={**headers, **extra_headers},
+    )
+
+
+def test_repeated_requests_are_served_from_memory(
+    app, client, school_admin_headers, sample_batch, completed_test
+):
+    first = _general(client, school_admin_headers, sample_batch.id)
+    second = _general(client, school_admin_headers, sample_batch.id)
+
+    assert first.headers["X-Cache"] == "miss"
+    assert second.headers["X-Cache"] == "hit-memory"
+    assert second.get_json() == first.get_json()
+
+    bypassed = _general(client, school_admin_headers, sample_batch.id, **{"X-Cache-Bypass": "1"})
+    assert bypassed.headers["X-Cache"] == "bypass"
+    assert bypassed.get_json() == first.get_json()
+
+    # another worker (an empty memory store) finds the response in the database
+    app.extensions.pop(analytics_responses.extension_key)
+    shared = _general(client, school_admin_headers, sample_batch.id)
+    assert shared.headers["X-Cache"] == "hit-database"
+    assert _general(client, school_admin_headers, sample_batch.id).headers["X-Cache"] == "hit-memory"
+
+
+def test_school_writes_invalidate_its_responses(
+    app, client, school_admin_headers, sample_batch, sample_student, completed_test
+):
+    _general(client, school_admin_headers, sample_batch.id)
+    before = AnalyticsResponse.query.one().version
+
+    response = client.post(
+        "/students/unapprove/", json={"student_ids": [sample_student.id]}, headers=school_admin_headers
+    )
+    assert response.status_code == 200
+
+    after = _general(client, school_admin_headers, sample_batch.id)
+    assert after.headers["X-Cache"] == "miss"
+    # the stale version's row is replaced
+    [row] = AnalyticsResponse.query.all()
+    assert row.version > before
+
+
+def test_storing_purges_responses_from_earlier_days(app, db_session):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    db_session.add_all([
+        AnalyticsResponse(cache_key="old-other", school_id=2, version=5, payload={}, created_at=today - timedelta(days=2)),
+        AnalyticsResponse(cache_key="old-same", school_id=1, version=3, payload={}, created_at=today - timedelta(hours=1)),
+        AnalyticsResponse(cache_key="fresh-other", school_id=2, version=5, payload={}, created_at=today),
+    ])
+    db_session.commit()
+
+    response_manager.put("new", 1, 3, {"data": 1}, stale_before=today)
+
+    assert sorted(row.cache_key for row in AnalyticsResponse.query) == ["fresh-other", "new"]
+
+
+def test_lru_store_evicts_the_least_recently_used():
+    store = LRUStore(max_entries=2)
+    store.set("a", 1, 1, 0)
+    store.set("b", 2, 1, 0)
+    store.get("a")
+    store.set("c", 3, 1, 0)
+
+    assert list(store.entries) == ["a", "c"]
+
+
+def test_metrics_count_hits_and_misses(
+    client, auth_headers, school_admin_headers, sample_batch, completed_test
+):
+    _general(client, school_admin_headers, sample_batch.id)
+    _general(client, school_admin_headers, sample_batch.id)
+
+    response = client.get("/analytics/cache-metrics", headers=auth_headers)
+    assert response.status_code == 200
+    metrics = response.get_json()["data"]
+    assert metrics["hits"] == {"memory": 1, "database": 0}
+    assert metrics["misses"] == 1
+    assert metrics["hit_rate"] == 0.5
+
+    assert client.get("/analytics/cache-metrics", headers=school_admin_headers).status_code == 403
@@ -0,0 +1,82 @@
+"""
+Tests for the spaced-repetition review queue (StudentReviewQueueManager in
+app/analytics/operations.py) and its share of adaptive tests.
+"""
+
+from datetime import datetime, timedelta
+
+from app.analytics.models import StudentReviewItem
+from app.analytics.operations import review_manager, sqo_manager
+from app.test.adaptive_test_service import AdaptiveTestService
+from app.test.models import Test
+
+
+def test_misses_are_scheduled_and_correct_reviews_space_them_out(app, db_session, sample_student, sample_subject):
+    student_id, subject_id = sample_student.id, sample_subject.id
+    start = datetime(2026, 10, 1, 9, 0)
+
+    review_manager.apply_outcomes(student_id, subject_id, [(7, 1, False, start), (8, 1, True, start)])
+    [item] = StudentReviewItem.query.all()
+    assert (item.question_id, item.step, item.lapses, item.due_at) == (7, 0, 1, start + timedelta(days=1))
+
+    answered = start + timedelta(days=1)
+    review_manager.apply_outcomes(student_id, subject_id, [(7, 1, True, answered)])
+    assert (item.step, item.due_at) == (1, answered + timedelta(days=3))
+    assert review_manager.next_due(student_id, subject_id, 5, now=answered + timedelta(days=2)) == []
+    assert review_manager.next_due(student_id, subject_id, 5, now=answered + timedelta(days=3)) == [7]
+
+    # correct at every remaining step: the question leaves the queue, a later miss brings it back
+    steps = len(review_manager.INTERVALS_DAYS) - 1
+    review_manager.apply_outcomes(
+        student_id,
+        subject_id,
+        [(7, 1, True, answered + timedelta(days=n)) for n in range(steps)] + [(7, 1, False, answered)],
+    )
+    [item] = StudentReviewItem.query.all()
+    assert (item.step, item.lapses) == (0, 2)
+
+
+def test_due_reviews_take_a_share_of_adaptive_tests(
+    app, db_session, sample_student, sample_subject, sample_topic, question_bank
+):
+    student_id, subject_id = sample_student.id, sample_subject.id
+    question_ids = question_bank(30)
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    review_manager.apply_outcomes(
+        student_id, subject_id, [(qid, sample_topic.id, False, week_ago) for qid in question_ids[:5]]
+    )
+    db_session.commit()
+
+    chosen = AdaptiveTestService.generate_adaptive_question_ids(subject_id, student_id, 1, seed=1)
+
+    # 10 questions at level 1, ADAPTIVE_REVIEW_SHARE = 0.3
+    assert len(chosen) == len(set(chosen)) == 10
+    assert len(set(chosen) & set(question_ids[:5])) >= 3
+
+    app.config["ADAPTIVE_REVIEW_SHARE"] = 0
+    assert AdaptiveTestService._due_review_questions(None, student_id, subject_id, 1, 10) == []
+
+
+def test_rebuild_replays_question_outcomes(app, db_session, sample_student, sample_subject, sample_topic):
+    now = datetime.utcnow()
+    test = Test(
+        student_id=sample_student.id,
+        subject_id=sample_subject.id,
+        questions=[
+            {"id": 1, "topic_id": sample_topic.id, "student_answer": "B", "correct_answer": "A"},
+            {"id": 2, "topic_id": sample_topic.id, "student_answer": "A", "correct_answer": "A"},
+        ],
+        total_points=2,
+        points_acquired=1,
+        score_acquired=50,
+        is_completed=True,
+        finished_on=now,
+    )
+    db_session.add(test)
+    db_session.commit()
+    sqo_manager.record_test(test)
+
+    result = app.test_cli_runner().invoke(args=["stats", "rebuild"])
+
+    assert result.exit_code == 0, result.output
+    assert [(item.question_id, item.step) for item in StudentReviewItem.query.all()] == [(1, 0)]
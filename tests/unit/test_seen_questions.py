@@ -0,0 +1,91 @@
+"""
+Tests for the per-student seen-question bitmap (app/analytics/seen_questions.py)
+and its use by adaptive generation and exam papers.
+"""
+
+from app.analytics.models import StudentSeenQuestions
+from app.analytics.operations import seen_manager
+from app.analytics.seen_questions import SeenQuestions
+from app.test.adaptive_test_service import AdaptiveTestService
+from app.test.exam_papers import exam_paper_pool
+from app.test.models import ExamPaper
+
+
+def test_bitmap_grows_in_both_directions():
+    seen = SeenQuestions()
+    assert not seen and 5 not in seen
+
+    seen.update([1003, 1010, 997])
+    assert seen.base == 992
+    assert {997, 1003, 1010} == {qid for qid in range(900, 1100) if qid in seen}
+    assert len(seen) == 3
+    # one bit per question id between the lowest and highest seen
+    assert len(seen.bits) == 3
+
+    restored = SeenQuestions(seen.base, bytes(seen.bits))
+    assert 1010 in restored and 1011 not in restored
+
+
+def test_marking_records_seen_questions(
+    app, client, student_headers, sample_test, sample_question, student_subject_level, mock_pusher, mock_mailer
+):
+    student_id, subject_id, question_id = sample_test.student_id, sample_test.subject_id, sample_question.id
+    question = {
+        "id": question_id,
+        "text": sample_question.text,
+        "possible_answers": ["2", "3", "4", "5"],
+        "topic_id": sample_question.topic_id,
+        "level": 1,
+        "student_answer": "4",
+        "sub_questions": [],
+    }
+    response = client.put(
+        f"/tests/{sample_test.id}/mark/",
+        json={"data": {"questions": [question], "meta": {"out_time": 0}}},
+        headers=student_headers,
+    )
+
+    assert response.status_code == 200
+    assert question_id in seen_manager.get(student_id, subject_id)
+
+    # `flask stats rebuild` derives the same bitmap from the question outcomes
+    StudentSeenQuestions.query.delete()
+    result = app.test_cli_runner().invoke(args=["stats", "rebuild"])
+    assert result.exit_code == 0, result.output
+    assert question_id in seen_manager.get(student_id, subject_id)
+
+
+def test_adaptive_generation_skips_seen_questions_while_it_can(
+    app, db_session, sample_student, sample_subject, question_bank
+):
+    student_id, subject_id = sample_student.id, sample_subject.id
+    question_ids = question_bank(30)
+    seen_manager.add(student_id, subject_id, question_ids[:20])
+    db_session.commit()
+
+    # 10 questions at level 1, exactly the unseen ones
+    chosen = AdaptiveTestService.generate_adaptive_question_ids(subject_id, student_id, 1, seed=3)
+    assert sorted(chosen) == question_ids[20:]
+
+    # with too few unseen questions left, seen ones fill the rest
+    seen_manager.add(student_id, subject_id, question_ids[20:25])
+    db_session.commit()
+    chosen = AdaptiveTestService.generate_adaptive_question_ids(subject_id, student_id, 1, seed=3)
+    assert len(chosen) == 10 and set(question_ids[25:]) <= set(chosen)
+
+
+def test_exam_pop_prefers_the_paper_with_fewest_seen_questions(
+    app, db_session, sample_student, sample_subject, question_bank
+):
+    student_id, subject_id, short_name = sample_student.id, sample_subject.id, sample_subject.short_name
+    app.config.update(EXAM_PAPER_POOL_SIZE=2)
+    question_bank(80)
+    exam_paper_pool.refill(subject_id)
+    older, newer = ExamPaper.query.order_by(ExamPaper.id).all()
+    expected = newer.fingerprint
+    seen_manager.add(student_id, subject_id, older.question_ids)
+    db_session.commit()
+
+    paper = exam_paper_pool.pop(student_id, short_name, subject_id)
+
+    assert paper["fingerprint"] == expected
@@ -0,0 +1,48 @@
+"""
+Tests for the adaptive engine simulator (app/test/simulator.py) and its CLI.
+"""
+
+import json
+
+from app.test.simulator import AdaptiveEngineSimulator, SimulationConfig, _percentile
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert _percentile(values, 50) == 50
+    assert _percentile(values, 95) == 95
+    assert _percentile([7.0], 95) == 7.0
+    assert _percentile([], 50) == 0.0
+
+
+def test_simulation_reports_latency_queries_and_distribution(app, db_session):
+    config = SimulationConfig(
+        levels=2, topics_per_level=3, questions_per_topic=15, students=4, generations=20, memory_samples=3
+    )
+    report = AdaptiveEngineSimulator(config).run()
+
+    assert report["database"] == "sqlite"
+    assert report["bank"] == {"topics": 6, "questions": 90, "students": 4}
+    assert report["generations"] == 20
+    assert 0 < report["latency_ms"]["p50"] <= report["latency_ms"]["p95"] <= report["latency_ms"]["max"]
+    # the question pool is warm: profile reads plus one fetch of the chosen questions
+    assert 0 < report["queries_per_generation"]["max"] < 10
+    assert report["distribution"]["questions_per_test"]["p50"] == 10
+    assert 0 < report["distribution"]["topic_coverage"]["mean"] <= 1
+    assert 0 <= report["distribution"]["repeat_rate"]["mean"] <= 1
+    assert set(report["distribution"]["level_histogram"]) <= {"1", "2"}
+
+
+def test_simulate_command_writes_a_json_report(app, db_session, tmp_path):
+    output = tmp_path / "report.json"
+    result = app.test_cli_runner().invoke(
+        args=[
+            "tests", "simulate", "--levels", "1", "--topics-per-level", "2", "--questions-per-topic", "12",
+            "--students", "2", "--generations", "5", "--memory-samples", "1", "--output", str(output),
+        ]
+    )
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(output.read_text())
+    assert report["report_version"] == 1
+    assert report["config"]["generations"] == 5
@@ -0,0 +1,26 @@
+"""
+Tests for the projection-only test rows analytics reads (TestManager.get_test_summaries).
+"""
+
+from app.analytics.services import AnalyticsService
+from app.test.operations import test_manager
+
+
+def test_summaries_skip_the_json_columns(app, db_session, completed_test, sample_student, query_counter):
+    student_id, subject_id, test_id = sample_student.id, completed_test.subject_id, completed_test.id
+
+    with query_counter() as statements:
+        [summary] = test_manager.get_test_summaries([student_id], subject_id=subject_id)
+
+    [statement] = statements
+    assert "questions" not in statement and "meta" not in statement
+    assert not hasattr(summary, "__dict__")
+    assert (summary.id, summary.score_acquired, summary.points_acquired) == (test_id, 80.0, 8)
+    assert test_manager.get_test_summaries([student_id], subject_id=subject_id + 1) == []
+    assert test_manager.get_test_summaries([]) == []
+
+
+def test_analytics_aggregates_read_summaries(app, db_session, completed_test, sample_student):
+    history = AnalyticsService().get_test_history(sample_student.id)
+
+    assert [(row["test_id"], row["score"], row["points"]) for row in history] == [(completed_test.id, 80.0, 8)]
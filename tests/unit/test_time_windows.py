@@ -0,0 +1,66 @@
+"""
+Tests for the dashboard time windows (app/analytics/time_windows.py).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+from app.analytics.cohorts import Cohort
+from app.analytics.time_windows import ALL_TIME, TimeWindow, period_windows
+from app.test.models import Test
+
+
+def test_weeks_and_months_roll_over_the_year(app):
+    now = datetime(2027, 1, 2, 12, 0, tzinfo=timezone.utc)  # a Saturday
+
+    this_week, last_week = period_windows("this_week", now=now)
+    assert this_week == TimeWindow(datetime(2026, 12, 28), datetime(2027, 1, 4))
+    assert last_week == TimeWindow(datetime(2026, 12, 21), datetime(2026, 12, 28))
+
+    this_month, last_month = period_windows("this_month", now=now)
+    assert this_month == TimeWindow(datetime(2027, 1, 1), datetime(2027, 2, 1))
+    assert last_month == TimeWindow(datetime(2026, 12, 1), datetime(2027, 1, 1))
+    assert datetime(2026, 12, 31, 23, 59) in last_month and datetime(2027, 1, 1) not in last_month
+
+    assert period_windows("all_time", now=now) == (ALL_TIME, None)
+
+
+def test_windows_start_at_local_midnight(app):
+    # Monday 00:30 in Tokyo is still Sunday in UTC
+    now = datetime(2026, 10, 11, 15, 30, tzinfo=timezone.utc)
+
+    this_week, _ = period_windows("this_week", now=now, tz=pytz.timezone("Asia/Tokyo"))
+
+    assert this_week == TimeWindow(datetime(2026, 10, 11, 15, 0), datetime(2026, 10, 18, 15, 0))
+
+
+def test_both_periods_come_from_one_range_query(
+    app, db_session, sample_student, sample_subject, query_counter
+):
+    student_id = sample_student.id
+    this_week, last_week = period_windows("this_week")
+    for created_at, score in [
+        (this_week.start, 90),
+        (last_week.start, 50),
+        (last_week.start + timedelta(days=3), 70),
+        (last_week.start - timedelta(days=365), 10),
+    ]:
+        db_session.add(Test(
+            student_id=student_id,
+            subject_id=sample_subject.id,
+            questions=[],
+            total_points=1,
+            points_acquired=0,
+            score_acquired=score,
+            is_completed=True,
+            created_at=created_at,
+        ))
+    db_session.commit()
+
+    with query_counter() as statements:
+        current, previous = Cohort.load_windows([student_id], [this_week, last_week])
+
+    assert len(statements) == 1
+    assert (current.tests, current.average_score) == (1, 90)
+    assert (previous.tests, previous.average_score) == (2, 60)
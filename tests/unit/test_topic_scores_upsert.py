@@ -0,0 +1,74 @@
+"""
+Tests for the bulk topic-score upsert (StudentTopicScoresManager.insert_multiple_student_topic_scores).
+"""
+
+from app.analytics.models import StudentTopicScores
+from app.analytics.operations import sts_manager
+from app.app_admin.models import Topic
+
+
+def _topics(db_session, subject, theme, count):
+    topics = [
+        Topic(
+            name=f"Topic {i}",
+            short_name=f"T{i}",
+            level=1,
+            subject_id=subject.id,
+            theme_id=theme.id,
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(topics)
+    db_session.commit()
+    return topics
+
+
+def _rows(test, topics, scores):
+    return [
+        {
+            "student_id": test.student_id,
+            "subject_id": test.subject_id,
+            "test_id": test.id,
+            "topic_id": topic.id,
+            "score_acquired": score,
+        }
+        for topic, score in zip(topics, scores)
+    ]
+
+
+def test_topic_scores_are_written_in_one_statement(
+    app, db_session, completed_test, sample_subject, sample_theme, query_counter
+):
+    topics = _topics(db_session, sample_subject, sample_theme, 5)
+    rows = _rows(completed_test, topics, [10, 20, 30, 40, 50])
+
+    with query_counter() as statements:
+        saved = sts_manager.insert_multiple_student_topic_scores(rows, upsert=True)
+
+    assert len(statements) == 1
+    assert sorted(row["score_acquired"] for row in saved) == [10, 20, 30, 40, 50]
+    assert all(row["id"] for row in saved)
+
+
+def test_topic_scores_upsert_overwrites_existing_rows(
+    app, db_session, completed_test, sample_subject, sample_theme
+):
+    topics = _topics(db_session, sample_subject, sample_theme, 3)
+    first = sts_manager.insert_multiple_student_topic_scores(
+        _rows(completed_test, topics[:2], [10, 20]), upsert=True
+    )
+
+    second = sts_manager.insert_multiple_student_topic_scores(
+        _rows(completed_test, topics, [75, 80, 90]), upsert=True
+    )
+
+    assert StudentTopicScores.query.filter_by(test_id=completed_test.id).count() == 3
+    ids = {row["topic_id"]: row["id"] for row in first}
+    by_topic = {row["topic_id"]: row for row in second}
+    # existing rows are updated in place
+    assert by_topic[topics[0].id]["id"] == ids[topics[0].id]
+    assert {topic_id: row["score_acquired"] for topic_id, row in by_topic.items()} == {
+        topics[0].id: 75,
+        topics[1].id: 80,
+        topics[2].id: 90,
+    }
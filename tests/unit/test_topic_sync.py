@@ -0,0 +1,110 @@
+"""
+Tests for TopicAnalytics.student_level_topic_analytics, including how many
+statements it issues per marked test.
+"""
+
+from app.analytics.models import (
+    StudentBestSubject,
+    StudentSubjectRecommendation,
+    StudentTopicScores,
+)
+from app.analytics.topic_analytics import RecommendationLevels, TopicAnalytics
+from app.app_admin.models import Topic
+from app.test.models import Test
+
+
+def _setup(db_session, student, subject, theme):
+    topics = [
+        Topic(name=f"Topic {i}", short_name=f"T{i}", level=1, subject_id=subject.id, theme_id=theme.id)
+        for i in range(2)
+    ]
+    tests = [
+        Test(
+            student_id=student.id,
+            subject_id=subject.id,
+            school_id=student.school_id,
+            questions=[],
+            total_points=10,
+            points_acquired=5,
+            score_acquired=50,
+            question_number=10,
+            is_completed=True,
+        )
+        for _ in range(2)
+    ]
+    db_session.add_all(topics + tests)
+    db_session.commit()
+    return [t.id for t in topics], [t.id for t in tests]
+
+
+def _score(db_session, student, subject, test_id, topic_id, score):
+    db_session.add(
+        StudentTopicScores(
+            student_id=student.id,
+            subject_id=subject.id,
+            test_id=test_id,
+            topic_id=topic_id,
+            score_acquired=score,
+        )
+    )
+    db_session.commit()
+
+
+def _active(model, level_column):
+    return sorted(
+        (row.topic_id, getattr(row, level_column))
+        for row in model.query.filter_by(is_archived=False).all()
+    )
+
+
+def test_sync_statement_count_per_marked_test(
+    app, db_session, sample_student, sample_subject, sample_theme, query_counter
+):
+    student_id, subject_id = sample_student.id, sample_subject.id
+    (strong, weak), (first_test, _) = _setup(db_session, sample_student, sample_subject, sample_theme)
+    _score(db_session, sample_student, sample_subject, first_test, strong, 90)
+    _score(db_session, sample_student, sample_subject, first_test, weak, 40)
+
+    # first test: averages + one read per table + one insert per table
+    with query_counter() as statements:
+        TopicAnalytics.student_level_topic_analytics(student_id, subject_id)
+    assert len(statements) == 5
+
+    assert _active(StudentBestSubject, "proficiency_level") == [(strong, RecommendationLevels.high)]
+    assert _active(StudentSubjectRecommendation, "recommendation_level") == [
+        (weak, RecommendationLevels.high)
+    ]
+
+    # nothing changed: reads only, and no rows are churned
+    with query_counter() as statements:
+        TopicAnalytics.student_level_topic_analytics(student_id, subject_id)
+    assert len(statements) == 3
+    assert StudentBestSubject.query.count() == 1
+    assert StudentSubjectRecommendation.query.count() == 1
+
+
+def test_sync_archives_rows_whose_level_changed(
+    app, db_session, sample_student, sample_subject, sample_theme, query_counter
+):
+    student_id, subject_id = sample_student.id, sample_subject.id
+    (strong, weak), (first_test, second_test) = _setup(
+        db_session, sample_student, sample_subject, sample_theme
+    )
+    _score(db_session, sample_student, sample_subject, first_test, strong, 90)
+    _score(db_session, sample_student, sample_subject, first_test, weak, 40)
+    TopicAnalytics.student_level_topic_analytics(student_id, subject_id)
+
+    # the strong topic's average drops to 75: moderately proficient now
+    _score(db_session, sample_student, sample_subject, second_test, strong, 60)
+    with query_counter() as statements:
+        TopicAnalytics.student_level_topic_analytics(student_id, subject_id)
+    # averages + two reads + archive and insert for best topics + insert for recommendations
+    assert len(statements) == 6
+
+    assert _active(StudentBestSubject, "proficiency_level") == [
+        (strong, RecommendationLevels.moderate)
+    ]
+    assert StudentBestSubject.query.filter_by(is_archived=True).count() == 1
+    assert (weak, RecommendationLevels.high) in _active(
+        StudentSubjectRecommendation, "recommendation_level"
+    )
@@ -0,0 +1,49 @@
+"""
+Tests for BaseManager.unit_of_work (app/_shared/operations.py).
+"""
+
+import pytest
+
+from app.extensions import db
+from app._shared.operations import BaseManager
+from app.app_admin.models import Subject
+
+
+def _subject(short_name):
+    return Subject(name=f"Subject {short_name}", short_name=short_name, curriculum="bece")
+
+
+def test_saves_inside_unit_of_work_commit_once(app):
+    with BaseManager.unit_of_work():
+        BaseManager.save(_subject("UOW-1"))
+        BaseManager.save_multiple([_subject("UOW-2"), _subject("UOW-3")])
+        assert BaseManager.in_unit_of_work()
+        # nothing is committed until the block exits
+        db.session.rollback()
+        assert Subject.query.filter(Subject.short_name.like("UOW-%")).count() == 0
+        BaseManager.save(_subject("UOW-4"))
+
+    assert not BaseManager.in_unit_of_work()
+    db.session.expire_all()
+    assert [s.short_name for s in Subject.query.filter(Subject.short_name.like("UOW-%"))] == ["UOW-4"]
+
+
+def test_unit_of_work_rolls_back_on_error(app):
+    with pytest.raises(RuntimeError):
+        with BaseManager.unit_of_work():
+            subject = _subject("UOW-5")
+            BaseManager.save(subject)
+            subject.save()
+            raise RuntimeError("boom")
+
+    assert not BaseManager.in_unit_of_work()
+    assert Subject.query.filter_by(short_name="UOW-5").count() == 0
+
+
+def test_nested_units_commit_with_the_outermost(app):
+    with BaseManager.unit_of_work():
+        with BaseManager.unit_of_work():
+            BaseManager.save(_subject("UOW-6"))
+        assert BaseManager.in_unit_of_work()
+        db.session.rollback()
+        assert Subject.query.filter_by(short_name="UOW-6").count() == 0
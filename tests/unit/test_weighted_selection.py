@@ -0,0 +1,102 @@
+"""
+Tests for AdaptiveTestService._weighted_question_selection, including a
+check that it draws like the previous draw-by-draw selector and an opt-in
+micro-benchmark against it (RUN_BENCHMARKS=1 pytest -s ...).
+"""
+
+import os
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from app.test.adaptive_test_service import AdaptiveDistributionEngine, AdaptiveTestService
+from app.test.question_pool import PooledQuestion
+
+
+def _pool(size, topics=20):
+    return [PooledQuestion(i, i % topics, 9, 0, None) for i in range(size)]
+
+
+def _performance(topics=20):
+    # topic t averages 5 * t: lower topics are weaker and weigh more
+    return {"topic_weights": {t: 5.0 * t for t in range(topics)}, "recent_questions": {}}
+
+
+def _legacy_selection(available_questions, count, performance_data, rng):
+    """The selector this replaced: re-normalise and pop on every draw."""
+    weights = [
+        AdaptiveDistributionEngine.calculate_question_selection_weight(q, performance_data)
+        for q in available_questions
+    ]
+    selected = []
+    questions_copy = available_questions.copy()
+    weights_copy = weights.copy()
+    for _ in range(min(count, len(questions_copy))):
+        total_weight = sum(weights_copy)
+        probabilities = [w / total_weight for w in weights_copy]
+        idx = rng.choices(range(len(questions_copy)), weights=probabilities, k=1)[0]
+        selected.append(questions_copy.pop(idx))
+        weights_copy.pop(idx)
+    return selected
+
+
+def test_selection_is_seedable_and_without_replacement():
+    pool, performance = _pool(500), _performance()
+
+    first = AdaptiveTestService._weighted_question_selection(pool, 40, performance, rng=random.Random(7))
+    again = AdaptiveTestService._weighted_question_selection(pool, 40, performance, rng=random.Random(7))
+
+    assert first == again
+    assert len({q.id for q in first}) == 40
+    # asking for more than there is returns everything once
+    assert len(AdaptiveTestService._weighted_question_selection(pool[:5], 40, performance)) == 5
+
+
+def test_selection_favours_weaker_topics():
+    pool, performance = _pool(200), _performance()
+    rng = random.Random(1)
+
+    picks = Counter()
+    for _ in range(200):
+        for question in AdaptiveTestService._weighted_question_selection(pool, 10, performance, rng=rng):
+            picks[question.topic_id] += 1
+
+    # topic 0 weighs 100, topic 19 weighs 5
+    assert picks[0] > 5 * picks[19]
+
+
+def test_selection_draws_like_the_legacy_selector():
+    pool, performance = _pool(200), _performance()
+
+    def topic_shares(selector):
+        rng, picks = random.Random(11), Counter()
+        for _ in range(300):
+            for question in selector(pool, 10, performance, rng=rng):
+                picks[question.topic_id] += 1
+        total = sum(picks.values())
+        return [picks[topic] / total for topic in range(20)]
+
+    legacy = topic_shares(_legacy_selection)
+    current = topic_shares(AdaptiveTestService._weighted_question_selection)
+    # total variation distance between the two topic distributions (seeded, so deterministic)
+    assert sum(abs(a - b) for a, b in zip(legacy, current)) / 2 < 0.08
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to time the selectors")
+def test_selection_benchmark_against_legacy_selector():
+    pool, performance = _pool(5000), _performance()
+
+    def best_of(selector, rounds=3):
+        timings = []
+        for seed in range(rounds):
+            start = time.perf_counter()
+            selector(pool, 40, performance, rng=random.Random(seed))
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    legacy = best_of(_legacy_selection)
+    current = best_of(AdaptiveTestService._weighted_question_selection)
+    print(f"weighted selection, n=5000 k=40: legacy {legacy * 1000:.1f}ms, current {current * 1000:.1f}ms")
+    assert current < legacy